@@ -1,14 +1,15 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from datetime import datetime
 from db.db_operation import mongo_conn
+from core.principal_cache import principal_cache, principal_from_user, PRINCIPAL_PROJECTION
 from models.user import UserOut
 import os
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from utils.logger import get_logger
 from settings.config import settings
+from utils.jwt_handler import get_request_claims
 
 logger = get_logger("Dependencies")
 
@@ -32,66 +33,71 @@ class CurrentUser(BaseModel):
     class Config:
         from_attributes = True  # helpful if you ever return ORM objects
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> CurrentUser:
     """
-    Decode token, validate, fetch user from DB, and ensure token_version matches.
+    Decode token, validate, fetch user (principal cache first, then DB), and ensure token_version matches.
     Returns CurrentUser object.
     """
     logger.info("Received request to get current user from token")
-    try:
-        # JWT decode
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.debug(f"Token decoded successfully for the current user")
-        email: str = payload.get("sub") # sub is used for unique identifier such as email or user id
-        logger.debug(f"Email found in token: {email}")
-        #added fields for role, restaurant_ids, token_version
-        role: str = payload.get("role")
-        rid = payload.get("restaurant_ids")
-        tv = payload.get("token_version")
-
-        if email is None:
-            logger.debug("Email not found for the current user in token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: no email found"
-            )
-        logger.info(f"Fetching user details for email: {email}")
-        # User find from DB
+    # verified at most once per request (shared with the rate limiter middleware)
+    payload = get_request_claims(request, token)
+    if payload is None:
+        logger.error("JWT Error: Invalid token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    logger.debug(f"Token decoded successfully for the current user")
+    email: str = payload.get("sub") # sub is used for unique identifier such as email or user id
+    logger.debug(f"Email found in token: {email}")
+    #added fields for role, restaurant_ids, token_version
+    role: str = payload.get("role")
+    rid = payload.get("restaurant_ids")
+    tv = payload.get("token_version")
+
+    if email is None:
+        logger.debug("Email not found for the current user in token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: no email found"
+        )
+    logger.info(f"Fetching user details for email: {email}")
+    tv = int(tv or 0)
+    principal = await principal_cache.get(email, tv)
+    if principal is None:
+        # User find from DB (cache miss); generation is read first so a concurrent invalidate wins
+        generation = await principal_cache.generation(email)
         users_collection = mongo_conn.users_collection
-        user = await users_collection.find_one({"email": email})
+        user = await users_collection.find_one({"email": email}, PRINCIPAL_PROJECTION)
         if user is None:
             logger.warning(f"User not found for email: {email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-        if user.get("disabled", False):
-            logger.warning(f"Disabled user attempted access: {email}")
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled")
-        db_tv = user.get("token_version")
-        if db_tv != tv:
-            logger.warning(f"Token version mismatch for user: {email}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked"
-            )
-        current_user = CurrentUser(
-            email=user.get("email"),
-            role=user.get("role"),
-            restaurant_ids=user.get("restaurant_ids"),
-            token_version=user.get("token_version"),
-            full_name=user.get("full_name"),
-            id=str(user.get("_id"))
-        )
-        # UserOut ke format me return karo
-        logger.info(f"Current user fetched successfully: {current_user.email}")
-        return current_user
-    except JWTError:
-        logger.error("JWT Error: Invalid token")
+        principal = principal_from_user(user)
+        await principal_cache.set(email, principal, generation)
+    if principal.get("disabled", False):
+        logger.warning(f"Disabled user attempted access: {email}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled")
+    db_tv = principal.get("token_version")
+    if db_tv != tv:
+        logger.warning(f"Token version mismatch for user: {email}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            detail="Token has been revoked"
         )
+    current_user = CurrentUser(
+        email=principal.get("email"),
+        role=principal.get("role"),
+        restaurant_ids=principal.get("restaurant_ids"),
+        token_version=principal.get("token_version"),
+        full_name=principal.get("full_name"),
+        id=principal.get("id")
+    )
+    # UserOut ke format me return karo
+    logger.info(f"Current user fetched successfully: {current_user.email}")
+    return current_user
 
 def require_role(*allowed_roles):
     """
@@ -0,0 +1,183 @@
+# core/idempotency.py
+import asyncio
+import base64
+import hashlib
+import json
+import uuid
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.rate_limit_policy import API_V1
+from core.route_table import RouteTable
+from db.redis_client import redis_client
+from settings.config import settings
+from utils.jwt_handler import get_request_claims
+from utils.logger import get_logger
+
+logger = get_logger("Idempotency")
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# non-idempotent writes that honour an Idempotency-Key header
+IDEMPOTENT_ROUTES = RouteTable([
+    ("POST", f"{API_V1}/orders/", True),
+    ("PATCH", f"{API_V1}/orders/{{order_id}}/status", True),
+    ("PATCH", f"{API_V1}/orders/{{restaurant_id}}/{{order_id}}/status", True),
+    ("PATCH", f"{API_V1}/restaurant/orders/{{order_id}}/status", True)
+])
+
+RESULT_PREFIX = "idem:"
+LOCK_PREFIX = "idem_lock:"
+
+# deletes the lock only if this request still owns it
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# auth failures depend on the token, not the request: never replay them
+UNSTORED_STATUSES = {401, 403, 429}
+
+
+def _problem(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key support for the routes in IDEMPOTENT_ROUTES.
+
+    The first request with a given key (per user and route) runs normally; its response
+    is stored in Redis for IDEMPOTENCY_TTL_SECONDS and replayed byte for byte to every
+    retry, with Idempotent-Replayed: true, without running the endpoint again. While the
+    first request is in flight its key is locked, and duplicates wait for its result
+    instead of running concurrently. Reusing a key with a different body is rejected
+    with 422. 5xx, 401, 403 and 429 responses are not stored, so those can be retried.
+    Keys are scoped to the token's subject and token_version, so a response recorded
+    before a role change or revocation is not replayed to the re-issued token. Without a valid token or a key, requests pass through untouched; if Redis is down
+    the request runs without idempotency (fail open, like the rate limiter).
+    """
+
+    def __init__(self, app: ASGIApp, routes: RouteTable = IDEMPOTENT_ROUTES, client=redis_client):
+        self.app = app
+        self.routes = routes
+        self.client = client
+        self._release = client.register_script(RELEASE_LUA)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        key = request.headers.get(HEADER)
+        if not key or not self.routes.match(request.method, request.url.path):
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _problem(400, "Idempotency-Key is too long")(scope, receive, send)
+            return
+        claims = get_request_claims(request)
+        if not claims:
+            # unauthenticated: let the endpoint reject it
+            await self.app(scope, receive, send)
+            return
+
+        # the body is needed for the fingerprint; hand the buffered copy to the app
+        body = await request.body()
+        sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        scope_key = f"{claims.get('sub')}:{claims.get('token_version', 0)}:{request.method}:{request.url.path}:{key}"
+        result_key = RESULT_PREFIX + scope_key
+        lock_key = LOCK_PREFIX + scope_key
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        try:
+            stored = await self._wait_for_result(result_key, lock_key)
+        except Exception as e:
+            logger.error("Idempotency store unavailable, running request without it", exc_info=e)
+            await self.app(scope, replay_receive, send)
+            return
+
+        if isinstance(stored, dict):
+            if stored["fingerprint"] != fingerprint:
+                await _problem(422, "Idempotency-Key was already used with a different request body")(scope, receive, send)
+                return
+            await self._replay(stored, send)
+            return
+        if stored is None:
+            await _problem(409, "A request with this Idempotency-Key is still in progress")(scope, receive, send)
+            return
+
+        # we hold the lock (stored is its token): run the request and record the response
+        token = stored
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+            if start is not None and start["status"] < 500 and start["status"] not in UNSTORED_STATUSES:
+                record = {
+                    "fingerprint": fingerprint,
+                    "status": start["status"],
+                    "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in start.get("headers", [])],
+                    "body": base64.b64encode(b"".join(chunks)).decode()
+                }
+                try:
+                    await self.client.set(result_key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+                except Exception as e:
+                    # the response was already sent; a retry just runs the endpoint again
+                    logger.error("Idempotency result could not be stored", exc_info=e)
+        finally:
+            try:
+                await self._release(keys=[lock_key], args=[token])
+            except Exception as e:
+                # lock expires on its own after IDEMPOTENCY_LOCK_SECONDS
+                logger.error("Idempotency lock release failed", exc_info=e)
+
+    async def _wait_for_result(self, result_key: str, lock_key: str):
+        """
+        Returns the stored response (dict), the lock token (str) if this request
+        should run, or None if another request still holds the key after waiting.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+        token = uuid.uuid4().hex
+        while True:
+            raw = await self.client.get(result_key)
+            if raw is not None:
+                return json.loads(raw)
+            if await self.client.set(lock_key, token, nx=True, px=settings.IDEMPOTENCY_LOCK_SECONDS * 1000):
+                # the first request may have finished between the two calls
+                raw = await self.client.get(result_key)
+                if raw is not None:
+                    await self._release(keys=[lock_key], args=[token])
+                    return json.loads(raw)
+                return token
+            if loop.time() >= deadline:
+                return None
+            await asyncio.sleep(0.05)
+
+    async def _replay(self, stored: dict, send: Send):
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in stored["headers"]]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": stored["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(stored["body"])})
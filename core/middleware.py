@@ -1,29 +1,68 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from utils.logger import get_logger
 from core.exceptions import AppException
 import uuid
 
 logger =  get_logger("Middleware")
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+# Pure ASGI middleware: no BaseHTTPMiddleware task / body stream wrapping per layer,
+# headers are added by wrapping `send` when the response starts.
+
+class ExceptionHandlerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except AppException as e:
             logger.warning(f"AppException: {e.detail}")
-            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            if response_started:
+                raise
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
         except Exception as e:
             logger.error(f"Unhandled Exception: {str(e)}", exc_info=True)
-            return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
-
-async def request_id_middleware(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    logger.info(f"[{request_id}] Request: {request.method} {request.url}")
-    request.state.request_id = request_id
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    logger.info(f"[{request_id}] Response status: {response.status_code}")
-    return response
\ No newline at end of file
+            if response_started:
+                raise
+            response = JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+            await response(scope, receive, send)
+
+
+class RequestIDMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        request_id = str(uuid.uuid4())
+        logger.info(f"[{request_id}] Request: {request.method} {request.url}")
+        # same storage as request.state, so endpoints can read request.state.request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+                logger.info(f"[{request_id}] Response status: {message['status']}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
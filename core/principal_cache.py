@@ -0,0 +1,183 @@
+# core/principal_cache.py
+import json
+from db.redis_client import redis_client
+from settings.config import settings
+from utils.cache import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger("Principal_Cache")
+
+# Only the fields needed to build CurrentUser; password hash and
+# verification / reset blobs never leave Mongo.
+PRINCIPAL_PROJECTION = {
+    "email": 1,
+    "full_name": 1,
+    "role": 1,
+    "restaurant_ids": 1,
+    "token_version": 1,
+    "disabled": 1
+}
+
+REDIS_KEY_PREFIX = "principal:"
+GENERATION_KEY_PREFIX = "principal_gen:"
+
+# generation counters only need to outlive an in-flight cache miss
+GENERATION_TTL_SECONDS = 86400
+
+# KEYS[1] = principal:{email}, KEYS[2] = principal_gen:{email}
+# ARGV: generation read before the Mongo lookup, principal JSON, ttl seconds
+# Stores the principal only if no invalidate() ran since that generation was read.
+SET_IF_CURRENT_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+"""
+
+
+def principal_from_user(user: dict) -> dict:
+    """
+    Build the cacheable principal dict from a (projected) user document.
+    """
+    return {
+        "id": str(user.get("_id")),
+        "email": user.get("email"),
+        "full_name": user.get("full_name"),
+        "role": user.get("role"),
+        "restaurant_ids": user.get("restaurant_ids") or [],
+        "token_version": int(user.get("token_version") or 0),
+        "disabled": user.get("disabled", False)
+    }
+
+
+class PrincipalCache:
+    """
+    Two-tier cache of principals keyed by email.
+    - local tier: per-worker TTL/LRU, short TTL because other workers cannot invalidate it
+    - redis tier: shared between workers, invalidated explicitly by admin mutations
+
+    Every entry carries the token_version it was loaded with. token_version only ever
+    goes up, so an entry is usable for a token whose version is <= the cached one:
+    equal means a hit, lower means the token was revoked (no DB lookup needed).
+    A token with a higher version means the entry is stale and is treated as a miss.
+
+    invalidate() bumps a per-user generation counter. A miss reads the generation
+    before loading the user from Mongo and set() stores the result only if the
+    generation is unchanged, so a load that raced an admin mutation cannot put the
+    old principal (old role, not yet disabled) back into the cache.
+    """
+
+    def __init__(self, local_ttl: float, redis_ttl: int, maxsize: int, client=redis_client):
+        self.client = client
+        self._set_if_current = client.register_script(SET_IF_CURRENT_LUA)
+        self.local = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "stale_sets": 0,
+            "redis_errors": 0
+        }
+
+    def _key(self, email: str) -> str:
+        return f"{REDIS_KEY_PREFIX}{email}"
+
+    def _generation_key(self, email: str) -> str:
+        return f"{GENERATION_KEY_PREFIX}{email}"
+
+    async def get(self, email: str, token_version: int) -> dict | None:
+        entry = self.local.get(email)
+        if entry is not None and entry["token_version"] >= token_version:
+            self.stats["local_hits"] += 1
+            return entry
+
+        try:
+            raw = await self.client.get(self._key(email))
+        except Exception as e:
+            # fail-open -> fall back to Mongo
+            self.stats["redis_errors"] += 1
+            logger.error("Redis principal cache read failed", exc_info=e)
+            raw = None
+
+        if raw:
+            entry = json.loads(raw)
+            if entry["token_version"] >= token_version:
+                self.local.set(email, entry)
+                self.stats["redis_hits"] += 1
+                return entry
+
+        self.stats["misses"] += 1
+        return None
+
+    async def generation(self, email: str) -> str | None:
+        """
+        Read before loading the user on a miss and pass to set().
+        None if Redis is unavailable.
+        """
+        try:
+            return await self.client.get(self._generation_key(email)) or "0"
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.error("Redis principal generation read failed", exc_info=e)
+            return None
+
+    async def set(self, email: str, principal: dict, generation: str | None):
+        """
+        Caches a principal loaded after generation() returned `generation`;
+        dropped if the user was invalidated in between.
+        """
+        if generation is None:
+            # Redis down: invalidations cannot be seen either, keep it local (short TTL)
+            self.local.set(email, principal)
+            return
+        try:
+            stored = await self._set_if_current(
+                keys=[self._key(email), self._generation_key(email)],
+                args=[generation, json.dumps(principal), self.redis_ttl]
+            )
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.error("Redis principal cache write failed", exc_info=e)
+            return
+        if not stored:
+            self.stats["stale_sets"] += 1
+            logger.debug(f"Principal for {email} changed while loading, not cached")
+            return
+        self.local.set(email, principal)
+
+    async def invalidate(self, email: str):
+        """
+        Drop the principal from both tiers. Call after any write that changes
+        role, restaurant_ids, token_version or disabled.
+        """
+        self.local.pop(email)
+        self.stats["invalidations"] += 1
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(self._key(email))
+                pipe.incr(self._generation_key(email))
+                pipe.expire(self._generation_key(email), GENERATION_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.error("Redis principal cache invalidation failed", exc_info=e)
+        logger.debug(f"Principal cache invalidated for {email}")
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["local_hits"] + self.stats["redis_hits"] + self.stats["misses"]
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        return {
+            **self.stats,
+            "local_size": len(self.local),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+principal_cache = PrincipalCache(
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL_SECONDS,
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,242 @@
+# core/rate_limit_engine.py
+import asyncio
+import time
+from typing import NamedTuple
+from db.redis_client import redis_client
+from utils.logger import get_logger
+
+logger = get_logger("RateLimitEngine")
+
+# Every script returns {allowed (0/1), remaining, reset_ms} in one round trip.
+# With force=1 the cost is recorded even when it exceeds the limit; the hybrid
+# limiter uses this to report usage it has already admitted locally.
+
+FIXED_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local current = redis.call('INCRBY', KEYS[1], cost)
+if current == cost then
+    redis.call('PEXPIRE', KEYS[1], window)
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+    ttl = window
+end
+if current > limit then
+    return {0, 0, ttl}
+end
+return {1, limit - current, ttl}
+"""
+
+# Sliding-window counter: the previous window is weighted by how much of it
+# still overlaps the sliding window, which removes the 2x burst at boundaries.
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local force = ARGV[5] == '1'
+local weighted = previous * (window - elapsed) / window + current
+local reset = window - elapsed
+local allowed = 1
+if weighted + cost > limit then
+    if not force then
+        return {0, math.max(0, math.floor(limit - weighted)), reset}
+    end
+    allowed = 0
+end
+current = redis.call('INCRBY', KEYS[1], cost)
+if current == cost then
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {allowed, math.max(0, math.floor(limit - weighted - cost)), reset}
+"""
+
+# Token bucket: capacity = limit, refilled continuously at limit / window.
+# reset_ms is the time until the bucket is full again (allowed) or until
+# enough tokens are available for this request (denied).
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local force = ARGV[5] == '1'
+local rate = capacity / window
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+elseif force then
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], window)
+local reset
+if allowed == 1 then
+    reset = math.ceil((capacity - tokens) / rate)
+else
+    reset = math.ceil((cost - tokens) / rate)
+end
+return {allowed, math.max(0, math.floor(tokens)), reset}
+"""
+
+_SCRIPTS = {
+    "fixed_window": FIXED_WINDOW_LUA,
+    "sliding_window": SLIDING_WINDOW_LUA,
+    "token_bucket": TOKEN_BUCKET_LUA
+}
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_ms: int
+
+
+class RedisRateLimiter:
+    """
+    Atomic rate limiter: one EVALSHA per request (redis-py falls back to EVAL
+    and caches the script if the server does not know the SHA yet).
+    """
+    ALGORITHMS = tuple(_SCRIPTS)
+
+    def __init__(self, client=redis_client, algorithm: str = "sliding_window", prefix: str = "rate"):
+        if algorithm not in _SCRIPTS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.prefix = prefix
+        self._script = client.register_script(_SCRIPTS[algorithm])
+
+    def _keys_and_args(self, identity: str, limit: int, window_ms: int, cost: int, now_ms: int, force: int):
+        if self.algorithm == "token_bucket":
+            return [f"{self.prefix}:tb:{identity}"], [limit, window_ms, now_ms, cost, force]
+        window_index = now_ms // window_ms
+        current_key = f"{self.prefix}:{identity}:{window_index}"
+        if self.algorithm == "fixed_window":
+            return [current_key], [limit, window_ms, cost]
+        previous_key = f"{self.prefix}:{identity}:{window_index - 1}"
+        elapsed = now_ms - window_index * window_ms
+        return [current_key, previous_key], [limit, window_ms, elapsed, cost, force]
+
+    async def hit(self, identity: str, limit: int, window_seconds: int, cost: int = 1, force: bool = False) -> RateLimitResult:
+        now_ms = int(time.time() * 1000)
+        keys, args = self._keys_and_args(identity, limit, window_seconds * 1000, cost, now_ms, 1 if force else 0)
+        allowed, remaining, reset_ms = await self._script(keys=keys, args=args)
+        return RateLimitResult(bool(allowed), limit, int(remaining), int(reset_ms))
+
+
+class _LocalState:
+    __slots__ = ("limit", "window", "used", "pending", "synced_at", "reset_ms")
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.used = 0          # global usage seen at the last sync
+        self.pending = 0       # cost admitted locally, not yet reported to Redis
+        self.synced_at = 0.0
+        self.reset_ms = 0
+
+
+class HybridRateLimiter:
+    """
+    Per-worker local admission with batched reconciliation against Redis.
+
+    Each worker keeps, per identity, the global usage it saw at the last sync plus
+    the cost it has admitted locally since then. Requests are admitted locally while
+    that total stays under limit * (1 - error_bound); usage is reported to Redis
+    (force=True, one script call) every `sync_every` local admissions and by a
+    background flush every `sync_interval_ms`. Identities near their limit, unknown
+    identities and estimates older than `max_staleness_ms` go through the strict
+    Redis path on every request.
+
+    Overshoot is bounded by roughly workers * sync_every per identity; keep that
+    below limit * error_bound for limits to stay effectively global.
+    """
+
+    def __init__(
+        self,
+        limiter: RedisRateLimiter,
+        error_bound: float = 0.1,
+        sync_every: int = 10,
+        sync_interval_ms: int = 100,
+        max_staleness_ms: int = 1000
+    ):
+        self.limiter = limiter
+        self.algorithm = limiter.algorithm
+        self.error_bound = error_bound
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval_ms / 1000
+        self.max_staleness = max_staleness_ms / 1000
+        self._states: dict[str, _LocalState] = {}
+        self._flush_task = None
+        self.stats = {"local": 0, "strict": 0, "flushes": 0, "flush_errors": 0}
+
+    def _ensure_flusher(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _apply(self, state: _LocalState, result: RateLimitResult):
+        state.used = max(0, result.limit - result.remaining)
+        state.reset_ms = result.reset_ms
+        state.synced_at = time.monotonic()
+
+    async def _flush(self, identity: str, state: _LocalState):
+        pending, state.pending = state.pending, 0
+        if pending == 0:
+            return
+        try:
+            result = await self.limiter.hit(identity, state.limit, state.window, cost=pending, force=True)
+            self._apply(state, result)
+            self.stats["flushes"] += 1
+        except Exception as e:
+            # keep the usage and retry on the next flush
+            state.pending += pending
+            self.stats["flush_errors"] += 1
+            logger.error("Hybrid rate limit flush failed", exc_info=e)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            now = time.monotonic()
+            for identity, state in list(self._states.items()):
+                if state.pending:
+                    await self._flush(identity, state)
+                elif now - state.synced_at > max(state.window, self.max_staleness):
+                    # idle identity, nothing to report
+                    self._states.pop(identity, None)
+
+    async def hit(self, identity: str, limit: int, window_seconds: int, cost: int = 1) -> RateLimitResult:
+        self._ensure_flusher()
+        now = time.monotonic()
+        state = self._states.get(identity)
+        if state is None or state.limit != limit or state.window != window_seconds:
+            state = self._states[identity] = _LocalState(limit, window_seconds)
+
+        fresh = now - state.synced_at <= self.max_staleness
+        if fresh and state.used + state.pending + cost <= limit * (1 - self.error_bound):
+            state.pending += cost
+            self.stats["local"] += 1
+            elapsed_ms = int((now - state.synced_at) * 1000)
+            result = RateLimitResult(True, limit, int(limit - state.used - state.pending), max(0, state.reset_ms - elapsed_ms))
+            if state.pending >= self.sync_every:
+                await self._flush(identity, state)
+            return result
+
+        # strict path: report what was admitted locally, then check this request in Redis
+        self.stats["strict"] += 1
+        await self._flush(identity, state)
+        result = await self.limiter.hit(identity, limit, window_seconds, cost=cost)
+        self._apply(state, result)
+        return result
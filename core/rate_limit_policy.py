@@ -0,0 +1,127 @@
+# core/rate_limit_policy.py
+from typing import NamedTuple
+from core.route_table import RouteTable
+
+API_V1 = "/api/v1"
+
+ROLES = ("anonymous", "user", "restaurant_admin", "superadmin")
+
+# Budget per bucket and role: (requests, window_seconds).
+# "*" applies to every role not listed explicitly.
+RATE_LIMIT_BUCKETS = {
+    # bcrypt / email backed endpoints, keyed per client
+    "auth": {"*": (10, 60)},
+    # public browsing (menus, restaurant listings), mostly cheap reads
+    "browse": {"anonymous": (120, 60), "*": (300, 60)},
+    "account": {"*": (60, 60)},
+    "orders": {"anonymous": (10, 60), "user": (60, 60), "restaurant_admin": (300, 60), "superadmin": (600, 60)},
+    "restaurant_admin": {"restaurant_admin": (300, 60), "superadmin": (600, 60), "*": (30, 60)},
+    "admin": {"superadmin": (600, 60), "*": (30, 60)}
+}
+
+# (method, route template, bucket, cost). bucket None = not rate limited.
+# The cost is what one request consumes from the bucket, so expensive
+# writes drain a role's budget faster than cached reads.
+RATE_LIMIT_ROUTES = [
+    ("GET", "/health", None, 0),
+    ("GET", f"{API_V1}/", None, 0),
+    ("GET", "/docs", None, 0),
+    ("GET", "/docs/oauth2-redirect", None, 0),
+    ("GET", "/redoc", None, 0),
+    ("GET", "/openapi.json", None, 0),
+
+    ("POST", f"{API_V1}/auth/signup", "auth", 2),
+    ("GET", f"{API_V1}/auth/verify-email", "auth", 1),
+    ("POST", f"{API_V1}/auth/resend-verification", "auth", 2),
+    ("POST", f"{API_V1}/auth/login", "auth", 1),
+    ("POST", f"{API_V1}/auth/refresh", "auth", 1),
+    ("POST", f"{API_V1}/auth/forgot-password", "auth", 2),
+    ("POST", f"{API_V1}/auth/reset-password", "auth", 2),
+    ("POST", f"{API_V1}/auth/logout", "account", 1),
+    ("POST", f"{API_V1}/auth/logout-all", "account", 1),
+    ("GET", f"{API_V1}/auth/sessions", "account", 1),
+    ("DELETE", f"{API_V1}/auth/session/{{session_id}}", "account", 1),
+    ("GET", f"{API_V1}/users/user", "account", 1),
+
+    ("GET", f"{API_V1}/restaurants/", "browse", 1),
+    ("GET", f"{API_V1}/restaurants/search", "browse", 2),
+    ("GET", f"{API_V1}/restaurants/autocomplete", "browse", 1),
+    ("GET", f"{API_V1}/restaurants/{{restaurant_id}}", "browse", 1),
+    ("GET", f"{API_V1}/menu/search", "browse", 2),
+    ("GET", f"{API_V1}/menu/{{restaurant_id}}", "browse", 1),
+
+    ("GET", f"{API_V1}/orders/", "orders", 1),
+    ("GET", f"{API_V1}/orders/search", "orders", 1),
+    ("GET", f"{API_V1}/orders/history", "orders", 1),
+    ("GET", f"{API_V1}/orders/events", "orders", 1),
+    ("GET", f"{API_V1}/orders/pending/{{order_id}}", "orders", 1),
+    ("GET", f"{API_V1}/orders/{{order_id}}", "orders", 1),
+    ("POST", f"{API_V1}/orders/", "orders", 5),
+    ("PUT", f"{API_V1}/orders/{{order_id}}", "orders", 3),
+    ("DELETE", f"{API_V1}/orders/{{order_id}}", "orders", 3),
+    ("POST", f"{API_V1}/orders/{{order_id}}/cancel", "orders", 3),
+    ("PATCH", f"{API_V1}/orders/{{order_id}}/status", "orders", 2),
+    ("PATCH", f"{API_V1}/orders/{{restaurant_id}}/{{order_id}}/status", "orders", 2),
+
+    ("GET", f"{API_V1}/restaurant/orders", "restaurant_admin", 1),
+    ("GET", f"{API_V1}/restaurant/orders/events", "restaurant_admin", 1),
+    ("GET", f"{API_V1}/restaurant/orders/notifications", "restaurant_admin", 1),
+    ("PATCH", f"{API_V1}/restaurant/orders/{{order_id}}/status", "restaurant_admin", 2),
+    ("POST", f"{API_V1}/restaurants/", "restaurant_admin", 5),
+    ("PATCH", f"{API_V1}/restaurants/{{restaurant_id}}", "restaurant_admin", 3),
+    ("POST", f"{API_V1}/restaurants/{{restaurant_id}}/disable", "restaurant_admin", 3),
+    ("POST", f"{API_V1}/menu/{{restaurant_id}}", "restaurant_admin", 3),
+    ("PATCH", f"{API_V1}/menu/{{restaurant_id}}/{{item_id}}", "restaurant_admin", 3),
+    ("DELETE", f"{API_V1}/menu/{{restaurant_id}}/{{item_id}}", "restaurant_admin", 3),
+
+    ("*", f"{API_V1}/admin/users", "admin", 1),
+    ("*", f"{API_V1}/admin/users/{{user_id}}", "admin", 1),
+    ("*", f"{API_V1}/admin/users/{{user_id}}/{{action}}", "admin", 2),
+    ("GET", f"{API_V1}/admin/audit-logs", "admin", 2),
+    ("GET", f"{API_V1}/admin/metrics", "admin", 1)
+]
+
+
+class RateLimitPolicy(NamedTuple):
+    bucket: str
+    limit: int
+    window: int
+    cost: int
+
+
+class PolicyTable:
+    """
+    Resolves (method, path, role) to a RateLimitPolicy, or None for exempt routes.
+    Everything is resolved at construction: each route maps to a ready-made
+    per-role dict, so a lookup is one trie walk plus one dict access.
+    Routes not in the table fall back to the `default` budget.
+    """
+
+    def __init__(self, default_limit: int, default_window: int, buckets=RATE_LIMIT_BUCKETS, routes=RATE_LIMIT_ROUTES):
+        self._default = {role: RateLimitPolicy("default", default_limit, default_window, 1) for role in ROLES}
+        self._table = RouteTable()
+        for method, template, bucket, cost in routes:
+            if bucket is None:
+                self._table.add(method, template, None)
+                continue
+            budgets = buckets[bucket]
+            per_role = {}
+            for role in ROLES:
+                limit, window = budgets.get(role) or budgets["*"]
+                per_role[role] = RateLimitPolicy(bucket, limit, window, cost)
+            self._table.add(method, template, per_role)
+
+    def route(self, method: str, path: str) -> dict[str, RateLimitPolicy] | None:
+        """Per-role policies for a request, None if the route is exempt."""
+        return self._table.match(method, path, self._default)
+
+    def lookup(self, method: str, path: str, role: str | None) -> RateLimitPolicy | None:
+        per_role = self.route(method, path)
+        if per_role is None:
+            return None
+        return for_role(per_role, role)
+
+
+def for_role(per_role: dict[str, RateLimitPolicy], role: str | None) -> RateLimitPolicy:
+    # unknown roles are treated like regular users
+    return per_role.get(role or "anonymous") or per_role["user"]
@@ -1,76 +1,110 @@
-import time
+import math
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from jose import jwt, JWTError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from db.redis_client import redis_client
+from core.rate_limit_engine import RedisRateLimiter, HybridRateLimiter, RateLimitResult
+from core.rate_limit_policy import PolicyTable, for_role
 from utils.logger import get_logger
+from utils.jwt_handler import get_request_claims
 import os
 from settings.config import settings
 logger = get_logger("RedisRateLimit")
 
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
-
-class RedisRateLimitMiddleware(BaseHTTPMiddleware):
+class RedisRateLimitMiddleware:
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         requests: int = 100,
-        window_seconds: int = 60
+        window_seconds: int = 60,
+        algorithm: str = "sliding_window",
+        mode: str = "strict"
     ):
-        super().__init__(app)
+        self.app = app
         self.requests = requests
         self.window = window_seconds
-        self.exclude_paths = {
-            "/auth/login",
-            "/docs",
-            "/openapi.json"
-        }
+        self.limiter = RedisRateLimiter(redis_client, algorithm=algorithm)
+        if mode == "hybrid":
+            self.limiter = HybridRateLimiter(
+                self.limiter,
+                error_bound=settings.RATE_LIMIT_HYBRID_ERROR_BOUND,
+                sync_every=settings.RATE_LIMIT_HYBRID_SYNC_EVERY,
+                sync_interval_ms=settings.RATE_LIMIT_HYBRID_SYNC_INTERVAL_MS
+            )
+        elif mode != "strict":
+            raise ValueError(f"Unknown rate limit mode: {mode}")
+        # per-route / per-role budgets; unlisted routes get requests/window_seconds
+        self.policies = PolicyTable(requests, window_seconds)
 
-    def _get_identity(self, request: Request) -> str:
+    def _get_identity(self, request: Request) -> tuple[str, str]:
         """
-        Priority:
+        Returns (identity, role). Identity priority:
         1. JWT email (logged-in user)
         2. Client IP
         """
-        auth = request.headers.get("Authorization")
-        if not auth:
-            return request.client.host
-
-        try:
-            token = auth.split(" ")[1]
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload.get("sub", request.client.host)
-        except JWTError:
-            return request.client.host
+        # verified claims are stored on request.state and reused by get_current_user
+        claims = get_request_claims(request)
+        if not claims:
+            return request.client.host, "anonymous"
+        return claims.get("sub", request.client.host), claims.get("role") or "user"
 
-    async def dispatch(self, request: Request, call_next):
-        identity = self._get_identity(request)
-        now = int(time.time())
-        window_key = now // self.window
-        redis_key = f"rate:{identity}:{window_key}"
+    def _headers(self, result: RateLimitResult) -> dict:
+        reset_seconds = str(max(1, math.ceil(result.reset_ms / 1000)))
+        headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": reset_seconds
+        }
+        if not result.allowed:
+            headers["Retry-After"] = reset_seconds
+        return headers
 
-        try:
-            current_count = await redis_client.incr(redis_key)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            if current_count == 1:
-                await redis_client.expire(redis_key, self.window)
+        request = Request(scope)
+        # exempt routes skip token verification and Redis entirely
+        per_role = self.policies.route(request.method, request.url.path)
+        if per_role is None:
+            await self.app(scope, receive, send)
+            return
 
-            if current_count > self.requests:
-                logger.warning(
-                    "Rate limit exceeded",
-                    extra={"identity": identity, "count": current_count}
-                )
-                # 🔥 IMPORTANT: do NOT catch this
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Too many requests, please slow down"}
-                )
+        identity, role = self._get_identity(request)
+        policy = for_role(per_role, role)
+        try:
+            # single round trip: check + increment + expiry run atomically in Redis
+            result = await self.limiter.hit(f"{policy.bucket}:{identity}", policy.limit, policy.window, cost=policy.cost)
         except Exception as e:
-            # ✅ Only Redis/network errors
+            # only the Redis call is guarded: fail open and allow the request
             logger.error("Redis rate limit error", exc_info=e)
-            # fail-open → allow request
+            result = None
+
+        if result is not None and not result.allowed:
+            logger.warning(
+                "Rate limit exceeded",
+                extra={"identity": identity, "bucket": policy.bucket, "algorithm": self.limiter.algorithm}
+            )
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please slow down"},
+                headers=self._headers(result)
+            )
+            await response(scope, receive, send)
+            return
+
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = self._headers(result)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
 
-        return await call_next(request)
+        await self.app(scope, receive, send_wrapper)
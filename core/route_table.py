@@ -0,0 +1,59 @@
+# core/route_table.py
+from typing import Any
+
+_MISSING = object()
+PARAM = "{}"
+
+
+class _Node:
+    __slots__ = ("children", "methods")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.methods: dict[str, Any] = {}
+
+
+def _segments(path: str) -> list[str]:
+    path = path.strip("/")
+    return path.split("/") if path else []
+
+
+class RouteTable:
+    """
+    Precompiled (method, path) -> value lookup for route templates such as
+    "/api/v1/orders/{order_id}/status". Templates are compiled into a segment
+    trie once; a lookup is one dict access per path segment regardless of how
+    many routes are registered. Static segments win over path parameters, and
+    "*" as method matches any method. Trailing slashes are ignored.
+    """
+
+    def __init__(self, routes=()):
+        self._root = _Node()
+        for method, template, value in routes:
+            self.add(method, template, value)
+
+    def add(self, method: str, template: str, value):
+        node = self._root
+        for segment in _segments(template):
+            key = PARAM if segment.startswith("{") and segment.endswith("}") else segment
+            node = node.children.setdefault(key, _Node())
+        node.methods[method.upper()] = value
+
+    def match(self, method: str, path: str, default=None):
+        found = self._walk(self._root, _segments(path), 0, method.upper())
+        return default if found is _MISSING else found
+
+    def _walk(self, node: _Node, segments: list[str], i: int, method: str):
+        if i == len(segments):
+            if method in node.methods:
+                return node.methods[method]
+            return node.methods.get("*", _MISSING)
+        child = node.children.get(segments[i])
+        if child is not None:
+            found = self._walk(child, segments, i + 1, method)
+            if found is not _MISSING:
+                return found
+        child = node.children.get(PARAM)
+        if child is not None:
+            return self._walk(child, segments, i + 1, method)
+        return _MISSING
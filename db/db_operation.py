@@ -5,19 +5,6 @@ import asyncio
 
 logger = get_logger("DB_OPERATION")
 
-async def create_indexes():
-    orders_collection = mongo_conn.orders_collection
-    await orders_collection.create_index("user_email")
-    await orders_collection.create_index("status")
-    await orders_collection.create_index("restaurant_id")
-    await mongo_conn.restaurants_collection.create_index("slug", unique=True)
-    await mongo_conn.restaurants_collection.create_index("owner_email")
-    # inside your startup create_indexes() or similar
-    await mongo_conn.menu_items.create_index([("restaurant_id", 1), ("name", 1)], unique=True)
-    await mongo_conn.menu_items.create_index("restaurant_id")
-
-    logger.info("Indexes created")
-
 class MongoConnection:
     def __init__(self):
         logger.info("Initializing MongoDB Connection")
@@ -30,6 +17,7 @@ class MongoConnection:
         self.audit_logs = self.db["audit_logs"]
         self.orders_collection = self.db["orders"]
         self.refresh_tokens_collection = self.db["refresh_tokens"]
+        self.email_outbox = self.db["email_outbox"]
    
     async def connect(self):
         try:
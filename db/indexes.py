@@ -0,0 +1,148 @@
+# db/indexes.py
+from typing import NamedTuple
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from db.db_operation import mongo_conn
+from utils.logger import get_logger
+
+logger = get_logger("DB_INDEXES")
+
+
+class IndexSpec(NamedTuple):
+    keys: list[tuple[str, int | str]]
+    options: dict = {}
+
+    @property
+    def name(self) -> str:
+        # same naming as MongoDB's default, so indexes created by hand still match
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+# Declared indexes per collection. Anything in the database that is not listed
+# here is reported as extra; nothing is ever dropped automatically.
+INDEX_SPECS: dict[str, list[IndexSpec]] = {
+    "users": [
+        IndexSpec([("email", ASCENDING)], {"unique": True}),
+        IndexSpec([("reset_password.token_hash", ASCENDING)], {"sparse": True})
+    ],
+    "orders": [
+        IndexSpec([("user_email", ASCENDING)]),
+        IndexSpec([("status", ASCENDING)]),
+        IndexSpec([("restaurant_id", ASCENDING)]),
+        # order history sorts by (created_at, _id); _id makes the keyset cursor unique
+        IndexSpec([("user_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("user_email", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # restaurant dashboard, with and without a status filter
+        IndexSpec([("restaurant_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("restaurant_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    ],
+    "restaurants": [
+        IndexSpec([("slug", ASCENDING)], {"unique": True}),
+        IndexSpec([("owner_email", ASCENDING)]),
+        # delta refresh of the autocomplete index
+        IndexSpec([("updated_at", ASCENDING)])
+    ],
+    "menu_items": [
+        # also serves lookups by restaurant_id alone
+        IndexSpec([("restaurant_id", ASCENDING), ("name", ASCENDING)], {"unique": True}),
+        # menu search ($text); name matches rank above description matches
+        IndexSpec([("name", TEXT), ("description", TEXT)], {"weights": {"name": 10, "description": 2}, "default_language": "english"}),
+        # prefix search: anchored regex on the normalized name, across or within restaurants
+        IndexSpec([("name_key", ASCENDING)]),
+        IndexSpec([("restaurant_id", ASCENDING), ("name_key", ASCENDING)])
+    ],
+    "refresh_tokens": [
+        IndexSpec([("token_hash", ASCENDING)], {"unique": True}),
+        IndexSpec([("user_email", ASCENDING)]),
+        # expired sessions are removed by the TTL monitor
+        IndexSpec([("expires_at", ASCENDING)], {"expireAfterSeconds": 0})
+    ],
+    "audit_logs": [
+        # admin audit browsing: newest first, optionally filtered, keyset on (timestamp, _id)
+        IndexSpec([("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("actor_email", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("resource_type", ASCENDING), ("resource_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        # resource_id without resource_type (ids are unique enough on their own)
+        IndexSpec([("resource_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("action", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)])
+    ],
+    "email_outbox": [
+        IndexSpec([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        IndexSpec([("status", ASCENDING), ("locked_at", ASCENDING)]),
+        # claim_batch reads its batch back by claim token
+        IndexSpec([("claim_token", ASCENDING)], {"sparse": True})
+    ]
+}
+
+# options that change index semantics; a mismatch on any of these is reported
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+async def _usage(collection) -> dict[str, int]:
+    """Index name -> number of operations since the server (re)started."""
+    usage = {}
+    try:
+        async for stat in collection.aggregate([{"$indexStats": {}}]):
+            usage[stat["name"]] = stat["accesses"]["ops"]
+    except Exception as e:
+        logger.warning(f"$indexStats not available for {collection.name}: {e}")
+    return usage
+
+
+async def sync_collection(name: str, specs: list[IndexSpec], dry_run: bool = False, drop_extra: bool = False) -> dict:
+    collection = mongo_conn.db[name]
+    existing = {index["name"]: index async for index in collection.list_indexes()}
+    wanted = {spec.name: spec for spec in specs}
+    report = {"missing": [], "extra": [], "mismatched": [], "unused": []}
+
+    for index_name, spec in wanted.items():
+        index = existing.get(index_name)
+        if index is None:
+            report["missing"].append(index_name)
+            continue
+        for option in _COMPARED_OPTIONS:
+            if index.get(option) != spec.options.get(option):
+                report["mismatched"].append(index_name)
+                logger.warning(
+                    f"Index {name}.{index_name} differs from spec on {option}: "
+                    f"{index.get(option)!r} != {spec.options.get(option)!r} (drop it to rebuild)"
+                )
+                break
+
+    report["extra"] = [index_name for index_name in existing if index_name != "_id_" and index_name not in wanted]
+    for index_name in report["extra"]:
+        logger.warning(f"Index {name}.{index_name} is not in INDEX_SPECS")
+
+    usage = await _usage(collection)
+    report["unused"] = [index_name for index_name, ops in usage.items() if ops == 0 and index_name != "_id_"]
+    for index_name in report["unused"]:
+        logger.warning(f"Index {name}.{index_name} has not been used since the server started")
+
+    if dry_run:
+        return report
+
+    if report["missing"]:
+        models = [IndexModel(wanted[n].keys, name=n, **wanted[n].options) for n in report["missing"]]
+        await collection.create_indexes(models)
+        logger.info(f"Created indexes on {name}: {', '.join(report['missing'])}")
+
+    if drop_extra:
+        for index_name in report["extra"]:
+            await collection.drop_index(index_name)
+            logger.info(f"Dropped index {name}.{index_name}")
+    return report
+
+
+async def sync_indexes(dry_run: bool = False, drop_extra: bool = False) -> dict:
+    """
+    Diffs INDEX_SPECS against list_indexes() for every collection and builds
+    what is missing. One failing collection does not stop the others.
+    """
+    reports = {}
+    for name, specs in INDEX_SPECS.items():
+        try:
+            reports[name] = await sync_collection(name, specs, dry_run=dry_run, drop_extra=drop_extra)
+        except Exception as e:
+            logger.error(f"Index sync failed for {name}", exc_info=e)
+            reports[name] = {"error": str(e)}
+    logger.info("Index sync finished")
+    return reports
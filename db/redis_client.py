@@ -1,5 +1,13 @@
-import redis.asyncio as redis
+import asyncio
+import json
 import os
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from settings.config import settings
+from utils.fanout import Fanout, Subscription
+from utils.logger import get_logger
+
+logger = get_logger("Redis_Client")
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
@@ -7,3 +15,135 @@ redis_client = redis.from_url(
     REDIS_URL,
     decode_responses=True
 )
+
+
+class RedisEventBus:
+    """
+    Cross-worker publish/subscribe over Redis pub/sub.
+
+    Publishers PUBLISH compact JSON events to a channel. Each worker keeps one pub/sub
+    connection, SUBSCRIBEd only to the channels its local subscribers need, and a single
+    reader task that fans every message out to them through bounded queues
+    (utils.fanout). A slow subscriber is disconnected when its queue fills up, so it
+    never holds up the reader or the other subscribers.
+    """
+
+    def __init__(self, client=redis_client, queue_size: int = 100):
+        self.client = client
+        self.fanout = Fanout(queue_size=queue_size)
+        self._pubsub = None
+        self._task = None
+        self._channels: dict[str, int] = {}  # channel -> local subscriber count
+        self.stats = {"published": 0, "publish_errors": 0, "received": 0, "delivered": 0, "overflows": 0, "read_errors": 0}
+
+    async def publish(self, channel: str, event: dict, stream: str | None = None, stream_fields: dict | None = None, maxlen: int | None = None) -> int:
+        """
+        Returns the number of workers that received it (0 if Redis is unavailable).
+        With `stream`, `stream_fields` are also XADDed to that stream (trimmed to about
+        `maxlen` entries) in the same round trip.
+        """
+        try:
+            if stream is None:
+                receivers = await self.client.publish(channel, json.dumps(event, separators=(",", ":")))
+            else:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    pipe.xadd(stream, stream_fields, maxlen=maxlen, approximate=True)
+                    pipe.publish(channel, json.dumps(event, separators=(",", ":")))
+                    _, receivers = await pipe.execute()
+        except RedisError as e:
+            self.stats["publish_errors"] += 1
+            logger.error(f"Publish to {channel} failed", exc_info=e)
+            return 0
+        self.stats["published"] += 1
+        return receivers
+
+    async def publish_many(self, events: list[tuple[str, dict, dict | None]], stream: str | None = None, maxlen: int | None = None) -> int:
+        """
+        Batch form of publish for (channel, event, stream_fields) tuples: one pipeline,
+        one round trip for all of them. Returns the total number of receivers.
+        """
+        if not events:
+            return 0
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for channel, event, stream_fields in events:
+                    if stream is not None:
+                        pipe.xadd(stream, stream_fields, maxlen=maxlen, approximate=True)
+                    pipe.publish(channel, json.dumps(event, separators=(",", ":")))
+                results = await pipe.execute()
+        except RedisError as e:
+            self.stats["publish_errors"] += len(events)
+            logger.error(f"Publish of {len(events)} events failed", exc_info=e)
+            return 0
+        self.stats["published"] += len(events)
+        return sum(results[1::2] if stream is not None else results)
+
+    async def subscribe(self, channels: list[str]) -> Subscription:
+        sub = self.fanout.subscribe(channels)
+        new = [c for c in channels if not self._channels.get(c)]
+        for channel in channels:
+            self._channels[channel] = self._channels.get(channel, 0) + 1
+        if self._pubsub is None:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        if new:
+            await self._pubsub.subscribe(*new)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._read_loop())
+        return sub
+
+    async def unsubscribe(self, sub: Subscription):
+        if sub.overflowed:
+            self.stats["overflows"] += 1
+        self.fanout.unsubscribe(sub)
+        gone = []
+        for channel in sub.keys:
+            self._channels[channel] -= 1
+            if not self._channels[channel]:
+                del self._channels[channel]
+                gone.append(channel)
+        if gone and self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(*gone)
+            except RedisError as e:
+                # re-established connections only resubscribe to current channels
+                logger.error("Unsubscribe failed", exc_info=e)
+
+    async def _read_loop(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except RedisError as e:
+                # redis-py reconnects and resubscribes on the next read
+                self.stats["read_errors"] += 1
+                logger.error("Event bus read failed", exc_info=e)
+                await asyncio.sleep(1)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            self.stats["received"] += 1
+            try:
+                event = json.loads(message["data"])
+            except ValueError:
+                logger.error(f"Dropping malformed event on {message['channel']}")
+                continue
+            self.stats["delivered"] += self.fanout.publish([message["channel"]], event)
+
+    async def close(self):
+        self.fanout.close_all()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        self._channels.clear()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "channels": len(self._channels), "subscribers": len(self.fanout)}
+
+
+event_bus = RedisEventBus(redis_client, queue_size=settings.EVENT_BUS_QUEUE_SIZE)
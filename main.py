@@ -1,11 +1,18 @@
 from fastapi import FastAPI
 from settings.config import settings
-from db.db_operation import create_indexes
+import asyncio
+from db.indexes import sync_indexes
 from utils.logger import get_logger
+from utils.hash import shutdown_hash_pool
+from services.audit_writer import audit_writer
+from services.restaurant_autocomplete import restaurant_autocomplete
+from services.order_stream import order_stream_hub
+from db.redis_client import event_bus
 from routes import order_route, user_routes, auth, admin_routes, restaurant_routes, menu_routes, restaurant_order_routes
 # from core.middleware import ExceptionHandlerMiddleware
 from core.rate_limiter import RedisRateLimitMiddleware
-from core.middleware import request_id_middleware
+from core.middleware import RequestIDMiddleware
+from core.idempotency import IdempotencyMiddleware
 
 logger = get_logger("main")
 
@@ -30,12 +37,28 @@ async def health_check():
     }
 @app.on_event("startup")
 async def startup_event():
-    await create_indexes()
-app.middleware("http")(request_id_middleware)
+    # index builds run in the background so startup is not blocked on large collections
+    app.state.index_sync = asyncio.create_task(sync_indexes())
+    # loads the restaurant autocomplete index, then keeps it in sync
+    restaurant_autocomplete.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # write out buffered audit entries before the worker exits
+    await audit_writer.close()
+    await restaurant_autocomplete.stop()
+    await order_stream_hub.close()
+    await event_bus.close()
+    shutdown_hash_pool()
+# innermost, so stored responses do not carry request ids or rate limit headers
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(RequestIDMiddleware)
 app.add_middleware(
     RedisRateLimitMiddleware,
     requests=10,        # 60 requests
-    window_seconds=60   # per minute
+    window_seconds=60,  # per minute
+    algorithm=settings.RATE_LIMIT_ALGORITHM,
+    mode=settings.RATE_LIMIT_MODE
 )
 # app.add_middleware(ExceptionHandlerMiddleware)
 app.include_router(auth.router, prefix=API_V1)
@@ -28,8 +28,14 @@ class PaginatedOrderResponse(BaseModel):
     has_next: bool
     has_prev: bool
 
+class OrderHistoryPage(BaseModel):
+    orders: List[OrderOut]
+    next_cursor: Optional[str] = None
+    total_orders: Optional[int] = None
+
 class RestaurantOrderOut(BaseModel):
     id: str
+    user_email: Optional[str] = None
     restaurant_id: str
     items: List[OrderItem]
     total_amount: float
@@ -38,5 +44,11 @@ class RestaurantOrderOut(BaseModel):
     updated_at: Optional[datetime] = None
     updated_by: Optional[str] = None
 
+class OrderIngestStatus(BaseModel):
+    id: str
+    status: str  # queued | stored | failed
+    total_amount: Optional[float] = None
+    error: Optional[str] = None
+
 class OrderStatusUpdate(BaseModel):
     new_status: str
\ No newline at end of file
@@ -1,13 +1,20 @@
 # routes/admin_routes.py (skeleton)
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body, Response
 from core.authorization import require_role
 from db.db_operation import mongo_conn
 from utils.logger import get_logger
 from pydantic import BaseModel
 from services.admin_service import promote_user_to_restaurant_admin, list_users, get_user_by_id, change_user_role, revoke_user_tokens, disable_user, enable_user, list_audit_logs
 from core.dependencies import get_current_user
+from core.principal_cache import principal_cache
+from utils.hash import hash_pool_stats
+from services.audit_writer import audit_writer
+from services.menu_cache import menu_cache
+from services.order_stream import order_stream_hub
+from db.redis_client import event_bus
 from models.admin import UserListItem, UserDetail, AuditItem, RoleChangeRequest, RevokePayload, EnablePayload
 from typing import List
+from datetime import datetime
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 logger = get_logger("Admin_Route")
@@ -16,11 +23,22 @@ class PromotePayload(BaseModel):
     restaurant_ids: list[str] = []
 
 @router.get("/users", response_model=List[UserListItem], dependencies=[Depends(require_role("superadmin"))])
-async def list_all_users(skip: int = Query(0, ge=0), limit: int = Query(50, le=200)):
+async def list_all_users(
+    response: Response,
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(50, ge=1, le=200)
+):
     """
-    List users (superadmin only). Pagination supported via skip & limit.
+    List users (superadmin only). The next page's cursor is returned in the X-Next-Cursor header.
     """
-    return await list_users(skip=skip, limit=limit)
+    try:
+        users, next_cursor = await list_users(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
 @router.get("/users/{user_id}", response_model=UserDetail, dependencies=[Depends(require_role("superadmin"))])
 async def api_get_user(user_id: str = Path(..., description="User ObjectId string")):
@@ -82,9 +100,50 @@ async def api_enable_user(user_id: str, payload: EnablePayload = Body(...), curr
         logger.exception("Error in api_enable_user")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
+@router.get("/metrics", dependencies=[Depends(require_role("superadmin"))])
+async def api_metrics():
+    """
+    In-process counters of this worker (each gunicorn worker reports its own).
+    """
+    return {
+        "principal_cache": principal_cache.get_stats(),
+        "hash_pool": hash_pool_stats(),
+        "audit_writer": audit_writer.get_stats(),
+        "menu_cache": menu_cache.get_stats(),
+        "order_stream": order_stream_hub.get_stats(),
+        "event_bus": event_bus.get_stats()
+    }
+
 @router.get("/audit-logs", response_model=list[AuditItem], dependencies=[Depends(require_role("superadmin"))])
-async def api_audit_logs(skip: int = Query(0, ge=0), limit: int = Query(50, le=200)):
-    return await list_audit_logs(skip=skip, limit=limit)
+async def api_audit_logs(
+    response: Response,
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    actor_email: str | None = Query(None),
+    resource_type: str | None = Query(None),
+    resource_id: str | None = Query(None),
+    action: str | None = Query(None),
+    since: datetime | None = Query(None, description="Inclusive lower bound on timestamp (UTC)"),
+    until: datetime | None = Query(None, description="Exclusive upper bound on timestamp (UTC)"),
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(50, ge=1, le=200)
+):
+    try:
+        items, next_cursor = await list_audit_logs(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            actor_email=actor_email,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            action=action,
+            since=since,
+            until=until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 # below code change and revoke token and roles based on email 
 
@@ -94,6 +153,7 @@ async def revoke_user_tokens_by_email(user_email: str, current_admin = Depends(r
     result = await users.update_one({"email": user_email}, {"$inc": {"token_version": 1}})
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await principal_cache.invalidate(user_email)
     logger.info(f"User tokens revoked by {current_admin.email} for {user_email}")
     return {"message": "User tokens revoked"}
 
@@ -5,16 +5,14 @@ from models.refresh_tokens import RefreshTokenRequest
 from db.db_operation import mongo_conn
 from pymongo.errors import PyMongoError
 from services.auth_service import forgot_password, reset_password
-from utils.email import send_verification_email
-from utils.hash import verify_password, hash_token
-from utils.jwt_handler import create_access_token, get_refresh_token_expiry
+from services.email_outbox import send_verification_email
+from utils.hash import verify_password_async
+from utils.jwt_handler import create_access_token
+from services.session_store import session_store, NOT_FOUND, REVOKED, REUSED, EXPIRED, SUPERSEDED
 from services.user_service import create_user, verify_user_email, resend_verification_email
 from utils.logger import get_logger
 import os
 from models.auth_models import ForgotPasswordRequest, ResetPasswordRequest
-from bson import ObjectId
-from datetime import datetime, timedelta
-import secrets
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,6 +41,8 @@ async def signup(user: UserCreate, background_tasks: BackgroundTasks):
             "message": "User created successfully. Please check your email to verify your account.",
             "email": user.email
         })
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Error during user signup: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -82,7 +82,6 @@ async def resend_verification(
 async def login(user: UserLogin, request: Request):
     logger.info(f"Login attempt for: {user.email}")
     users_collection = mongo_conn.users_collection
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
     db_user = await users_collection.find_one({"email": user.email})
     if not db_user:
         logger.warning(f"Login failed: user not found {user.email}")
@@ -94,24 +93,16 @@ async def login(user: UserLogin, request: Request):
     # Reason: user account is administratively disabled
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled. Contact support.")
     
-    if not verify_password(user.password, db_user["password"]):
+    if not await verify_password_async(user.password, db_user["password"]):
         logger.warning(f"Login failed: wrong password {user.email}")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
     access_token = create_access_token({"id": str(db_user["_id"]), "sub": db_user["email"], "role": db_user["role"], "token_version": db_user["token_version"], "restaurant_ids": db_user["restaurant_ids"]})
-    refresh_token = secrets.token_urlsafe(64)
-    token_hash = hash_token(refresh_token)
-    refresh_token_doc = {
-        "user_email": db_user["email"],
-        "token_hash": token_hash,
-        "created_at": datetime.utcnow(),
-        "expires_at": get_refresh_token_expiry(),
-        "revoked": False,
-        "replaced_by_token": None,
-        "user_agent": request.headers.get("user-agent"),
-        "ip_address": request.client.host
-    }
-    await refresh_tokens_collection.insert_one(refresh_token_doc)
+    refresh_token = await session_store.create(
+        db_user["email"],
+        user_agent=request.headers.get("user-agent"),
+        ip_address=request.client.host
+    )
     logger.info(f"Login successful: {user.email}")
     return {
         "access_token": access_token,
@@ -122,81 +113,47 @@ async def login(user: UserLogin, request: Request):
 @router.post("/refresh")
 async def refresh_access_token(data: RefreshTokenRequest):
 
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
     users_collection = mongo_conn.users_collection
 
-    token_hash = hash_token(data.refresh_token)
+    # ---------------- ROTATION + REUSE DETECTION ---------------- #
 
-    token_doc = await refresh_tokens_collection.find_one({
-        "token_hash": token_hash
-    })
+    rotation = await session_store.rotate(data.refresh_token)
 
-    if not token_doc:
+    if rotation.status == NOT_FOUND:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    # ---------------- REUSE DETECTION ---------------- #
-
-    if token_doc["revoked"]:
-
-        if token_doc.get("replaced_by_token"):
-
-            # reuse detected
-            await refresh_tokens_collection.update_many(
-                {"user_email": token_doc["user_email"]},
-                {"$set": {"revoked": True}}
-            )
+    if rotation.status == REUSED:
+        raise HTTPException(
+            status_code=401,
+            detail="Token reuse detected. All sessions revoked."
+        )
 
-            raise HTTPException(
-                status_code=401,
-                detail="Token reuse detected. All sessions revoked."
-            )
+    if rotation.status == SUPERSEDED:
+        raise HTTPException(
+            status_code=401,
+            detail="Refresh token was already rotated by a concurrent request"
+        )
 
+    if rotation.status == REVOKED:
         raise HTTPException(
             status_code=401,
             detail="Refresh token revoked"
         )
 
-    # ---------------- EXPIRY CHECK ---------------- #
-
-    if token_doc["expires_at"] < datetime.utcnow():
+    if rotation.status == EXPIRED:
         raise HTTPException(
             status_code=401,
             detail="Refresh token expired"
         )
 
-    user = await users_collection.find_one({
-        "email": token_doc["user_email"]
-    })
+    user = await users_collection.find_one(
+        {"email": rotation.user_email},
+        projection={"email": 1, "role": 1, "token_version": 1, "restaurant_ids": 1}
+    )
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # ---------------- ROTATION ---------------- #
-
-    new_refresh_token = secrets.token_urlsafe(64)
-    new_token_hash = hash_token(new_refresh_token)
-
-    await refresh_tokens_collection.update_one(
-        {"_id": token_doc["_id"]},
-        {
-            "$set": {
-                "revoked": True,
-                "replaced_by_token": new_token_hash
-            }
-        }
-    )
-
-    new_token_doc = {
-        "user_email": user["email"],
-        "token_hash": new_token_hash,
-        "created_at": datetime.utcnow(),
-        "expires_at": get_refresh_token_expiry(),
-        "revoked": False,
-        "replaced_by_token": None
-    }
-
-    await refresh_tokens_collection.insert_one(new_token_doc)
-
     access_token = create_access_token({
         "id": str(user["_id"]),
         "sub": user["email"],
@@ -207,61 +164,30 @@ async def refresh_access_token(data: RefreshTokenRequest):
 
     return {
         "access_token": access_token,
-        "refresh_token": new_refresh_token,
+        "refresh_token": rotation.refresh_token,
         "token_type": "bearer"
     }
 
 @router.post("/logout")
 async def logout(data: RefreshTokenRequest):
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
-    token_hash = hash_token(data.refresh_token)
-    token_doc = await refresh_tokens_collection.find_one({
-        "token_hash": token_hash
-    })
-    if not token_doc:
+    if not await session_store.revoke(data.refresh_token):
         raise HTTPException(status_code=404, detail="Session not found")
-    await refresh_tokens_collection.update_one(
-        {"_id": token_doc["_id"]},
-        {"$set": {"revoked": True}}
-    )
     return {"message": "Logged out successfully"}
 
 
 @router.post("/logout-all")
 async def logout_all(user_email: str):
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
-    await refresh_tokens_collection.update_many(
-        {"user_email": user_email},
-        {"$set": {"revoked": True}}
-    )
+    await session_store.revoke_all(user_email)
     return {"message": "All sessions revoked"}
 
 @router.get("/sessions")
 async def get_sessions(user_email: str):
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
-    sessions = await refresh_tokens_collection.find(
-        {
-            "user_email": user_email,
-            "revoked": False
-        }
-    ).to_list(length=100)
-    for s in sessions:
-        s["_id"] = str(s["_id"])
-    return sessions
+    return await session_store.list_sessions(user_email)
 
 @router.delete("/session/{session_id}")
 async def revoke_session(session_id: str, user_email: str):
-    refresh_tokens_collection = mongo_conn.refresh_tokens_collection
-    session = await refresh_tokens_collection.find_one({
-        "_id": ObjectId(session_id),
-        "user_email": user_email
-    })
-    if not session:
+    if not await session_store.revoke_session(session_id, user_email):
         raise HTTPException(status_code=404, detail="Session not found")
-    await refresh_tokens_collection.update_one(
-        {"_id": ObjectId(session_id)},
-        {"$set": {"revoked": True}}
-    )
     return {"message": "Session revoked"}
 
 @router.post("/forgot-password")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Path, Query, Request, Response
 from models.menu import MenuItemCreate, MenuItemOut, MenuItemUpdate
-from services.menu_service import create_menu_item, list_menu_items, get_menu_item, update_menu_item, delete_menu_item, search_menu_items
+from services.menu_service import create_menu_item, list_menu_items, get_cached_menu, get_menu_item, update_menu_item, delete_menu_item, search_menu_items
 from core.dependencies import get_current_user
 from utils.logger import get_logger
 from typing import List
@@ -8,23 +8,41 @@ from typing import List
 logger = get_logger("Menu_Route")
 router = APIRouter(prefix="/menu", tags=["Menu"])
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison (RFC 9110 13.1.2): W/ is ignored, so tags
+    weakened by proxies or compression still match; "*" matches any current menu.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
 @router.get("/search", response_model=List[MenuItemOut])
 async def search_menu_item(
-    q: str,
+    q: str = Query(..., min_length=1, max_length=100),
+    restaurant_id: str | None = Query(None, description="Only items of this restaurant"),
+    available: bool = Query(True, description="Only return available items"),
+    limit: int = Query(20, ge=1, le=50),
     current_user=Depends(get_current_user)
 ):
     try:
-        items = await search_menu_items(q)
+        items = await search_menu_items(q, restaurant_id=restaurant_id, available=True if available else None, limit=limit)
         return items
     except Exception:
         logger.exception("Error searching menu items")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 # Public: list visible menu items for a restaurant
 @router.get("/{restaurant_id}", response_model=List[MenuItemOut])
-async def api_list_menu(restaurant_id: str = Path(...), available: bool = Query(True)):
+async def api_list_menu(request: Request, restaurant_id: str = Path(...), available: bool = Query(True)):
     try:
-        items = await list_menu_items(restaurant_id, only_available=available)
-        return items
+        # pre-serialized body from the menu cache; clients revalidate with If-None-Match
+        menu = await get_cached_menu(restaurant_id, only_available=available)
+        headers = {"ETag": menu.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), menu.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=menu.body, media_type="application/json", headers=headers)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception:
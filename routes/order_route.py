@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from models.order import OrderCreate, OrderOut, PaginatedOrderResponse
-from services.user_order_service import get_orderById, get_user_orders, update_user_order, delete_user_order, list_user_orders, update_order_status_by_restaurant, create_order, cancel_user_order
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Header, Request
+from fastapi.responses import StreamingResponse, JSONResponse
+from models.order import OrderCreate, OrderOut, PaginatedOrderResponse, OrderHistoryPage, OrderIngestStatus
+from services.user_order_service import get_orderById, get_user_orders, update_user_order, delete_user_order, list_user_orders, list_user_order_history, update_order_status_by_restaurant, create_order, cancel_user_order
 from core.dependencies import get_current_user, CurrentUser
 from typing import List, Optional
 from services import user_order_service
+from services.order_stream import order_stream_hub, OrderStreamUnavailable, SSE_HEADERS
+from services.order_ingest import enqueue_order, get_ingest_status
+from settings.config import settings
 from utils.logger import get_logger
 
 logger = get_logger("Order_Route")
@@ -21,11 +25,21 @@ async def search_orders(
         current_user.email
     )
 #Create new order for current user
-@router.post("/", response_model=OrderOut)
-async def place_order(order: OrderCreate, current_user: CurrentUser = Depends(get_current_user)):
-    """Create a new order"""
+@router.post("/", response_model=OrderOut, responses={202: {"model": OrderIngestStatus}})
+async def place_order(order: OrderCreate, request: Request, current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Create a new order. In ingest mode (ORDER_INGEST_MODE=queue) the order is validated and
+    queued, and 202 is returned with its id; poll GET /orders/pending/{id} until it is stored.
+    """
     logger.info(f"Received request to create order by user: {order}")
     try:
+        if settings.ORDER_INGEST_MODE == "queue":
+            queued = await enqueue_order(current_user.email, order.restaurant_id, order.items)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=queued,
+                headers={"Location": str(request.url_for("pending_order_status", order_id=queued["id"]))}
+            )
         # new_order = await create_user_order(current_user.email, order)
         new_order = await create_order(current_user.email, order.restaurant_id, order.items, status="pending")
         return new_order  
@@ -48,6 +62,42 @@ async def get_orders(
         return orders
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching orders")
+# Order history with cursor pagination (pass next_cursor back as cursor)
+@router.get("/history", response_model=OrderHistoryPage)
+async def get_order_history(
+                    current_user: CurrentUser = Depends(get_current_user),
+                    status: str | None = Query(None, description="Filter by order status"),
+                    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+                    limit: int = Query(10, ge=1, le=50, description="Number of results per page"),
+                    include_total: bool = Query(False, description="Also return the (cached) total count")
+                    ):
+    """Fetch order history for current user, newest first"""
+    try:
+        return await list_user_order_history(current_user.email, status, cursor, limit, include_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+# Where a queued (ingest mode) order is: queued, stored or failed
+@router.get("/pending/{order_id}", response_model=OrderIngestStatus)
+async def pending_order_status(order_id: str, current_user: CurrentUser = Depends(get_current_user)):
+    result = await get_ingest_status(current_user.email, order_id)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return result
+# Live status updates of the current user's orders (Server-Sent Events)
+@router.get("/events")
+async def order_events(
+                    current_user: CurrentUser = Depends(get_current_user),
+                    last_event_id: str | None = Header(None, description="Sent by EventSource on reconnect")
+                    ):
+    try:
+        await order_stream_hub.ensure_available()
+    except OrderStreamUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Live order updates are not available")
+    return StreamingResponse(
+        order_stream_hub.sse(user_email=current_user.email, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
 # Get specific order by ID for current user
 @router.post("/{order_id}/cancel")
 async def cancel_my_order(
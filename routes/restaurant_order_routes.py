@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from fastapi.responses import StreamingResponse
 from core.dependencies import get_current_user, CurrentUser
-from services.restaurant_order_service import fetch_orders_for_restaurant_admin, update_order_status
+from services.restaurant_order_service import fetch_orders_for_restaurant_admin, stream_orders_for_restaurant_admin, update_order_status
+from services.order_stream import order_stream_hub, OrderStreamUnavailable, SSE_HEADERS
+from services.order_notifications import notification_sse
+from settings.config import settings
 from models.order import RestaurantOrderOut, OrderStatusUpdate
 from utils.logger import get_logger
 
@@ -13,26 +18,111 @@ router = APIRouter(
 )
 
 @router.get("/orders", response_model=list[RestaurantOrderOut])
-async def get_my_restaurant_orders(current_user: CurrentUser = Depends(get_current_user)):
+async def get_my_restaurant_orders(
+    response: Response,
+    restaurant_id: str | None = Query(None, description="Only this restaurant (default: all of yours)"),
+    status_filter: list[str] | None = Query(None, alias="status", description="Repeat to match several statuses"),
+    created_from: datetime | None = Query(None, description="Orders created at or after this time"),
+    created_to: datetime | None = Query(None, description="Orders created before this time"),
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    stream: bool = Query(False, description="Stream every matching order as NDJSON instead of one page"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Orders of the current restaurant admin's restaurants, newest first. The next page's
+    cursor is returned in the X-Next-Cursor header; with stream=true the whole filtered
+    range is sent as application/x-ndjson (one order per line) and limit is ignored.
+    """
+    if current_user.role != "restaurant_admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only restaurant admins can access this"
+        )
+    restaurant_ids = current_user.restaurant_ids
+    if restaurant_id is not None:
+        if restaurant_id not in restaurant_ids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to view this restaurant")
+        restaurant_ids = [restaurant_id]
+
+    try:
+        if stream:
+            orders = stream_orders_for_restaurant_admin(
+                restaurant_ids, status_filter, created_from, created_to, cursor,
+                batch_size=settings.RESTAURANT_ORDER_STREAM_BATCH_SIZE
+            )
+            return StreamingResponse(_ndjson(orders), media_type="application/x-ndjson")
+
+        orders, next_cursor = await fetch_orders_for_restaurant_admin(
+            restaurant_ids, status_filter, created_from, created_to, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+
+@router.get("/orders/events")
+async def my_restaurant_order_events(
+    restaurant_id: str | None = Query(None, description="Only this restaurant (default: all of yours)"),
+    last_event_id: str | None = Header(None, description="Sent by EventSource on reconnect"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Live order changes for the restaurant admin's restaurants as Server-Sent Events.
+    """
+    if current_user.role != "restaurant_admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only restaurant admins can access this"
+        )
+    restaurant_ids = current_user.restaurant_ids
+    if restaurant_id is not None:
+        if restaurant_id not in restaurant_ids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to view this restaurant")
+        restaurant_ids = [restaurant_id]
+    if not restaurant_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No restaurants assigned")
+    try:
+        await order_stream_hub.ensure_available()
+    except OrderStreamUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Live order updates are not available")
+    return StreamingResponse(
+        order_stream_hub.sse(restaurant_ids=restaurant_ids, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.get("/orders/notifications")
+async def my_restaurant_order_notifications(
+    restaurant_id: str | None = Query(None, description="Only this restaurant (default: all of yours)"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Lightweight status-change feed (order_id, from, to) over Redis pub/sub as
+    Server-Sent Events. Unlike /orders/events it needs no replica set, but it has no replay.
+    """
     if current_user.role != "restaurant_admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only restaurant admins can access this"
         )
-    orders = await fetch_orders_for_restaurant_admin(restaurant_ids=current_user.restaurant_ids)
-    return [
-        {
-            "id": str(order["_id"]),
-            "user_email": order["user_email"],
-            "restaurant_id": order["restaurant_id"],
-            "items": order["items"],
-            "total_amount": order["total_amount"],
-            "status": order["status"],
-            "created_at": order["created_at"],
-            "updated_at": order.get("updated_at")
-        }
-        for order in orders
-    ]
+    restaurant_ids = current_user.restaurant_ids
+    if restaurant_id is not None:
+        if restaurant_id not in restaurant_ids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to view this restaurant")
+        restaurant_ids = [restaurant_id]
+    if not restaurant_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No restaurants assigned")
+    return StreamingResponse(notification_sse(restaurant_ids), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _ndjson(orders):
+    # same fields and encoding as the paged JSON response
+    async for order in orders:
+        yield RestaurantOrderOut(**order).model_dump_json() + "\n"
 
 @router.patch("/orders/{order_id}/status")
 async def update_my_order_status(
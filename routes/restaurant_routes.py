@@ -4,6 +4,7 @@ from core.dependencies import get_current_user, require_role, CurrentUser
 from models.restaurant import RestaurantCreate, RestaurantListMenuItem, RestaurantOut, RestaurantListItem, RestaurantUpdate
 from services import restaurant_service
 from services.restaurant_service import create_restaurant, get_restaurant_by_id, list_restaurants, update_restaurant, soft_delete_restaurant
+from services.restaurant_autocomplete import restaurant_autocomplete
 from utils.logger import get_logger
 
 logger = get_logger("Restaurant_Route")
@@ -71,7 +72,15 @@ async def search_restaurants(
     except Exception:
         logger.exception("Error searching restaurants")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
-    
+
+# Public: type-ahead over approved, enabled restaurants (served from memory)
+@router.get("/autocomplete", response_model=list[RestaurantListItem])
+async def autocomplete_restaurants(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    return restaurant_autocomplete.search(q, limit)
+
 # Public: get single restaurant using the id (only if approved and not disabled)
 @router.get("/{restaurant_id}", response_model=RestaurantOut)
 async def api_get_restaurant(restaurant_id: str = Path(...)):
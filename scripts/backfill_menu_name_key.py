@@ -0,0 +1,32 @@
+# scripts/backfill_menu_name_key.py
+"""
+Sets name_key (used by the menu prefix search) on menu items created before it existed.
+
+    python -m scripts.backfill_menu_name_key
+"""
+import argparse
+import asyncio
+from pymongo import UpdateOne
+from db.db_operation import mongo_conn
+from services.menu_service import normalize_name
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    cursor = mongo_conn.menu_items.find({"name_key": {"$exists": False}}, {"name": 1})
+    ops, updated = [], 0
+    async for doc in cursor:
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": normalize_name(doc["name"])}}))
+        if len(ops) >= args.batch_size:
+            updated += (await mongo_conn.menu_items.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await mongo_conn.menu_items.bulk_write(ops, ordered=False)).modified_count
+    print(f"name_key set on {updated} menu items")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+# scripts/bench_autocomplete.py
+"""
+Lookup latency of the in-process restaurant autocomplete index vs a linear scan
+over every restaurant name, for random 1-4 character prefixes.
+
+Restaurants are generated in memory (no Mongo); a share of them is unapproved or
+disabled, so the filter is part of what is measured. Target: p99 well under 1ms.
+    python -m scripts.bench_autocomplete --restaurants 20000 --lookups 20000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from bson import ObjectId
+from services.restaurant_autocomplete import RestaurantAutocomplete, _slugify
+
+WORDS = [
+    "pizza", "burger", "sushi", "taco", "curry", "noodle", "grill", "bistro", "kitchen", "house",
+    "garden", "palace", "express", "corner", "street", "royal", "golden", "spice", "dragon", "olive",
+    "joe's", "mama", "little", "big", "blue", "red", "urban", "village", "harbor", "sunset"
+]
+
+
+def make_restaurants(count: int, hidden_share: float) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {
+            "id": str(ObjectId()),
+            "name": " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" {i}",
+            "approved": rng.random() >= hidden_share,
+            "disabled": rng.random() < hidden_share / 2
+        } for i in range(count)
+    ]
+
+
+def linear_scan(restaurants: list[dict], prefix: str, limit: int) -> list[dict]:
+    # what the lookup costs without an index: every name, every request
+    prefix = _slugify(prefix)
+    hits = []
+    for r in restaurants:
+        if not r["approved"] or r["disabled"]:
+            continue
+        words = _slugify(r["name"]).split("-")
+        if any("-".join(words[i:]).startswith(prefix) for i in range(len(words))):
+            hits.append(r)
+    hits.sort(key=lambda r: (not _slugify(r["name"]).startswith(prefix), _slugify(r["name"])))
+    return hits[:limit]
+
+
+def report(name: str, latencies: list[float]):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{name:<8} p50={statistics.median(latencies):9.1f}us  p99={p99:9.1f}us  max={latencies[-1]:9.1f}us")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restaurants", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--scan-lookups", type=int, default=200, help="the linear scan is slow; fewer lookups")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--hidden-share", type=float, default=0.2, help="share of unapproved/disabled restaurants")
+    args = parser.parse_args()
+
+    restaurants = make_restaurants(args.restaurants, args.hidden_share)
+    index = RestaurantAutocomplete()
+    start = time.perf_counter()
+    for r in restaurants:
+        index.upsert(r["id"], r["name"], r["approved"], r["disabled"])
+    visible = sum(1 for r in restaurants if r["approved"] and not r["disabled"])
+    print(f"index: {visible}/{len(restaurants)} visible restaurants, {len(index._keys)} terms, "
+          f"built in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rng = random.Random(7)
+    prefixes = [rng.choice(WORDS)[:rng.randint(1, 4)] for _ in range(args.lookups)]
+
+    latencies = []
+    for prefix in prefixes:
+        t = time.perf_counter()
+        index.search(prefix, args.limit)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    report("index", latencies)
+
+    latencies = []
+    for prefix in prefixes[:args.scan_lookups]:
+        t = time.perf_counter()
+        linear_scan(restaurants, prefix, args.limit)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    report("scan", latencies)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+# scripts/bench_event_fanout.py
+"""
+Fan-out latency of the Redis event bus: time from PUBLISH to delivery into every
+local subscriber queue, with subscribers spread over several simulated workers
+(one RedisEventBus, i.e. one pub/sub connection, per worker).
+
+Needs a running Redis (REDIS_URL):
+    python -m scripts.bench_event_fanout --subscribers 10000 --workers 4 --restaurants 100 --events 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import redis.asyncio as redis
+from db.redis_client import REDIS_URL, RedisEventBus
+from services.order_notifications import restaurant_channel
+
+
+def report(name: str, latencies: list[float]):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{name:<10} p50={statistics.median(latencies):8.2f}ms  p99={p99:8.2f}ms  max={latencies[-1]:8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--restaurants", type=int, default=100)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=100)
+    args = parser.parse_args()
+
+    clients = [redis.from_url(REDIS_URL, decode_responses=True) for _ in range(args.workers)]
+    buses = [RedisEventBus(client, queue_size=args.queue_size) for client in clients]
+    restaurant_ids = [f"bench-{i}" for i in range(args.restaurants)]
+
+    # each subscriber follows one restaurant, round-robin over workers
+    subs = []
+    for i in range(args.subscribers):
+        bus = buses[i % args.workers]
+        subs.append(await bus.subscribe([restaurant_channel(restaurant_ids[i % args.restaurants])]))
+
+    per_event: dict[int, list[float]] = {}
+    every: list[float] = []
+
+    async def consume(sub):
+        while True:
+            try:
+                event = await sub.get()
+            except EOFError:
+                return
+            latency = (time.perf_counter() - event["sent"]) * 1000
+            every.append(latency)
+            per_event.setdefault(event["seq"], []).append(latency)
+
+    consumers = [asyncio.create_task(consume(sub)) for sub in subs]
+    await asyncio.sleep(0.5)  # let the SUBSCRIBEs settle
+
+    publisher = buses[0]
+    for seq in range(args.events):
+        restaurant_id = restaurant_ids[seq % args.restaurants]
+        await publisher.publish(restaurant_channel(restaurant_id), {"seq": seq, "sent": time.perf_counter()})
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(1)
+
+    expected = args.events * (args.subscribers // args.restaurants)
+    print(f"{args.subscribers} subscribers on {args.workers} workers, {args.restaurants} channels, {args.events} events")
+    print(f"deliveries={len(every)} (expected ~{expected})")
+    report("delivery", every)
+    report("last-sub", [max(v) for v in per_event.values()])  # publish -> last subscriber of that event
+    for bus in buses:
+        print(bus.get_stats())
+
+    for task in consumers:
+        task.cancel()
+    for bus in buses:
+        await bus.close()
+    for client in clients:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# scripts/bench_login_storm.py
+"""
+p99 latency of an unrelated endpoint while a login storm is running,
+with bcrypt on the event loop (before) vs in the process pool (after).
+
+Runs fully in-process (no Mongo/Redis needed):
+    python -m scripts.bench_login_storm --logins 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import FastAPI
+from utils.hash import hash_password, verify_password, verify_password_async, shutdown_hash_pool
+
+PASSWORD = "S3cret-password"
+HASHED = hash_password(PASSWORD)
+
+app = FastAPI()
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+@app.post("/login-sync")
+async def login_sync():
+    return {"ok": verify_password(PASSWORD, HASHED)}
+
+@app.post("/login-async")
+async def login_async():
+    return {"ok": await verify_password_async(PASSWORD, HASHED)}
+
+
+async def storm(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await client.post(path)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/ping")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def run(path: str, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm up the pool so process start-up is not measured
+        await client.post("/login-async")
+        latencies = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, latencies))
+        start = time.perf_counter()
+        await storm(client, path, total, concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{path:<14} logins/s={total / elapsed:8.1f}  /ping samples={len(latencies):5d}  p50={p50:7.2f}ms  p99={p99:8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    try:
+        await run("/login-sync", args.logins, args.concurrency)
+        await run("/login-async", args.logins, args.concurrency)
+    finally:
+        shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
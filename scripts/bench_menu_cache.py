@@ -0,0 +1,115 @@
+# scripts/bench_menu_cache.py
+"""
+Requests/s for a 500-item menu: rebuilt and re-serialized through the response
+model on every request (before) vs pre-serialized bytes from the menu cache,
+and vs a 304 revalidation.
+
+Mongo is left out (documents are generated in memory), so the "before" numbers
+are optimistic; the version check needs a running Redis (REDIS_URL):
+    python -m scripts.bench_menu_cache --requests 2000 --items 500
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI, Request, Response
+from models.menu import MenuItemOut
+from services.menu_cache import MenuCache
+from db.redis_client import redis_client
+
+RESTAURANT_ID = str(ObjectId())
+
+
+def make_docs(count: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "restaurant_id": RESTAURANT_ID,
+            "name": f"Item {i:04d}",
+            "description": "House special with seasonal vegetables and a side of rice",
+            "price": 9.5 + i % 20,
+            "is_available": True,
+            "created_at": now,
+            "updated_at": now
+        } for i in range(count)
+    ]
+
+
+def to_items(docs: list[dict]) -> list[dict]:
+    # same mapping as services.menu_service.list_menu_items
+    return [
+        {
+            "id": str(d["_id"]),
+            "restaurant_id": d["restaurant_id"],
+            "name": d["name"],
+            "description": d.get("description"),
+            "price": d["price"],
+            "is_available": d.get("is_available", True),
+            "created_at": d.get("created_at").isoformat() if d.get("created_at") else None,
+            "updated_at": d.get("updated_at").isoformat() if d.get("updated_at") else None
+        } for d in docs
+    ]
+
+
+def build_app(docs: list[dict], cache: MenuCache) -> FastAPI:
+    app = FastAPI()
+
+    async def loader():
+        return to_items(docs)
+
+    @app.get("/uncached", response_model=List[MenuItemOut])
+    async def uncached():
+        return to_items(docs)
+
+    @app.get("/cached")
+    async def cached(request: Request):
+        menu = await cache.get(RESTAURANT_ID, True, loader)
+        headers = {"ETag": menu.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == menu.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=menu.body, media_type="application/json", headers=headers)
+
+    return app
+
+
+async def run(client: httpx.AsyncClient, name: str, path: str, headers: dict, total: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await client.get(path, headers=headers)
+
+    await client.get(path, headers=headers)  # warm up
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} requests/s={total / elapsed:10.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    cache = MenuCache(redis_client)
+    app = build_app(make_docs(args.items), cache)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            etag = (await client.get("/cached")).headers["etag"]
+            await run(client, "uncached", "/uncached", {}, args.requests, args.concurrency)
+            await run(client, "cached", "/cached", {}, args.requests, args.concurrency)
+            await run(client, "cached-304", "/cached", {"If-None-Match": etag}, args.requests, args.concurrency)
+        print("cache stats:", cache.get_stats())
+    finally:
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
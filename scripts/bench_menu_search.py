@@ -0,0 +1,119 @@
+# scripts/bench_menu_search.py
+"""
+Menu search latency on synthetic items: the old unanchored case-insensitive
+$regex vs search_menu_items as the API runs it ($text plus the name_key prefix
+fill), for whole words and for 3-letter prefixes like "chi" that only the
+prefix fill answers.
+
+Uses a separate database (default: menu_search_bench) on MONGO_URI with the
+menu_items indexes from db.indexes; the data is generated once and reused on
+later runs (name_key is backfilled on data from older runs):
+    python -m scripts.bench_menu_search --items 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from db.db_operation import mongo_conn
+from db.indexes import INDEX_SPECS, sync_collection
+from services.menu_service import normalize_name, search_menu_items
+from settings.config import settings
+
+WORDS = [
+    "chicken", "paneer", "masala", "tikka", "butter", "garlic", "naan", "biryani", "veg", "spicy",
+    "pizza", "margherita", "pepperoni", "burger", "cheese", "fries", "salad", "caesar", "pasta", "alfredo",
+    "noodles", "fried", "rice", "soup", "tomato", "mushroom", "lamb", "kebab", "falafel", "wrap",
+    "sushi", "salmon", "tuna", "roll", "ramen", "curry", "green", "thai", "mango", "lassi",
+    "chocolate", "brownie", "ice", "cream", "vanilla", "coffee", "latte", "tea", "lemon", "smoothie"
+]
+
+
+def make_item(restaurant_ids: list[str], i: int) -> dict:
+    name = " ".join(random.sample(WORDS, 3)).title() + f" {i}"
+    return {
+        "restaurant_id": random.choice(restaurant_ids),
+        "name": name,
+        "name_key": normalize_name(name),
+        "description": " ".join(random.sample(WORDS, 8)),
+        "price": round(random.uniform(2, 40), 2),
+        "is_available": random.random() > 0.1
+    }
+
+
+async def seed(collection, items: int):
+    existing = await collection.estimated_document_count()
+    if existing >= items:
+        print(f"using existing {existing} items")
+        await backfill_name_key(collection)
+        return
+    restaurant_ids = [str(ObjectId()) for _ in range(2000)]
+    batch = 10_000
+    for start in range(existing, items, batch):
+        docs = [make_item(restaurant_ids, i) for i in range(start, min(items, start + batch))]
+        await collection.insert_many(docs, ordered=False)
+        print(f"inserted {start + len(docs)}/{items}", end="\r")
+    print()
+
+
+async def backfill_name_key(collection):
+    # items seeded before name_key existed; same as scripts.backfill_menu_name_key
+    ops = []
+    async for doc in collection.find({"name_key": {"$exists": False}}, {"name": 1}):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": normalize_name(doc["name"])}}))
+        if len(ops) >= 10_000:
+            await collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+
+
+async def timed(queries: list[str], run) -> list[float]:
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        await run(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list[float]):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{name:<8} p50={statistics.median(latencies):9.2f}ms  p99={p99:9.2f}ms  mean={statistics.mean(latencies):9.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--db", default="menu_search_bench")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    # search_menu_items (and the index sync) read the collection from mongo_conn
+    mongo_conn.db = client[args.db]
+    mongo_conn.menu_items = collection = mongo_conn.db["menu_items"]
+    await seed(collection, args.items)
+    await sync_collection("menu_items", INDEX_SPECS["menu_items"])
+    queries = [random.choice(WORDS) for _ in range(args.queries)]
+    prefixes = [q[:3] for q in queries]
+
+    async def regex(q):
+        # previous search_menu_items
+        return await collection.find({"name": {"$regex": q, "$options": "i"}, "is_available": True}).to_list(length=20)
+
+    async def search(q):
+        return await search_menu_items(q, limit=20)
+
+    report("regex", await timed(queries, regex))
+    report("search", await timed(queries, search))
+    report("prefix", await timed(prefixes, search))
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
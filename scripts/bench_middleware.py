@@ -0,0 +1,128 @@
+# scripts/bench_middleware.py
+"""
+Requests/s through the middleware stack: the previous BaseHTTPMiddleware
+layers vs the pure ASGI ones, on /health and on an authenticated GET.
+
+Runs in-process over httpx.ASGITransport; the rate limiter needs a running
+Redis (REDIS_URL):
+    python -m scripts.bench_middleware --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from core.middleware import ExceptionHandlerMiddleware, RequestIDMiddleware
+from core.rate_limiter import RedisRateLimitMiddleware
+from core.rate_limit_policy import for_role
+from db.redis_client import redis_client
+from utils.jwt_handler import create_access_token, get_request_claims
+
+LIMIT = 1_000_000  # high enough that nothing gets rejected
+WINDOW = 60
+
+
+# previous implementations, kept here for comparison only
+
+class LegacyExceptionHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
+async def legacy_request_id_middleware(request: Request, call_next):
+    request_id = str(uuid.uuid4())
+    request.state.request_id = request_id
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, **kwargs):
+        super().__init__(app)
+        # reuse the limiter and policy table so only the middleware plumbing differs
+        self.inner = RedisRateLimitMiddleware(app, **kwargs)
+
+    async def dispatch(self, request: Request, call_next):
+        per_role = self.inner.policies.route(request.method, request.url.path)
+        if per_role is None:
+            return await call_next(request)
+        identity, role = self.inner._get_identity(request)
+        policy = for_role(per_role, role)
+        result = await self.inner.limiter.hit(f"{policy.bucket}:{identity}", policy.limit, policy.window, cost=policy.cost)
+        if not result.allowed:
+            return JSONResponse(status_code=429, content={"detail": "Too many requests, please slow down"})
+        response = await call_next(request)
+        response.headers.update(self.inner._headers(result))
+        return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/bench/me")
+    async def me(request: Request):
+        claims = get_request_claims(request)
+        if claims is None:
+            return JSONResponse(status_code=401, content={"detail": "Invalid token"})
+        return {"email": claims["sub"], "role": claims["role"]}
+
+    if legacy:
+        app.middleware("http")(legacy_request_id_middleware)
+        app.add_middleware(LegacyRateLimitMiddleware, requests=LIMIT, window_seconds=WINDOW)
+        app.add_middleware(LegacyExceptionHandlerMiddleware)
+    else:
+        app.add_middleware(RequestIDMiddleware)
+        app.add_middleware(RedisRateLimitMiddleware, requests=LIMIT, window_seconds=WINDOW)
+        app.add_middleware(ExceptionHandlerMiddleware)
+    return app
+
+
+async def run(name: str, app: FastAPI, path: str, headers: dict, total: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        # warm up: script load, token verification cache
+        await client.get(path)
+
+        async def one():
+            async with sem:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    print(f"{name:<8} {path:<12} requests/s={total / elapsed:10.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench@example.com", "role": "user", "token_version": 0})
+    auth = {"Authorization": f"Bearer {token}"}
+    try:
+        for legacy in (True, False):
+            name = "legacy" if legacy else "asgi"
+            app = build_app(legacy)
+            await run(name, app, "/health", {}, args.requests, args.concurrency)
+            await run(name, app, "/bench/me", auth, args.requests, args.concurrency)
+    finally:
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+# scripts/bench_order_ingest.py
+"""
+Sustained order placement rate against a running API: POST /orders for a fixed
+duration at a fixed concurrency, then (in ingest mode) wait until the queue is
+drained so the number reported is orders actually stored per second.
+
+Run it once per mode against the same deployment and compare:
+    ORDER_INGEST_MODE=sync  -> start API; python -m scripts.bench_order_ingest --token ... --restaurant-id ... --item-id ...
+    ORDER_INGEST_MODE=queue -> start API + python -m scripts.order_ingest_worker; same command
+
+Use a customer access token; the rate limit of the "orders" bucket applies, so
+raise it (or run with a superadmin token) for the test.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from services.order_ingest import queue_depth
+from db.redis_client import redis_client
+
+
+def report(name: str, latencies: list[float]):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{name:<8} p50={statistics.median(latencies):8.2f}ms  p99={p99:8.2f}ms  max={latencies[-1]:8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--restaurant-id", required=True)
+    parser.add_argument("--item-id", required=True)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    body = {"restaurant_id": args.restaurant_id, "items": [{"item_id": args.item_id, "quantity": 1}]}
+    headers = {"Authorization": f"Bearer {args.token}"}
+    latencies: list[float] = []
+    codes: dict[int, int] = {}
+
+    async def client_loop(client: httpx.AsyncClient, deadline: float):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post("/orders/", json=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(client_loop(client, deadline) for _ in range(args.concurrency)))
+        accepted_elapsed = time.perf_counter() - start
+
+    ok = codes.get(200, 0) + codes.get(202, 0)
+    print(f"responses: {dict(sorted(codes.items()))}")
+    print(f"accepted/s={ok / accepted_elapsed:10.1f}")
+    report("latency", latencies)
+
+    if codes.get(202):
+        # ingest mode: stored/s counts until the worker has drained the queue
+        while await queue_depth() > 0:
+            await asyncio.sleep(0.2)
+        stored_elapsed = time.perf_counter() - start
+        print(f"stored/s={ok / stored_elapsed:12.1f}  (queue drained {stored_elapsed - accepted_elapsed:.1f}s after the load stopped)")
+    await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+# scripts/bench_rate_limiter.py
+"""
+Redis calls per request and throughput of the old INCR + EXPIRE limiter
+vs the single-script engine (every algorithm).
+
+Needs a running Redis (REDIS_URL):
+    python -m scripts.bench_rate_limiter --requests 20000 --identities 500
+"""
+import argparse
+import asyncio
+import time
+import redis.asyncio as redis
+from core.rate_limit_engine import RedisRateLimiter
+from db.redis_client import REDIS_URL
+
+LIMIT = 1_000_000  # high enough that nothing gets rejected
+WINDOW = 60
+
+
+class CountingRedis(redis.Redis):
+    """Counts commands sent to the server (EVALSHA counts as one)."""
+    calls = 0
+
+    async def execute_command(self, *args, **options):
+        CountingRedis.calls += 1
+        return await super().execute_command(*args, **options)
+
+
+async def legacy_hit(client, identity: str):
+    # previous RedisRateLimitMiddleware.dispatch logic
+    window_key = int(time.time()) // WINDOW
+    redis_key = f"bench:legacy:{identity}:{window_key}"
+    current_count = await client.incr(redis_key)
+    if current_count == 1:
+        await client.expire(redis_key, WINDOW)
+    return current_count <= LIMIT
+
+
+async def run(name: str, hit, total: int, identities: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    CountingRedis.calls = 0
+
+    async def one(i: int):
+        async with sem:
+            await hit(f"user{i % identities}@bench")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} calls/request={CountingRedis.calls / total:5.3f}  requests/s={total / elapsed:10.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--identities", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    client = CountingRedis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await run("legacy", lambda ident: legacy_hit(client, ident), args.requests, args.identities, args.concurrency)
+        for algorithm in RedisRateLimiter.ALGORITHMS:
+            limiter = RedisRateLimiter(client, algorithm=algorithm, prefix=f"bench:{algorithm}")
+            # load the script once so NOSCRIPT fallbacks are not counted
+            await limiter.hit("warmup", LIMIT, WINDOW)
+            await run(algorithm, lambda ident, l=limiter: l.hit(ident, LIMIT, WINDOW), args.requests, args.identities, args.concurrency)
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
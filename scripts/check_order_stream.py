@@ -0,0 +1,86 @@
+# scripts/check_order_stream.py
+"""
+End-to-end check of the order event stream against a local single-node replica set.
+
+Start one with:
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+then run (uses a separate database, default: order_stream_check):
+    python -m scripts.check_order_stream --uri "mongodb://localhost:27017/?replicaSet=rs0"
+
+Checks that a restaurant subscriber and a customer subscriber each receive their
+own order's events and nothing else, and that reconnecting with the last event id
+replays a status change made while disconnected.
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from services.order_stream import OrderStreamHub
+
+
+async def read_events(stream, count: int, timeout: float = 10) -> list[dict]:
+    """Next `count` order events from an SSE text stream (comments and retry lines skipped)."""
+    events = []
+
+    async def collect():
+        async for chunk in stream:
+            if chunk.startswith("event: reset"):
+                raise AssertionError("unexpected reset")
+            if chunk.startswith("id: "):
+                events.append(json.loads(chunk.split("data: ", 1)[1]))
+                if len(events) == count:
+                    return
+
+    await asyncio.wait_for(collect(), timeout)
+    return events
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongodb://localhost:27017/?replicaSet=rs0")
+    parser.add_argument("--db", default="order_stream_check")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.uri)
+    orders = client[args.db]["orders"]
+    hub = OrderStreamHub(collection=orders, heartbeat_seconds=1)
+
+    restaurant_stream = hub.sse(restaurant_ids=["r1"])
+    customer_stream = hub.sse(user_email="alice@example.com")
+    await restaurant_stream.__anext__()  # retry line; subscription is registered
+    await customer_stream.__anext__()
+    await asyncio.sleep(1)  # let the watcher open its change stream
+
+    now = datetime.utcnow()
+    await orders.insert_one({"user_email": "bob@example.com", "restaurant_id": "r2", "status": "pending", "created_at": now})
+    result = await orders.insert_one({"user_email": "alice@example.com", "restaurant_id": "r1", "status": "pending", "created_at": now})
+    await orders.update_one({"_id": result.inserted_id}, {"$set": {"status": "accepted", "updated_at": datetime.utcnow()}})
+
+    restaurant_events = await read_events(restaurant_stream, 2)
+    customer_events = await read_events(customer_stream, 2)
+    for events in (restaurant_events, customer_events):
+        assert [e["status"] for e in events] == ["pending", "accepted"], events
+        assert all(e["order_id"] == str(result.inserted_id) for e in events), events
+    print("live events: ok")
+
+    # disconnect, change the order, reconnect with the last event id
+    last_id = customer_events[-1]["id"]
+    await customer_stream.aclose()
+    await orders.update_one({"_id": result.inserted_id}, {"$set": {"status": "preparing", "updated_at": datetime.utcnow()}})
+    resumed = hub.sse(user_email="alice@example.com", last_event_id=last_id)
+    replayed = await read_events(resumed, 1)
+    assert replayed[0]["status"] == "preparing", replayed
+    print("resume with Last-Event-ID: ok")
+
+    await resumed.aclose()
+    await restaurant_stream.aclose()
+    print("hub stats:", hub.get_stats())
+    await hub.close()
+    await client.drop_database(args.db)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
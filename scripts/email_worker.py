@@ -0,0 +1,60 @@
+# scripts/email_worker.py
+"""
+Delivers messages from the email_outbox collection.
+
+    python -m scripts.email_worker
+
+Claims due messages in batches, sends them concurrently over a pool of
+reused SMTP connections (blocking smtplib runs in worker threads) and
+retries failures with exponential backoff. Several workers can run at once.
+"""
+import asyncio
+from db.db_operation import mongo_conn
+from services.email_outbox import claim_batch, mark_sent, mark_failed, reclaim_stale
+from settings.config import settings
+from utils.email import SMTPPool
+from utils.logger import get_logger
+
+logger = get_logger("EMAIL_WORKER")
+
+
+async def send_batch(pool: SMTPPool, batch: list[dict]):
+    results = await asyncio.gather(
+        *(asyncio.to_thread(pool.send, doc["to"], doc["message"]) for doc in batch),
+        return_exceptions=True
+    )
+    sent = []
+    for doc, result in zip(batch, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Email {doc['_id']} to {doc['to']} failed: {result!r}")
+            await mark_failed(doc, repr(result))
+        else:
+            sent.append(doc["_id"])
+    await mark_sent(sent)
+    logger.info(f"Batch done: sent={len(sent)} failed={len(batch) - len(sent)}")
+
+
+async def run():
+    await mongo_conn.connect()
+    pool = SMTPPool(settings.EMAIL_SMTP_POOL_SIZE)
+    last_reclaim = 0.0
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            if loop.time() - last_reclaim > settings.EMAIL_SENDING_TIMEOUT_SECONDS / 2:
+                reclaimed = await reclaim_stale(settings.EMAIL_SENDING_TIMEOUT_SECONDS)
+                if reclaimed:
+                    logger.warning(f"Reclaimed {reclaimed} stale emails")
+                last_reclaim = loop.time()
+
+            batch = await claim_batch(settings.EMAIL_WORKER_BATCH_SIZE)
+            if not batch:
+                await asyncio.sleep(settings.EMAIL_WORKER_POLL_SECONDS)
+                continue
+            await send_batch(pool, batch)
+    finally:
+        await asyncio.to_thread(pool.close)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+# scripts/order_events_tail.py
+"""
+Example downstream consumer of the order event stream: prints every event.
+
+    python -m scripts.order_events_tail --group debug-tail --consumer $(hostname)
+
+Run several processes with the same --group to share the work; use a separate
+group per downstream system (kitchen display, dispatch, analytics).
+"""
+import argparse
+import asyncio
+from db.redis_client import redis_client
+from services.order_events import OrderEventConsumer
+
+
+async def print_event(event_id: str, event: dict):
+    print(event_id, event["type"], event["order_id"], f"{event['from'] or '-'} -> {event['to']}", event["at"])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--group", default="debug-tail")
+    parser.add_argument("--consumer", default="tail-1")
+    parser.add_argument("--from-start", action="store_true", help="new group reads the whole retained stream")
+    args = parser.parse_args()
+
+    consumer = OrderEventConsumer(
+        redis_client, args.group, args.consumer,
+        start_id="0" if args.from_start else "$"
+    )
+    try:
+        await consumer.run(print_event)
+    finally:
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+# scripts/order_ingest_worker.py
+"""
+Writes orders accepted in ingest mode (ORDER_INGEST_MODE=queue) to Mongo.
+
+    python -m scripts.order_ingest_worker --name $(hostname) --concurrency 4
+
+Each of the --concurrency consumers claims up to ORDER_INGEST_BATCH_SIZE queued
+orders at a time and stores them with one insert_many. Consumer names must be
+stable across restarts so leftovers of a crashed run are picked up again.
+"""
+import argparse
+import asyncio
+from db.db_operation import mongo_conn
+from services.order_ingest import IngestConsumer
+from settings.config import settings
+from utils.logger import get_logger
+
+logger = get_logger("ORDER_INGEST_WORKER")
+
+
+async def consume(consumer: IngestConsumer):
+    recovered = await consumer.recover()
+    if recovered:
+        logger.warning(f"{consumer.name}: requeued {recovered} orders from a previous run")
+    while True:
+        batch = await consumer.claim()
+        if not batch:
+            continue
+        try:
+            stored, failed = await consumer.write(batch)
+        except Exception as e:
+            # Mongo or Redis unavailable: the batch is still in our processing list
+            logger.error(f"{consumer.name}: batch of {len(batch)} failed, requeueing", exc_info=e)
+            await asyncio.sleep(settings.ORDER_INGEST_POLL_SECONDS)
+            await consumer.recover()
+            continue
+        logger.info(f"{consumer.name}: stored={stored} failed={failed}")
+
+
+async def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--name", default="ingest")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    await mongo_conn.connect()
+    consumers = [
+        IngestConsumer(
+            f"{args.name}-{i}",
+            batch_size=settings.ORDER_INGEST_BATCH_SIZE,
+            poll_seconds=settings.ORDER_INGEST_POLL_SECONDS
+        ) for i in range(args.concurrency)
+    ]
+    await asyncio.gather(*(consume(c) for c in consumers))
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
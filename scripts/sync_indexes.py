@@ -0,0 +1,30 @@
+# scripts/sync_indexes.py
+"""
+Diffs db/indexes.INDEX_SPECS against the live database and builds missing indexes.
+
+    python -m scripts.sync_indexes              # create missing indexes
+    python -m scripts.sync_indexes --dry-run    # only report
+    python -m scripts.sync_indexes --drop-extra # also drop indexes not in the spec
+"""
+import argparse
+import asyncio
+from db.indexes import sync_indexes
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--drop-extra", action="store_true")
+    args = parser.parse_args()
+
+    reports = await sync_indexes(dry_run=args.dry_run, drop_extra=args.drop_extra)
+    for collection, report in reports.items():
+        if "error" in report:
+            print(f"{collection:<16} ERROR {report['error']}")
+            continue
+        summary = "  ".join(f"{key}={','.join(names) or '-'}" for key, names in report.items())
+        print(f"{collection:<16} {summary}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
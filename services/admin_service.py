@@ -1,9 +1,12 @@
 # services/admin_service.py
 from db.db_operation import mongo_conn
+from services.audit_writer import audit_writer
 from datetime import datetime
 from utils.logger import get_logger
 from bson import ObjectId
 from pymongo.errors import PyMongoError
+from core.principal_cache import principal_cache
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter
 
 logger = get_logger("Admin_Service")
 
@@ -45,19 +48,29 @@ async def promote_user_to_restaurant_admin(target_email: str, restaurant_ids: li
         "restaurant_ids": restaurant_ids,
         "timestamp": datetime.utcnow()
     }
-    await mongo_conn.audit_logs.insert_one(audit)
+    await audit_writer.write(audit)
+    await principal_cache.invalidate(target_email)
 
     logger.info(f"{actor_email} promoted {target_email} to restaurant_admin for restaurants {restaurant_ids}")
     return {"message": "User promoted", "email": target_email, "role": "restaurant_admin", "restaurant_ids": restaurant_ids}
 
+USER_LIST_PROJECTION = {"email": 1, "full_name": 1, "role": 1, "restaurant_ids": 1, "disabled": 1}
+
 #admin can list users with pagination
-async def list_users(skip: int = 0, limit: int = 50):
+async def list_users(skip: int = 0, limit: int = 50, cursor: str | None = None):
     """
-    Return list of users with pagination.
+    Return (users, next_cursor), ordered by _id.
+    With a cursor the page is an _id range scan; skip is kept for old clients.
+    Raises ValueError for a malformed cursor.
     """
     users_col = mongo_conn.users_collection
-    cursor = users_col.find({}, {"password": 0}).skip(skip).limit(limit)
-    users = await cursor.to_list(length=limit)
+    query = {}
+    if cursor:
+        _, last_id = decode_cursor(cursor)
+        query["_id"] = {"$gt": last_id}
+        skip = 0
+    users = await users_col.find(query, USER_LIST_PROJECTION).sort("_id", 1).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(None, users[limit - 1]["_id"]) if len(users) > limit else None
     # map to API-friendly dicts
     return [
         {
@@ -67,8 +80,8 @@ async def list_users(skip: int = 0, limit: int = 50):
             "role": u.get("role", "user"),
             "restaurant_ids": u.get("restaurant_ids", []),
             "disabled": u.get("disabled", False)
-        } for u in users
-    ]
+        } for u in users[:limit]
+    ], next_cursor
 
 #admin can get user details using user id 
 async def get_user_by_id(user_id: str):
@@ -97,7 +110,6 @@ async def change_user_role(target_user_id: str, new_role: str, restaurant_ids: l
     and insert an audit log. Uses transaction when possible.
     """
     users_col = mongo_conn.users_collection
-    audit_col = mongo_conn.audit_logs
 
     # Build before snapshot for audit
     before_doc = await users_col.find_one({"_id": ObjectId(target_user_id)}, {"password": 0})
@@ -148,7 +160,7 @@ async def change_user_role(target_user_id: str, new_role: str, restaurant_ids: l
                     if result.matched_count == 0:
                         raise ValueError("User not found during update")
 
-                    await audit_col.insert_one(audit_doc, session=session)
+                    await audit_writer.write_now(audit_doc, session=session)
             finally:
                 await session.end_session()
         else:
@@ -166,11 +178,12 @@ async def change_user_role(target_user_id: str, new_role: str, restaurant_ids: l
             )
             if result.matched_count == 0:
                 raise ValueError("User not found during update")
-            await audit_col.insert_one(audit_doc)
+            await audit_writer.write_now(audit_doc)
     except PyMongoError as e:
         logger.exception("DB error while changing role")
         raise
 
+    await principal_cache.invalidate(before_doc["email"])
     logger.info(f"{actor_email} changed role of {target_user_id} -> {new_role}")
     return {"message": "role_changed", "user_id": target_user_id, "role": new_role, "restaurant_ids": restaurant_ids}
 
@@ -182,7 +195,6 @@ async def revoke_user_tokens(target_user_id: str, actor_email: str, reason: str
     - reason: optional reason string
     """
     users_col = mongo_conn.users_collection
-    audit_col = mongo_conn.audit_logs
 
     # Validate ObjectId early
     try:
@@ -213,10 +225,11 @@ async def revoke_user_tokens(target_user_id: str, actor_email: str, reason: str
         result = await users_col.update_one({"_id": oid}, {"$inc": {"token_version": 1}})
         if result.matched_count == 0:
             raise ValueError("User not found during revoke")
-        await audit_col.insert_one(audit_doc)
+        await audit_writer.write(audit_doc)
     except PyMongoError:
         logger.exception("DB error during revoke_user_tokens")
         raise
+    await principal_cache.invalidate(user["email"])
 
     logger.info(f"{actor_email} revoked tokens for {target_user_id}", extra={
         "action": "revoke_tokens",
@@ -230,7 +243,6 @@ async def disable_user(target_user_id: str, actor_email: str, reason: str | None
     Soft-disable a user account (set disabled=true) and bump token_version.
     """
     users_col = mongo_conn.users_collection
-    audit_col = mongo_conn.audit_logs
 
     user = await users_col.find_one({"_id": ObjectId(target_user_id)}, {"password": 0})
     if not user:
@@ -254,7 +266,8 @@ async def disable_user(target_user_id: str, actor_email: str, reason: str | None
     if result.matched_count == 0:
         raise ValueError("User not found during disable")
 
-    await audit_col.insert_one(audit_doc)
+    await audit_writer.write(audit_doc)
+    await principal_cache.invalidate(user["email"])
     logger.info(f"{actor_email} disabled user {target_user_id}")
     return {"message": "user_disabled", "user_id": target_user_id}
 
@@ -265,7 +278,6 @@ async def enable_user(target_user_id: str, actor_email: str, reason: str | None
     - Writes an audit log.
     """
     users_col = mongo_conn.users_collection
-    audit_col = mongo_conn.audit_logs
 
     try:
         oid = ObjectId(target_user_id)
@@ -297,18 +309,54 @@ async def enable_user(target_user_id: str, actor_email: str, reason: str | None
     if result.matched_count == 0:
         raise ValueError("User not found during enable")
 
-    await audit_col.insert_one(audit_doc)
+    await audit_writer.write(audit_doc)
+    await principal_cache.invalidate(user["email"])
     logger.info(f"{actor_email} enabled user {target_user_id}")
     return {"message": "user_enabled", "user_id": target_user_id}
 
 
-async def list_audit_logs(skip: int = 0, limit: int = 50):
+async def list_audit_logs(
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+    actor_email: str | None = None,
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    action: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None
+):
     """
-    Simple pagination for audit logs, newest first.
+    Return (audit items, next_cursor), newest first.
+    Every filter combination used by the admin UI has a matching
+    (filter..., timestamp, _id) index, so a page is a bounded index range scan.
+    Raises ValueError for a malformed cursor.
     """
     audit_col = mongo_conn.audit_logs
-    cursor = audit_col.find({}).sort("timestamp", -1).skip(skip).limit(limit)
-    items = await cursor.to_list(length=limit)
+    query = {}
+    if actor_email:
+        query["actor_email"] = actor_email
+    if resource_type:
+        query["resource_type"] = resource_type
+    if resource_id:
+        query["resource_id"] = resource_id
+    if action:
+        query["action"] = action
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    if cursor:
+        query.update(keyset_filter("timestamp", cursor))
+        skip = 0
+
+    items = await audit_col.find(query).sort([("timestamp", -1), ("_id", -1)]).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["timestamp"], items[-1]["_id"])
     # return shape for API
     return [
         {
@@ -322,4 +370,4 @@ async def list_audit_logs(skip: int = 0, limit: int = 50):
             "reason": a.get("reason"),
             "timestamp": a["timestamp"]
         } for a in items
-    ]
\ No newline at end of file
+    ], next_cursor
\ No newline at end of file
@@ -0,0 +1,166 @@
+# services/audit_writer.py
+import asyncio
+import time
+from collections import deque
+from pymongo.errors import BulkWriteError
+from db.db_operation import mongo_conn
+from settings.config import settings
+from utils.logger import get_logger
+
+logger = get_logger("Audit_Writer")
+
+
+class AuditWriter:
+    """
+    Buffers audit entries in-process and writes them with insert_many(ordered=False)
+    once `batch_size` entries are queued or every `flush_interval_ms`, whichever
+    comes first. Request handlers only append to the buffer.
+
+    The buffer is bounded: when it is full, write() waits for a flush instead of
+    growing (backpressure); if that flush fails too, the new entry is dropped and
+    counted. Entries still buffered when a worker dies are lost, so use write_now()
+    where the audit entry must be part of a transaction.
+    """
+
+    # an entry rejected by the server this many times is dropped, not retried forever
+    MAX_WRITE_ATTEMPTS = 5
+
+    def __init__(self, batch_size: int = 100, flush_interval_ms: int = 500, max_buffer: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self._buffer: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._attempts: dict = {}  # _id -> failed write attempts
+        self.stats = {
+            "written": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0
+        }
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            # not wait_for: on 3.11 it can swallow close()'s cancel when the event fires at the same time
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def write(self, doc: dict):
+        self._ensure_started()
+        if len(self._buffer) >= self.max_buffer:
+            await self.flush()
+            if len(self._buffer) >= self.max_buffer:
+                # database still failing: keep memory bounded
+                self.stats["dropped"] += 1
+                logger.error("Audit buffer full, dropping entry")
+                return
+        self._buffer.append(doc)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def write_now(self, doc: dict, session=None):
+        """Unbuffered insert, e.g. inside a transaction."""
+        await mongo_conn.audit_logs.insert_one(doc, session=session)
+        self.stats["written"] += 1
+
+    async def flush(self):
+        async with self._lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                start = time.perf_counter()
+                try:
+                    await mongo_conn.audit_logs.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # ordered=False: everything not in writeErrors was inserted, and 11000 means an
+                    # earlier attempt already inserted it (insert_many sets _id on the docs)
+                    failed = {err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000}
+                    self.stats["written"] += len(batch) - len(failed)
+                    self._forget_attempts([doc for i, doc in enumerate(batch) if i not in failed])
+                    self._requeue(self._count_attempts([batch[i] for i in sorted(failed)]), e)
+                    return
+                except Exception as e:
+                    # nothing known about this batch (connection error, timeout): retry all of it
+                    self._requeue(batch, e)
+                    return
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._forget_attempts(batch)
+                self.stats["written"] += len(batch)
+                self.stats["flushes"] += 1
+                self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+                self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 2)
+                self.stats["total_flush_ms"] += elapsed_ms
+
+    def _forget_attempts(self, docs: list[dict]):
+        if self._attempts:
+            for doc in docs:
+                self._attempts.pop(doc.get("_id"), None)
+
+    def _count_attempts(self, docs: list[dict]) -> list[dict]:
+        keep = []
+        for doc in docs:
+            attempts = self._attempts.get(doc["_id"], 0) + 1
+            if attempts >= self.MAX_WRITE_ATTEMPTS:
+                self._attempts.pop(doc["_id"], None)
+                self.stats["dropped"] += 1
+                logger.error(f"Dropping audit entry {doc['_id']} after {attempts} rejected writes")
+                continue
+            self._attempts[doc["_id"]] = attempts
+            keep.append(doc)
+        return keep
+
+    def _requeue(self, docs: list[dict], error: Exception):
+        self.stats["flush_errors"] += 1
+        logger.error(f"Audit flush failed, {len(docs)} entries queued for retry", exc_info=error)
+        # oldest first, ahead of newer entries; trim the newest beyond max_buffer
+        self._buffer.extendleft(reversed(docs))
+        overflow = len(self._buffer) - self.max_buffer
+        for _ in range(max(0, overflow)):
+            self._forget_attempts([self._buffer.pop()])
+            self.stats["dropped"] += 1
+
+    async def close(self):
+        """Stops the background flusher and drains the buffer (shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            logger.error(f"{len(self._buffer)} audit entries could not be written on shutdown")
+
+    def get_stats(self) -> dict:
+        flushes = self.stats["flushes"]
+        return {
+            "buffer_depth": len(self._buffer),
+            "written": self.stats["written"],
+            "flushes": flushes,
+            "flush_errors": self.stats["flush_errors"],
+            "dropped": self.stats["dropped"],
+            "last_flush_ms": self.stats["last_flush_ms"],
+            "max_flush_ms": self.stats["max_flush_ms"],
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 2) if flushes else 0.0
+        }
+
+
+audit_writer = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_ms=settings.AUDIT_FLUSH_INTERVAL_MS,
+    max_buffer=settings.AUDIT_BUFFER_MAX
+)
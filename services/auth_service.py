@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta
-from utils.hash import hash_token, hash_password
+from utils.hash import hash_token, hash_password_async
 from utils.token import generate_password_reset_token
 from db.db_operation import mongo_conn
 from utils.logger import get_logger
 from fastapi import HTTPException, BackgroundTasks
-from utils.email import send_reset_password_email
+from services.email_outbox import send_reset_password_email
 
 
 logger = get_logger("AUTH_SERVICE")
@@ -66,7 +66,7 @@ async def reset_password(token: str, new_password: str):
     if reset_data["expires_at"] < datetime.utcnow():
         raise HTTPException(400, "Reset token expired")
     logger.info(f"Password reset validated for email={user['email']}")
-    hashed_password = hash_password(new_password)
+    hashed_password = await hash_password_async(new_password)
     await users_collection.update_one(
         {"_id": user["_id"]},
         {
@@ -0,0 +1,117 @@
+# services/email_outbox.py
+import uuid
+from datetime import datetime, timedelta
+from db.db_operation import mongo_conn
+from settings.config import settings
+from utils.email import render_email
+from utils.logger import get_logger
+
+logger = get_logger("EMAIL_OUTBOX")
+
+# outbox status flow: pending -> sending -> sent
+#                                      \-> pending (retry with backoff) -> ... -> failed
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+async def enqueue_email(to_email: str, template: str, **params):
+    """
+    Renders the message and stores it in the outbox; scripts/email_worker.py delivers it.
+    Only a single insert happens on the request path.
+    """
+    now = datetime.utcnow()
+    await mongo_conn.email_outbox.insert_one({
+        "to": to_email,
+        "template": template,
+        "message": render_email(template, to_email, **params),
+        "status": PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "locked_at": None,
+        "sent_at": None,
+        "last_error": None
+    })
+    logger.info(f"Email queued: template={template} to={to_email}")
+
+
+async def send_verification_email(to_email: str, verify_link: str):
+    """
+    Queues the verification email
+    """
+    try:
+        await enqueue_email(to_email, "verify_email", verify_link=verify_link)
+    except Exception as e:
+        logger.error("Failed to queue verification email", exc_info=e)
+
+
+async def send_reset_password_email(to_email: str, reset_link: str):
+    try:
+        await enqueue_email(to_email, "reset_password", reset_link=reset_link)
+    except Exception as e:
+        logger.error("Failed to queue password reset email", exc_info=e)
+
+
+async def claim_batch(limit: int) -> list[dict]:
+    """
+    Moves up to `limit` due messages to `sending` in a fixed number of round trips:
+    the ids of the oldest due messages are read, one update_many stamps the ones
+    that are still pending with a claim token, and the batch is read back by that
+    token. Workers racing for the same ids only get the ones they stamped, so
+    several can run side by side without sending a message twice.
+    """
+    outbox = mongo_conn.email_outbox
+    now = datetime.utcnow()
+    due = {"status": PENDING, "next_attempt_at": {"$lte": now}}
+    candidates = await outbox.find(due, {"_id": 1}).sort("next_attempt_at", 1).limit(limit).to_list(length=limit)
+    if not candidates:
+        return []
+    claim_token = uuid.uuid4().hex
+    result = await outbox.update_many(
+        {**due, "_id": {"$in": [d["_id"] for d in candidates]}},
+        {"$set": {"status": SENDING, "locked_at": now, "claim_token": claim_token}}
+    )
+    if result.modified_count == 0:
+        return []
+    return await outbox.find(
+        {"claim_token": claim_token},
+        {"to": 1, "message": 1, "attempts": 1}
+    ).sort("next_attempt_at", 1).to_list(length=limit)
+
+
+async def mark_sent(ids: list):
+    if not ids:
+        return
+    await mongo_conn.email_outbox.update_many(
+        {"_id": {"$in": ids}},
+        {"$set": {"status": SENT, "sent_at": datetime.utcnow(), "locked_at": None}, "$inc": {"attempts": 1}}
+    )
+
+
+async def mark_failed(doc: dict, error: str):
+    """
+    Schedules a retry with exponential backoff, or gives up after EMAIL_MAX_ATTEMPTS.
+    """
+    attempts = doc.get("attempts", 0) + 1
+    update = {"attempts": attempts, "locked_at": None, "last_error": error[:500]}
+    if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        update["status"] = FAILED
+        logger.error(f"Giving up on email {doc['_id']} to {doc['to']} after {attempts} attempts: {error}")
+    else:
+        delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS)
+        update["status"] = PENDING
+        update["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+    await mongo_conn.email_outbox.update_one({"_id": doc["_id"]}, {"$set": update})
+
+
+async def reclaim_stale(timeout_seconds: int) -> int:
+    """
+    Puts messages left in `sending` by a crashed worker back in the queue.
+    """
+    result = await mongo_conn.email_outbox.update_many(
+        {"status": SENDING, "locked_at": {"$lt": datetime.utcnow() - timedelta(seconds=timeout_seconds)}},
+        {"$set": {"status": PENDING, "locked_at": None}}
+    )
+    return result.modified_count
@@ -0,0 +1,120 @@
+# services/menu_cache.py
+import hashlib
+import json
+from typing import NamedTuple
+from db.redis_client import redis_client
+from settings.config import settings
+from utils.cache import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger("Menu_Cache")
+
+VERSION_KEY_PREFIX = "menu_version:"
+
+
+class MenuEntry(NamedTuple):
+    version: str | None
+    etag: str
+    body: bytes
+
+
+class ItemSnapshot(NamedTuple):
+    name: str
+    price: float
+    is_available: bool
+
+
+class MenuSnapshot(NamedTuple):
+    version: str | None
+    items: dict  # item_id -> ItemSnapshot, every item of the restaurant
+
+
+def serialize_menu(items: list[dict]) -> bytes:
+    # same output as FastAPI's JSONResponse for the dicts list_menu_items returns
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class MenuCache:
+    """
+    Per-worker cache of serialized menus, keyed by (restaurant_id, only_available),
+    and of the price/availability snapshots used to validate orders.
+
+    A shared Redis counter menu_version:{restaurant_id} is bumped by every menu write;
+    an entry is served only while its version matches the counter, so a write on any
+    worker invalidates all workers with one INCR. Reading the counter is the only
+    round trip on a hit. If Redis is down, entries are served until their local TTL.
+    """
+
+    def __init__(self, client=redis_client, ttl: float = 300, maxsize: int = 2000):
+        self.client = client
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "snapshot_hits": 0,
+            "snapshot_misses": 0,
+            "invalidations": 0,
+            "redis_errors": 0
+        }
+
+    async def _version(self, restaurant_id: str) -> str | None:
+        try:
+            return await self.client.get(VERSION_KEY_PREFIX + restaurant_id) or "0"
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.error("Menu version lookup failed", exc_info=e)
+            return None
+
+    async def get(self, restaurant_id: str, only_available: bool, loader) -> MenuEntry:
+        """
+        Returns the cached entry, or builds it with `await loader()` (list of item dicts).
+        """
+        key = (restaurant_id, only_available)
+        version = await self._version(restaurant_id)
+        entry = self.local.get(key)
+        if entry is not None and (version is None or entry.version == version):
+            self.stats["hits"] += 1
+            return entry
+
+        self.stats["misses"] += 1
+        body = serialize_menu(await loader())
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        entry = MenuEntry(version, etag, body)
+        if version is not None:
+            self.local.set(key, entry)
+        return entry
+
+    async def get_snapshot(self, restaurant_id: str, loader) -> MenuSnapshot:
+        """
+        Returns the cached snapshot, or builds it with `await loader()` ({item_id: ItemSnapshot}).
+        """
+        key = (restaurant_id, "snapshot")
+        version = await self._version(restaurant_id)
+        entry = self.local.get(key)
+        if entry is not None and (version is None or entry.version == version):
+            self.stats["snapshot_hits"] += 1
+            return entry
+
+        self.stats["snapshot_misses"] += 1
+        entry = MenuSnapshot(version, await loader())
+        if version is not None:
+            self.local.set(key, entry)
+        return entry
+
+    async def invalidate(self, restaurant_id: str):
+        self.local.pop((restaurant_id, True))
+        self.local.pop((restaurant_id, False))
+        self.local.pop((restaurant_id, "snapshot"))
+        self.stats["invalidations"] += 1
+        try:
+            await self.client.incr(VERSION_KEY_PREFIX + restaurant_id)
+        except Exception as e:
+            # other workers catch up when their local TTL runs out
+            self.stats["redis_errors"] += 1
+            logger.error("Menu version bump failed", exc_info=e)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "entries": len(self.local)}
+
+
+menu_cache = MenuCache(ttl=settings.MENU_CACHE_TTL_SECONDS, maxsize=settings.MENU_CACHE_MAX_ENTRIES)
@@ -1,11 +1,21 @@
+import re
 from db.db_operation import mongo_conn
+from services.audit_writer import audit_writer
+from services.menu_cache import menu_cache, MenuEntry, MenuSnapshot, ItemSnapshot
 from datetime import datetime
 from bson import ObjectId
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 from utils.logger import get_logger
 
 logger = get_logger("Menu_Service")
 
+# "text index required for $text query"
+INDEX_NOT_FOUND = 27
+
+def normalize_name(name: str) -> str:
+    """Case-folded, whitespace-collapsed name; stored as name_key for prefix search."""
+    return " ".join(name.casefold().split())
+
 async def create_menu_item(restaurant_id: str, payload, actor_email: str = None):
     """
     Create a menu item for a restaurant. Enforce unique (restaurant_id + name).
@@ -20,6 +30,7 @@ async def create_menu_item(restaurant_id: str, payload, actor_email: str = None)
     doc = {
         "restaurant_id": restaurant_id,
         "name": payload.name,
+        "name_key": normalize_name(payload.name),
         "description": payload.description,
         "price": float(payload.price),
         "is_available": bool(payload.is_available),
@@ -34,6 +45,7 @@ async def create_menu_item(restaurant_id: str, payload, actor_email: str = None)
         logger.exception("DB error creating menu item")
         raise
 
+    await menu_cache.invalidate(restaurant_id)
     logger.info("Menu item created", extra={"restaurant_id": restaurant_id, "actor": actor_email, "item_id": str(result.inserted_id)})
     return {
         "id": str(result.inserted_id),
@@ -72,6 +84,33 @@ async def list_menu_items(restaurant_id: str, only_available: bool = True):
         })
     return out
 
+async def get_cached_menu(restaurant_id: str, only_available: bool = True) -> MenuEntry:
+    """
+    Serialized menu (JSON bytes + ETag) from the menu cache; built with list_menu_items on a miss.
+    """
+    try:
+        ObjectId(restaurant_id)
+    except Exception:
+        raise ValueError("Invalid restaurant id")
+    return await menu_cache.get(restaurant_id, only_available, lambda: list_menu_items(restaurant_id, only_available))
+
+async def load_menu_snapshot(restaurant_id: str) -> dict:
+    cursor = mongo_conn.menu_items.find(
+        {"restaurant_id": restaurant_id},
+        {"name": 1, "price": 1, "is_available": 1}
+    )
+    return {
+        str(d["_id"]): ItemSnapshot(d["name"], float(d["price"]), d.get("is_available", True))
+        async for d in cursor
+    }
+
+async def get_menu_snapshot(restaurant_id: str) -> MenuSnapshot:
+    """
+    Name/price/availability of every item of the restaurant, for order validation.
+    Served from the menu cache, so it is refreshed by the same version bump as the menu.
+    """
+    return await menu_cache.get_snapshot(restaurant_id, lambda: load_menu_snapshot(restaurant_id))
+
 async def get_menu_item(restaurant_id: str, item_id: str):
     try:
         ObjectId(item_id)
@@ -99,11 +138,14 @@ async def update_menu_item(restaurant_id: str, item_id: str, payload, actor_emai
     update_doc = {k: v for k, v in payload.model_dump().items() if v is not None}
     if "price" in update_doc:
         update_doc["price"] = float(update_doc["price"])
+    if "name" in update_doc:
+        update_doc["name_key"] = normalize_name(update_doc["name"])
     update_doc["updated_at"] = datetime.utcnow()
     result = await mongo_conn.menu_items.update_one({"_id": oid, "restaurant_id": restaurant_id}, {"$set": update_doc})
     if result.matched_count == 0:
         raise ValueError("Menu item not found")
-    await mongo_conn.audit_logs.insert_one({
+    await menu_cache.invalidate(restaurant_id)
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "update_menu_item",
         "resource_type": "menu_item",
@@ -121,7 +163,8 @@ async def delete_menu_item(restaurant_id: str, item_id: str, actor_email: str =
     result = await mongo_conn.menu_items.delete_one({"_id": oid, "restaurant_id": restaurant_id})
     if result.deleted_count == 0:
         raise ValueError("Menu item not found")
-    await mongo_conn.audit_logs.insert_one({
+    await menu_cache.invalidate(restaurant_id)
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "delete_menu_item",
         "resource_type": "menu_item",
@@ -131,17 +174,44 @@ async def delete_menu_item(restaurant_id: str, item_id: str, actor_email: str =
     logger.info("Menu item deleted", extra={"actor": actor_email, "item_id": item_id})
     return {"message": "deleted", "item_id": item_id}
 
-async def search_menu_items(search_query: str):
-    logger.info(f"Menu search query={search_query}")
+async def search_menu_items(
+    search_query: str,
+    restaurant_id: str | None = None,
+    available: bool | None = True,
+    limit: int = 20
+):
+    """
+    Full-text search over menu item name (weighted) and description using the
+    menu_items text index, best matches first. Words are stemmed, so "pizzas"
+    also finds "pizza"; quote a phrase for an exact phrase match.
+    Items whose name starts with the query ("piz") fill the remaining slots,
+    through an anchored regex on the indexed name_key. Without the text index
+    (not built yet) only the prefix matches are returned.
+    """
+    logger.info(f"Menu search query={search_query} restaurant={restaurant_id}")
     menu_collection = mongo_conn.menu_items
-    query = {
-        "name": {
-            "$regex": search_query,
-            "$options": "i"
-        },
-        "is_available": True
-    }
-    items = await menu_collection.find(query).to_list(length=20)
+    filters = {}
+    if restaurant_id:
+        filters["restaurant_id"] = restaurant_id
+    if available is not None:
+        filters["is_available"] = available
+
+    score = {"score": {"$meta": "textScore"}}
+    try:
+        items = await menu_collection.find({"$text": {"$search": search_query}, **filters}, score) \
+            .sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(length=limit)
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND:
+            raise
+        logger.warning("Menu text index missing, falling back to prefix search")
+        items = []
+
+    prefix = normalize_name(search_query)
+    if prefix and len(items) < limit:
+        remaining = limit - len(items)
+        # anchored and case-sensitive on the normalized field, so it is an index range scan
+        query = {**filters, "name_key": {"$regex": "^" + re.escape(prefix)}, "_id": {"$nin": [item["_id"] for item in items]}}
+        items += await menu_collection.find(query).sort("name_key", 1).limit(remaining).to_list(length=remaining)
     for item in items:
         item["id"] = str(item["_id"])
-    return items
\ No newline at end of file
+    return items
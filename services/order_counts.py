@@ -0,0 +1,12 @@
+# services/order_counts.py
+from settings.config import settings
+from utils.cache import TTLCache
+
+# per-user order counts by status filter: {user_email: {status_or_None: count}}
+# per worker; dropped on every order insert, delete and status change made by this worker
+order_counts = TTLCache(maxsize=settings.ORDER_COUNT_CACHE_MAX_ENTRIES, ttl=settings.ORDER_COUNT_CACHE_TTL_SECONDS)
+
+
+def invalidate_order_counts(user_email: str | None):
+    if user_email:
+        order_counts.pop(user_email)
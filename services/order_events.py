@@ -0,0 +1,133 @@
+# services/order_events.py
+"""
+Durable order event log on a Redis Stream, and a small consumer SDK for it.
+
+Every order creation and status change is appended (XADD, length capped with
+approximate MAXLEN) as a flat entry:
+
+    type           "order_created" | "status_changed"
+    order_id, restaurant_id, user_email
+    from, to       statuses; from is "" for order_created
+    actor          "customer" | "restaurant" | ""
+    at             ISO timestamp
+
+Downstream jobs read it through a consumer group, so each one processes only
+new entries instead of rescanning orders:
+
+    consumer = OrderEventConsumer(redis_client, group="kitchen-display", consumer="kds-1")
+    await consumer.run(handle)   # async def handle(event_id, event) -> None
+"""
+import asyncio
+from typing import Awaitable, Callable
+from redis.exceptions import RedisError, ResponseError
+from settings.config import settings
+from utils.logger import get_logger
+
+logger = get_logger("Order_Events")
+
+ORDER_CREATED = "order_created"
+STATUS_CHANGED = "status_changed"
+
+EVENT_FIELDS = ("type", "order_id", "restaurant_id", "user_email", "from", "to", "actor", "at")
+
+
+def encode_event(event: dict) -> dict[str, str]:
+    # stream entries are flat string maps; None becomes ""
+    return {field: "" if event.get(field) is None else str(event[field]) for field in EVENT_FIELDS}
+
+
+def decode_event(fields: dict) -> dict:
+    return {field: (fields.get(field) or None) for field in EVENT_FIELDS}
+
+
+class OrderEventConsumer:
+    """
+    Consumer-group reader of the order event stream (at-least-once delivery).
+
+    Entries are acknowledged only after the handler returns; an entry whose handler
+    raised stays pending and is retried by whichever consumer of the group claims it
+    after `claim_idle_ms`. Handlers must therefore be idempotent (dedupe on event id
+    or order_id + to). The client must use decode_responses=True.
+    """
+
+    def __init__(
+        self,
+        client,
+        group: str,
+        consumer: str,
+        stream: str = settings.ORDER_EVENTS_STREAM,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60000,
+        start_id: str = "0"
+    ):
+        self.client = client
+        self.group = group
+        self.consumer = consumer
+        self.stream = stream
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        # where a new group starts: "0" = whole retained stream, "$" = only new events
+        self.start_id = start_id
+
+    async def ensure_group(self):
+        try:
+            await self.client.xgroup_create(self.stream, self.group, id=self.start_id, mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(self) -> list[tuple[str, dict]]:
+        """Next batch of new entries for this consumer (waits up to block_ms)."""
+        response = await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=self.batch_size, block=self.block_ms
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+        return [(event_id, decode_event(fields)) for event_id, fields in entries]
+
+    async def claim_stale(self) -> list[tuple[str, dict]]:
+        """Takes over entries another consumer read but did not ack within claim_idle_ms."""
+        result = await self.client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size
+        )
+        entries = result[1]
+        # entries trimmed from the stream come back as (id, None)
+        return [(event_id, decode_event(fields)) for event_id, fields in entries if fields]
+
+    async def ack(self, event_ids: list[str]):
+        if event_ids:
+            await self.client.xack(self.stream, self.group, *event_ids)
+
+    async def process(self, entries: list[tuple[str, dict]], handler: Callable[[str, dict], Awaitable[None]]) -> int:
+        done = []
+        for event_id, event in entries:
+            try:
+                await handler(event_id, event)
+            except Exception as e:
+                logger.error(f"Handler failed for order event {event_id}; left pending", exc_info=e)
+                continue
+            done.append(event_id)
+        await self.ack(done)
+        return len(done)
+
+    async def run(self, handler: Callable[[str, dict], Awaitable[None]]):
+        """Processes the stream forever: stale pending entries first, then new ones."""
+        await self.ensure_group()
+        loop = asyncio.get_running_loop()
+        last_claim = 0.0
+        while True:
+            try:
+                if loop.time() - last_claim > self.claim_idle_ms / 1000:
+                    await self.process(await self.claim_stale(), handler)
+                    last_claim = loop.time()
+                await self.process(await self.read(), handler)
+            except RedisError as e:
+                logger.error("Order event stream read failed, retrying", exc_info=e)
+                if "NOGROUP" in str(e):
+                    # stream or group was deleted
+                    await self.ensure_group()
+                await asyncio.sleep(1)
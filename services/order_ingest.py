@@ -0,0 +1,163 @@
+# services/order_ingest.py
+import json
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from db.db_operation import mongo_conn
+from db.redis_client import redis_client
+from models.order import OrderItem
+from services.user_order_service import build_order, orders_stored
+from settings.config import settings
+from utils.logger import get_logger
+
+logger = get_logger("Order_Ingest")
+
+QUEUED = "queued"
+STORED = "stored"
+FAILED = "failed"
+
+STATUS_KEY_PREFIX = "order_ingest:"
+PROCESSING_KEY_PREFIX = "order_ingest_processing:"
+
+# moves up to ARGV[1] orders from the queue (KEYS[1]) to a consumer's processing list (KEYS[2])
+CLAIM_LUA = """
+local moved = {}
+for i = 1, tonumber(ARGV[1]) do
+    local v = redis.call('RPOPLPUSH', KEYS[1], KEYS[2])
+    if not v then break end
+    moved[#moved + 1] = v
+end
+return moved
+"""
+
+# puts everything in a processing list (KEYS[1]) back on the queue (KEYS[2])
+REQUEUE_LUA = """
+local n = 0
+while redis.call('RPOPLPUSH', KEYS[1], KEYS[2]) do
+    n = n + 1
+end
+return n
+"""
+
+_claim = redis_client.register_script(CLAIM_LUA)
+_requeue = redis_client.register_script(REQUEUE_LUA)
+
+
+def _status_key(order_id: str) -> str:
+    return STATUS_KEY_PREFIX + order_id
+
+
+def processing_key(consumer: str) -> str:
+    return PROCESSING_KEY_PREFIX + consumer
+
+
+async def enqueue_order(user_email: str, restaurant_id: str, items: List[OrderItem]) -> dict:
+    """
+    Validates the order (against the cached menu snapshot), assigns its id and queues
+    it for the ingest worker; no Mongo round trip. Raises ValueError like create_order.
+    """
+    order_doc = await build_order(user_email, restaurant_id, items, status="pending")
+    order_id = str(ObjectId())
+    payload = json.dumps({
+        **order_doc,
+        "_id": order_id,
+        "created_at": order_doc["created_at"].isoformat()
+    }, separators=(",", ":"))
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(_status_key(order_id), mapping={"status": QUEUED, "user_email": user_email})
+        pipe.expire(_status_key(order_id), settings.ORDER_INGEST_STATUS_TTL_SECONDS)
+        pipe.lpush(settings.ORDER_INGEST_QUEUE, payload)
+        await pipe.execute()
+    return {"id": order_id, "status": QUEUED, "total_amount": order_doc["total_amount"]}
+
+
+async def get_ingest_status(user_email: str, order_id: str) -> dict | None:
+    """
+    queued | stored | failed for the user's order, or None if there is no such order.
+    Falls back to the orders collection once the status key has expired.
+    """
+    state = await redis_client.hgetall(_status_key(order_id))
+    if state and state.get("user_email") == user_email:
+        return {"id": order_id, "status": state["status"], "error": state.get("error")}
+    try:
+        oid = ObjectId(order_id)
+    except Exception:
+        return None
+    if await mongo_conn.orders_collection.find_one({"_id": oid, "user_email": user_email}, {"_id": 1}):
+        return {"id": order_id, "status": STORED, "error": None}
+    return None
+
+
+async def queue_depth() -> int:
+    return await redis_client.llen(settings.ORDER_INGEST_QUEUE)
+
+
+def _decode(payload: str) -> dict:
+    doc = json.loads(payload)
+    doc["_id"] = ObjectId(doc["_id"])
+    doc["created_at"] = datetime.fromisoformat(doc["created_at"])
+    return doc
+
+
+class IngestConsumer:
+    """
+    Drains the ingest queue in batches with insert_many(ordered=False).
+
+    A claimed batch sits in this consumer's own processing list until it is written,
+    so a crash loses nothing: on start the consumer puts its leftovers back on the
+    queue. Orders are inserted with the _id given at enqueue time, so re-inserting a
+    batch after a crash only produces duplicate key errors, which count as stored.
+    Delivery of the new-order events is therefore at least once: a batch that was
+    published but not yet dropped from the processing list is published again.
+    """
+
+    def __init__(self, name: str, batch_size: int = 200, poll_seconds: float = 1):
+        self.name = name
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.processing = processing_key(name)
+
+    async def recover(self) -> int:
+        return await _requeue(keys=[self.processing, settings.ORDER_INGEST_QUEUE])
+
+    async def claim(self) -> list[str]:
+        batch = await _claim(keys=[settings.ORDER_INGEST_QUEUE, self.processing], args=[self.batch_size])
+        if batch:
+            return batch
+        # idle: block for the next order instead of polling
+        first = await redis_client.brpoplpush(settings.ORDER_INGEST_QUEUE, self.processing, timeout=self.poll_seconds)
+        if first is None:
+            return []
+        rest = await _claim(keys=[settings.ORDER_INGEST_QUEUE, self.processing], args=[self.batch_size - 1])
+        return [first, *rest]
+
+    async def write(self, batch: list[str]) -> tuple[int, int]:
+        """Inserts a claimed batch; returns (stored, failed). Raises on connection errors."""
+        docs = [_decode(payload) for payload in batch]
+        failed = {}
+        try:
+            await mongo_conn.orders_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                # 11000: already inserted by an earlier attempt of this batch
+                if error.get("code") != 11000:
+                    failed[error["index"]] = error.get("errmsg", "write error")
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for i, doc in enumerate(docs):
+                key = _status_key(str(doc["_id"]))
+                if i in failed:
+                    pipe.hset(key, mapping={"status": FAILED, "error": failed[i]})
+                else:
+                    pipe.hset(key, "status", STORED)
+                pipe.expire(key, settings.ORDER_INGEST_STATUS_TTL_SECONDS)
+            await pipe.execute()
+
+        # side effects before the batch leaves the processing list: a crash in between
+        # replays them on recovery (at least once) instead of losing them
+        await orders_stored([doc for i, doc in enumerate(docs) if i not in failed])
+        await redis_client.delete(self.processing)
+        for i, error in failed.items():
+            logger.error(f"Order {docs[i]['_id']} could not be stored: {error}")
+        return len(docs) - len(failed), len(failed)
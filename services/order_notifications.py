@@ -0,0 +1,98 @@
+# services/order_notifications.py
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from db.redis_client import event_bus
+from services.order_events import encode_event, ORDER_CREATED, STATUS_CHANGED
+from settings.config import settings
+
+# one Redis channel per restaurant
+CHANNEL_PREFIX = "order_events:"
+
+
+def restaurant_channel(restaurant_id: str) -> str:
+    return CHANNEL_PREFIX + restaurant_id
+
+
+def _status_event(
+    order_id: str,
+    restaurant_id: str,
+    from_status: str | None,
+    to_status: str,
+    user_email: str | None,
+    actor: str | None
+) -> tuple[str, dict, dict]:
+    # (channel, pub/sub event, stream entry) as taken by event_bus.publish_many
+    at = datetime.utcnow().isoformat()
+    return (
+        restaurant_channel(restaurant_id),
+        {"order_id": order_id, "restaurant_id": restaurant_id, "from": from_status, "to": to_status, "at": at},
+        encode_event({
+            "type": ORDER_CREATED if from_status is None else STATUS_CHANGED,
+            "order_id": order_id,
+            "restaurant_id": restaurant_id,
+            "user_email": user_email,
+            "from": from_status,
+            "to": to_status,
+            "actor": actor,
+            "at": at
+        })
+    )
+
+
+async def publish_status_change(
+    order_id: str,
+    restaurant_id: str,
+    from_status: str | None,
+    to_status: str,
+    user_email: str | None = None,
+    actor: str | None = None
+):
+    """
+    Tells every worker's subscribers of the restaurant about a status change
+    (from_status is None for a new order) and appends it to the durable order
+    event stream, in one round trip. Best effort: never raises.
+    """
+    if not restaurant_id:
+        return
+    channel, event, stream_fields = _status_event(order_id, restaurant_id, from_status, to_status, user_email, actor)
+    await event_bus.publish(
+        channel, event,
+        stream=settings.ORDER_EVENTS_STREAM,
+        stream_fields=stream_fields,
+        maxlen=settings.ORDER_EVENTS_STREAM_MAXLEN
+    )
+
+
+async def publish_new_orders(order_docs: list[dict], actor: str | None = None):
+    """publish_status_change for a batch of new orders, in one round trip."""
+    await event_bus.publish_many(
+        [
+            _status_event(str(doc["_id"]), doc["restaurant_id"], None, doc["status"], doc.get("user_email"), actor)
+            for doc in order_docs if doc.get("restaurant_id")
+        ],
+        stream=settings.ORDER_EVENTS_STREAM,
+        maxlen=settings.ORDER_EVENTS_STREAM_MAXLEN
+    )
+
+
+async def notification_sse(restaurant_ids: list[str]) -> AsyncIterator[str]:
+    """
+    Server-Sent Events of status changes for the given restaurants. There is no
+    replay: a client that reconnects (or is dropped for falling behind) should
+    refetch GET /restaurant/orders.
+    """
+    sub = await event_bus.subscribe([restaurant_channel(rid) for rid in restaurant_ids])
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await sub.get(timeout=settings.ORDER_STREAM_HEARTBEAT_SECONDS)
+            except EOFError:
+                return
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            yield f"event: status\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+    finally:
+        await event_bus.unsubscribe(sub)
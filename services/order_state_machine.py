@@ -0,0 +1,118 @@
+# services/order_state_machine.py
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from db.db_operation import mongo_conn
+from services.order_counts import invalidate_order_counts
+from services.order_notifications import publish_status_change
+from utils.logger import get_logger
+
+logger = get_logger("Order_State_Machine")
+
+# who may trigger a transition
+RESTAURANT = "restaurant"
+CUSTOMER = "customer"
+
+# single source of truth for order status changes: source -> {target: actors}
+ORDER_TRANSITIONS = {
+    "pending": {
+        "accepted": {RESTAURANT},
+        "preparing": {RESTAURANT},
+        "rejected": {RESTAURANT},
+        "cancelled": {RESTAURANT, CUSTOMER}
+    },
+    "accepted": {
+        "preparing": {RESTAURANT},
+        "rejected": {RESTAURANT},
+        "cancelled": {RESTAURANT, CUSTOMER}
+    },
+    "preparing": {
+        "ready": {RESTAURANT},
+        "cancelled": {RESTAURANT}
+    },
+    "ready": {
+        "out_for_delivery": {RESTAURANT},
+        "delivered": {RESTAURANT}
+    },
+    "out_for_delivery": {
+        "delivered": {RESTAURANT}
+    },
+    "rejected": {},
+    "cancelled": {},
+    "delivered": {}
+}
+
+
+def _compile(transitions: dict) -> dict[tuple[str, str], list[str]]:
+    """(actor, target) -> source statuses, used directly as the $in of the update filter."""
+    compiled = {}
+    for source, targets in transitions.items():
+        for target, actors in targets.items():
+            for actor in actors:
+                compiled.setdefault((actor, target), []).append(source)
+    return compiled
+
+
+SOURCES_BY_TARGET = _compile(ORDER_TRANSITIONS)
+
+
+class TransitionError(ValueError):
+    """
+    The transition was not applied. current_status is None when the order
+    does not exist or does not match the caller's scope.
+    """
+
+    def __init__(self, current_status: str | None, new_status: str):
+        self.current_status = current_status
+        self.new_status = new_status
+        if current_status is None:
+            super().__init__("Order not found or access denied")
+        else:
+            super().__init__(f"Invalid status transition from {current_status} to {new_status}")
+
+
+def allowed_sources(actor: str, new_status: str) -> list[str]:
+    return SOURCES_BY_TARGET.get((actor, new_status), [])
+
+
+async def apply_transition(
+    order_id: str,
+    new_status: str,
+    actor: str,
+    scope: dict | None = None,
+    updates: dict | None = None
+) -> str:
+    """
+    Moves an order to new_status in one conditional find_one_and_update: the filter only
+    matches while the order is in one of the allowed source statuses (and inside `scope`,
+    e.g. the caller's restaurants), so concurrent transitions cannot both win.
+    Returns the previous status, drops the customer's cached order counts and publishes
+    the change (restaurant event channel and order event stream); raises TransitionError
+    otherwise.
+    """
+    try:
+        oid = ObjectId(order_id)
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid order id")
+
+    sources = allowed_sources(actor, new_status)
+    query = {"_id": oid, **(scope or {})}
+    if sources:
+        before = await mongo_conn.orders_collection.find_one_and_update(
+            {**query, "status": {"$in": sources}},
+            {"$set": {"status": new_status, "updated_at": datetime.utcnow(), **(updates or {})}},
+            projection={"status": 1, "restaurant_id": 1, "user_email": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is not None:
+            invalidate_order_counts(before.get("user_email"))
+            await publish_status_change(
+                order_id, before.get("restaurant_id"), before["status"], new_status,
+                user_email=before.get("user_email"), actor=actor
+            )
+            return before["status"]
+
+    # failure path only: find out why, for the error message
+    order = await mongo_conn.orders_collection.find_one(query, {"status": 1})
+    raise TransitionError(order["status"] if order else None, new_status)
@@ -0,0 +1,264 @@
+# services/order_stream.py
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from pymongo.errors import OperationFailure, PyMongoError
+from db.db_operation import mongo_conn
+from settings.config import settings
+from utils.fanout import Fanout
+from utils.logger import get_logger
+
+logger = get_logger("Order_Stream")
+
+# only the fields subscribers see; _id (the resume token) must be kept
+CHANGE_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "fullDocument.restaurant_id": 1,
+        "fullDocument.user_email": 1,
+        "fullDocument.status": 1,
+        "fullDocument.total_amount": 1,
+        "fullDocument.created_at": 1,
+        "fullDocument.updated_at": 1
+    }}
+]
+
+
+def restaurant_key(restaurant_id: str) -> tuple:
+    return ("restaurant", restaurant_id)
+
+
+def user_key(user_email: str) -> tuple:
+    return ("user", user_email)
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def format_sse(event: dict) -> str:
+    data = json.dumps(event, default=_json_default, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: order\ndata: {data}\n\n"
+
+
+RESET_SSE = "event: reset\ndata: {}\n\n"
+
+# ChangeStreamHistoryLost, ChangeStreamFatalError: the resume token is gone for good
+HISTORY_LOST_CODES = {286, 280}
+# 40573: change streams need a replica set; 13: Unauthorized (no changeStream/find privilege)
+UNSUPPORTED_CODES = {40573, 13}
+
+# keep proxies (nginx) from buffering or caching the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _change_event(change: dict) -> dict:
+    doc = change.get("fullDocument") or {}
+    return {
+        "id": change["_id"]["_data"],
+        "operation": change["operationType"],
+        "order_id": str(change["documentKey"]["_id"]),
+        "restaurant_id": doc.get("restaurant_id"),
+        "user_email": doc.get("user_email"),
+        "status": doc.get("status"),
+        "total_amount": doc.get("total_amount"),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at")
+    }
+
+
+class OrderStreamUnavailable(Exception):
+    """Change streams cannot be opened on this deployment."""
+
+
+class OrderStreamHub:
+    """
+    One change stream on `orders` per worker, fanned out to SSE subscribers by
+    restaurant_id (restaurant admins) or user_email (customers).
+
+    Event ids are change stream resume tokens. A client reconnecting with
+    Last-Event-ID first gets the events it missed from a short-lived change stream
+    resumed at that token (filtered to its own orders), then the live feed. If the
+    token is no longer in the oplog the client is sent a `reset` event and should
+    refetch over REST. Change streams need a replica set (a single node is enough);
+    without one (or without the privileges) ensure_available() raises and the
+    routes answer 503.
+    """
+
+    def __init__(self, collection=None, queue_size: int = 100, heartbeat_seconds: float = 15):
+        self._collection = collection
+        self.fanout = Fanout(queue_size=queue_size)
+        self.heartbeat_seconds = heartbeat_seconds
+        self._resume_token = None
+        self._task = None
+        self._ready = asyncio.Event()
+        self.unavailable: str | None = None
+        self.stats = {"changes": 0, "delivered": 0, "replayed": 0, "overflows": 0, "resets": 0, "watch_errors": 0}
+
+    @property
+    def collection(self):
+        return self._collection if self._collection is not None else mongo_conn.orders_collection
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch_loop())
+
+    async def _watch_loop(self):
+        delay = 1
+        while True:
+            try:
+                async with self.collection.watch(
+                    CHANGE_PIPELINE,
+                    full_document="updateLookup",
+                    resume_after=self._resume_token
+                ) as stream:
+                    delay = 1
+                    self.unavailable = None
+                    self._ready.set()
+                    async for change in stream:
+                        self._resume_token = change["_id"]
+                        self._dispatch(_change_event(change))
+            except OperationFailure as e:
+                self.stats["watch_errors"] += 1
+                self._ready.set()
+                if e.code in UNSUPPORTED_CODES:
+                    # not a replica set, or no privileges: refuse subscribers, check again later
+                    if self.unavailable is None:
+                        logger.error(f"Order change streams are not available: {e}")
+                    self.unavailable = str(e)
+                    self.fanout.close_all()
+                    await asyncio.sleep(30)
+                    continue
+                if e.code in HISTORY_LOST_CODES:
+                    # resume token fell off the oplog: restart from now and make every
+                    # subscriber reconnect, which gets them a reset
+                    logger.error("Order change stream history lost, restarting from now", exc_info=e)
+                    self._resume_token = None
+                    self.fanout.close_all()
+                else:
+                    logger.error(f"Order change stream failed, resuming in {delay}s", exc_info=e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            except PyMongoError as e:
+                self.stats["watch_errors"] += 1
+                self._ready.set()
+                logger.error(f"Order change stream interrupted, resuming in {delay}s", exc_info=e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _dispatch(self, event: dict):
+        self.stats["changes"] += 1
+        keys = []
+        if event["restaurant_id"]:
+            keys.append(restaurant_key(event["restaurant_id"]))
+        if event["user_email"]:
+            keys.append(user_key(event["user_email"]))
+        self.stats["delivered"] += self.fanout.publish(keys, event)
+
+    async def _replay(self, match: dict, last_event_id: str) -> AsyncIterator[dict]:
+        async with self.collection.watch(
+            CHANGE_PIPELINE + [{"$match": match}],
+            full_document="updateLookup",
+            resume_after={"_data": last_event_id},
+            max_await_time_ms=200
+        ) as stream:
+            while True:
+                change = await stream.try_next()
+                if change is None:
+                    return
+                yield _change_event(change)
+
+    async def ensure_available(self, timeout: float = 5):
+        """
+        Starts the watch and waits (up to `timeout`, only until the first attempt)
+        for it to open. Raises OrderStreamUnavailable if change streams are not
+        supported; transient errors are left to the watch loop to retry.
+        """
+        self._ensure_started()
+        if not self._ready.is_set():
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                pass
+        if self.unavailable is not None:
+            raise OrderStreamUnavailable(self.unavailable)
+
+    async def sse(
+        self,
+        restaurant_ids: list[str] | None = None,
+        user_email: str | None = None,
+        last_event_id: str | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for the given restaurants or customer, as text chunks.
+        """
+        if restaurant_ids:
+            keys = [restaurant_key(rid) for rid in restaurant_ids]
+            match = {"fullDocument.restaurant_id": {"$in": list(restaurant_ids)}}
+        else:
+            keys = [user_key(user_email)]
+            match = {"fullDocument.user_email": user_email}
+
+        self._ensure_started()
+        # subscribe before replaying so nothing falls between the two
+        sub = self.fanout.subscribe(keys)
+        try:
+            yield "retry: 3000\n\n"
+            replayed = set()
+            if last_event_id:
+                try:
+                    async for event in self._replay(match, last_event_id):
+                        replayed.add(event["id"])
+                        self.stats["replayed"] += 1
+                        yield format_sse(event)
+                except PyMongoError as e:
+                    self.stats["resets"] += 1
+                    logger.info(f"Cannot resume order stream: {e}")
+                    yield RESET_SSE
+            while True:
+                try:
+                    event = await sub.get(timeout=self.heartbeat_seconds)
+                except EOFError:
+                    # overflowed or hub restarted: the client reconnects with Last-Event-ID
+                    if sub.overflowed:
+                        self.stats["overflows"] += 1
+                    return
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                if replayed:
+                    if event["id"] in replayed:
+                        continue
+                    # first live event past the replay; later ones are all newer
+                    replayed.clear()
+                yield format_sse(event)
+        finally:
+            self.fanout.unsubscribe(sub)
+
+    async def close(self):
+        self.fanout.close_all()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "subscribers": len(self.fanout),
+            "watching": self._task is not None and not self._task.done(),
+            "unavailable": self.unavailable
+        }
+
+
+order_stream_hub = OrderStreamHub(
+    queue_size=settings.ORDER_STREAM_QUEUE_SIZE,
+    heartbeat_seconds=settings.ORDER_STREAM_HEARTBEAT_SECONDS
+)
@@ -0,0 +1,139 @@
+# services/restaurant_autocomplete.py
+import asyncio
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from db.db_operation import mongo_conn
+from settings.config import settings
+from utils.logger import get_logger
+
+logger = get_logger("Restaurant_Autocomplete")
+
+
+def _slugify(name: str) -> str:
+    # same normalization as restaurant slugs (imported lazily to avoid a cycle)
+    from services.restaurant_service import slugify
+    return slugify(name)
+
+
+def _terms(name: str) -> list[str]:
+    """
+    Every word-suffix of the normalized name, so "Joe's Pizza House" is found
+    by "joe", "pizza" and "house": joe-s-pizza-house, s-pizza-house, pizza-house, house.
+    """
+    words = _slugify(name).split("-")
+    return ["-".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class RestaurantAutocomplete:
+    """
+    Per-worker sorted prefix index over visible (approved, not disabled) restaurants.
+
+    Lookups are a bisect into a sorted list of (term, restaurant_id) plus a short
+    forward scan, so they stay well under a millisecond. Writes made by this worker
+    update the index immediately; a background task picks up everyone else's changes
+    by polling restaurants.updated_at.
+    """
+
+    def __init__(self, refresh_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        self._keys: list[tuple[str, str]] = []
+        self._entries: dict[str, dict] = {}
+        self._synced_at: datetime | None = None
+        self._task = None
+
+    def upsert(self, restaurant_id: str, name: str, approved: bool = False, disabled: bool = False):
+        self.remove(restaurant_id)
+        if not approved or disabled or not name:
+            return
+        terms = _terms(name)
+        self._entries[restaurant_id] = {"id": restaurant_id, "name": name, "slug": _slugify(name), "terms": terms}
+        for term in terms:
+            insort(self._keys, (term, restaurant_id))
+
+    def remove(self, restaurant_id: str):
+        entry = self._entries.pop(restaurant_id, None)
+        if entry is None:
+            return
+        for term in entry["terms"]:
+            i = bisect_left(self._keys, (term, restaurant_id))
+            if i < len(self._keys) and self._keys[i] == (term, restaurant_id):
+                del self._keys[i]
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Top `limit` restaurants whose name (or a word in it) starts with prefix."""
+        prefix = _slugify(prefix)
+        if not prefix:
+            return []
+        # scan a few more candidates than needed so whole-name matches can be ranked first
+        budget = max(50, limit * 5)
+        seen = {}
+        i = bisect_left(self._keys, (prefix, ""))
+        while i < len(self._keys) and budget > 0:
+            term, restaurant_id = self._keys[i]
+            if not term.startswith(prefix):
+                break
+            entry = self._entries[restaurant_id]
+            rank = 0 if term == entry["slug"] else 1
+            if restaurant_id not in seen or rank < seen[restaurant_id][0]:
+                seen[restaurant_id] = (rank, entry["slug"])
+            i += 1
+            budget -= 1
+        ranked = sorted(seen.items(), key=lambda kv: kv[1])[:limit]
+        return [{"id": rid, "name": self._entries[rid]["name"]} for rid, _ in ranked]
+
+    async def load(self):
+        started = datetime.utcnow()
+        keys, entries = [], {}
+        cursor = mongo_conn.restaurants_collection.find(
+            {"approved": True, "disabled": {"$ne": True}},
+            {"name": 1}
+        )
+        async for doc in cursor:
+            restaurant_id = str(doc["_id"])
+            terms = _terms(doc.get("name") or "")
+            entries[restaurant_id] = {"id": restaurant_id, "name": doc["name"], "slug": _slugify(doc["name"]), "terms": terms}
+            keys.extend((term, restaurant_id) for term in terms)
+        keys.sort()
+        self._keys, self._entries = keys, entries
+        self._synced_at = started
+        logger.info(f"Autocomplete index loaded: {len(entries)} restaurants, {len(keys)} terms")
+
+    async def refresh(self):
+        """Applies restaurants changed since the last sync (by any worker)."""
+        if self._synced_at is None:
+            await self.load()
+            return
+        started = datetime.utcnow()
+        # small overlap so writes committed around the previous sync are not missed
+        since = self._synced_at - timedelta(seconds=5)
+        cursor = mongo_conn.restaurants_collection.find(
+            {"updated_at": {"$gte": since}},
+            {"name": 1, "approved": 1, "disabled": 1}
+        )
+        async for doc in cursor:
+            self.upsert(str(doc["_id"]), doc.get("name"), doc.get("approved", False), doc.get("disabled", False))
+        self._synced_at = started
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Autocomplete refresh failed", exc_info=e)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+restaurant_autocomplete = RestaurantAutocomplete(refresh_interval=settings.AUTOCOMPLETE_REFRESH_SECONDS)
@@ -1,24 +1,117 @@
 from db.db_operation import mongo_conn
+from services.audit_writer import audit_writer
 from datetime import datetime
 from bson import ObjectId
-from typing import List
+from typing import List, AsyncIterator
 from utils.logger import get_logger 
+from utils.pagination import encode_cursor, keyset_filter
+from services.order_state_machine import apply_transition, RESTAURANT
 logger = get_logger("Restaurant_Order_Service")
-ALLOWED_STATUS_TRANSITIONS = {
-    "pending": ["preparing"],
-    "preparing": ["ready"],
-    "ready": ["delivered"],
-    "delivered": []
+
+
+RESTAURANT_ORDER_PROJECTION = {
+    "user_email": 1,
+    "restaurant_id": 1,
+    "items": 1,
+    "total_amount": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "updated_by": 1
 }
 
+# dashboard pages and streams are sorted by (created_at, _id), newest first
+RESTAURANT_ORDER_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def _restaurant_order_out(order: dict) -> dict:
+    return {
+        "id": str(order["_id"]),
+        "user_email": order.get("user_email"),
+        "restaurant_id": order["restaurant_id"],
+        "items": order["items"],
+        "total_amount": order["total_amount"],
+        "status": order["status"],
+        "created_at": order.get("created_at"),
+        "updated_at": order.get("updated_at"),
+        "updated_by": order.get("updated_by")
+    }
+
+
+def _restaurant_order_query(
+    restaurant_ids: list,
+    statuses: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = None
+) -> dict:
+    query = {"restaurant_id": {"$in": restaurant_ids}}
+    if statuses:
+        query["status"] = {"$in": statuses}
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    # keyset condition goes into $and so it does not clash with the created_at range
+    page = keyset_filter("created_at", cursor)
+    if page:
+        query["$and"] = [page]
+    return query
+
+
+async def fetch_orders_for_restaurant_admin(
+    restaurant_ids: list,
+    statuses: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50
+) -> tuple[list[dict], str | None]:
+    """
+    One keyset page of the restaurants' orders, newest first, and the cursor of
+    the next page (None on the last page). Raises ValueError for a malformed cursor.
+    """
+    query = _restaurant_order_query(restaurant_ids, statuses, created_from, created_to, cursor)
+    # one extra document tells whether there is a next page
+    orders = await mongo_conn.orders_collection.find(query, RESTAURANT_ORDER_PROJECTION) \
+        .sort(RESTAURANT_ORDER_SORT) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+    has_next = len(orders) > limit
+    orders = orders[:limit]
+    next_cursor = encode_cursor(orders[-1]["created_at"], orders[-1]["_id"]) if has_next else None
+    return [_restaurant_order_out(order) for order in orders], next_cursor
 
-async def fetch_orders_for_restaurant_admin(restaurant_ids: list):
-    orders_collection = mongo_conn.orders_collection
-    cursor = orders_collection.find({
-        "restaurant_id": {"$in": restaurant_ids}
-    })
-    orders = await cursor.to_list(length=None)
-    return orders
+
+async def _iterate_orders(orders) -> AsyncIterator[dict]:
+    try:
+        async for order in orders:
+            yield _restaurant_order_out(order)
+    finally:
+        # client went away mid-stream: release the server-side cursor
+        await orders.close()
+
+
+def stream_orders_for_restaurant_admin(
+    restaurant_ids: list,
+    statuses: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = None,
+    batch_size: int = 500
+) -> AsyncIterator[dict]:
+    """
+    Every matching order, newest first, read from the Motor cursor `batch_size`
+    documents at a time, so memory does not grow with the order history.
+    Raises ValueError for a malformed cursor before anything is streamed.
+    """
+    query = _restaurant_order_query(restaurant_ids, statuses, created_from, created_to, cursor)
+    orders = mongo_conn.orders_collection.find(query, RESTAURANT_ORDER_PROJECTION) \
+        .sort(RESTAURANT_ORDER_SORT) \
+        .batch_size(batch_size)
+    return _iterate_orders(orders)
 
 async def update_order_status(
 order_id: str,
@@ -26,33 +119,15 @@ order_id: str,
     restaurant_ids: list[str],
     actor_email: str
 ):
-    orders_collection = mongo_conn.orders_collection
-    order = await orders_collection.find_one({
-        "_id": ObjectId(order_id),
-        "restaurant_id": {"$in": restaurant_ids}
-    })
-
-    if not order:
-        raise ValueError("Order not found or access denied")
-
-    current_status = order["status"]
-
-    if new_status not in ALLOWED_STATUS_TRANSITIONS.get(current_status, []):
-        raise ValueError(
-            f"Invalid status transition from {current_status} to {new_status}"
-        )
-
-    await orders_collection.update_one(
-        {"_id": ObjectId(order_id)},
-        {
-            "$set": {
-                "status": new_status,
-                "updated_at": datetime.utcnow(),
-                "updated_by": actor_email
-            }
-        }
+    # one conditional write; raises TransitionError (a ValueError) if not allowed
+    current_status = await apply_transition(
+        order_id,
+        new_status,
+        RESTAURANT,
+        scope={"restaurant_id": {"$in": restaurant_ids}},
+        updates={"updated_by": actor_email}
     )
-    await mongo_conn.audit_logs.insert_one({
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "update_order_status",
         "resource_type": "order",
@@ -1,5 +1,7 @@
 # services/restaurant_service.py
 from db.db_operation import mongo_conn
+from services.audit_writer import audit_writer
+from services.restaurant_autocomplete import restaurant_autocomplete
 from datetime import datetime
 from bson import ObjectId
 from utils.logger import get_logger
@@ -47,6 +49,7 @@ async def create_restaurant(payload, actor_email: str = None, approve: bool = Fa
         logger.exception("DB error creating restaurant")
         raise
     logger.info("Restaurant created", extra={"actor": actor_email, "restaurant_id": str(result.inserted_id)})
+    restaurant_autocomplete.upsert(str(result.inserted_id), doc["name"], doc["approved"], doc["disabled"])
     return {
         "id": str(result.inserted_id),
         **{k: doc[k] for k in ("name","description","address","phone","slug","owner_email","approved","disabled")},
@@ -113,7 +116,7 @@ async def update_restaurant(restaurant_id: str, payload, actor_email: str = None
     if result.matched_count == 0:
         raise ValueError("Restaurant not found")
     # audit (simple)
-    await mongo_conn.audit_logs.insert_one({
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "update_restaurant",
         "resource_type": "restaurant",
@@ -121,7 +124,10 @@ async def update_restaurant(restaurant_id: str, payload, actor_email: str = None
         "after": update_doc,
         "timestamp": datetime.utcnow()
     })
-    return await get_restaurant_by_id(restaurant_id)
+    updated = await get_restaurant_by_id(restaurant_id)
+    if updated:
+        restaurant_autocomplete.upsert(restaurant_id, updated["name"], updated["approved"], updated["disabled"])
+    return updated
 
 async def soft_delete_restaurant(restaurant_id: str, actor_email: str = None):
     try:
@@ -131,7 +137,8 @@ async def soft_delete_restaurant(restaurant_id: str, actor_email: str = None):
     result = await mongo_conn.restaurants_collection.update_one({"_id": oid}, {"$set": {"disabled": True, "updated_at": datetime.utcnow()}})
     if result.matched_count == 0:
         raise ValueError("Restaurant not found")
-    await mongo_conn.audit_logs.insert_one({
+    restaurant_autocomplete.remove(restaurant_id)
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "disable_restaurant",
         "resource_type": "restaurant",
@@ -0,0 +1,326 @@
+# services/session_store.py
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from db.db_operation import mongo_conn
+from db.redis_client import redis_client
+from settings.config import settings
+from utils.hash import hash_token
+from utils.jwt_handler import get_refresh_token_expiry
+from utils.logger import get_logger
+
+logger = get_logger("SESSION_STORE")
+
+# rotation outcomes
+OK = "ok"
+NOT_FOUND = "not_found"
+REVOKED = "revoked"
+REUSED = "reused"
+EXPIRED = "expired"
+# rotated moments ago by a concurrent refresh of the same token
+SUPERSEDED = "superseded"
+
+
+class RotationResult(NamedTuple):
+    status: str
+    user_email: str | None = None
+    refresh_token: str | None = None
+
+
+def new_refresh_token() -> tuple[str, str]:
+    """Returns (token, token_hash); only the hash is ever stored."""
+    token = secrets.token_urlsafe(64)
+    return token, hash_token(token)
+
+
+class MongoSessionStore:
+    """Refresh-token sessions as documents in refresh_tokens."""
+
+    def __init__(self):
+        self.collection = mongo_conn.refresh_tokens_collection
+
+    async def create(self, user_email: str, user_agent: str | None = None, ip_address: str | None = None) -> str:
+        refresh_token, token_hash = new_refresh_token()
+        await self.collection.insert_one({
+            "user_email": user_email,
+            "token_hash": token_hash,
+            "created_at": datetime.utcnow(),
+            "expires_at": get_refresh_token_expiry(),
+            "revoked": False,
+            "replaced_by_token": None,
+            "user_agent": user_agent,
+            "ip_address": ip_address
+        })
+        return refresh_token
+
+    async def rotate(self, refresh_token: str) -> RotationResult:
+        """
+        One conditional update claims the old token; only one of several concurrent
+        refreshes can match {revoked: False}, the others fall through to the failure
+        path. The token document is only read again when the rotation failed.
+        Losing that race within REFRESH_REUSE_GRACE_SECONDS is SUPERSEDED, not reuse.
+        """
+        old_hash = hash_token(refresh_token)
+        now = datetime.utcnow()
+        refresh_token, token_hash = new_refresh_token()
+        token_doc = await self.collection.find_one_and_update(
+            {"token_hash": old_hash, "revoked": False, "expires_at": {"$gt": now}},
+            {"$set": {"revoked": True, "replaced_by_token": token_hash, "replaced_at": now}},
+            projection={"user_email": 1}
+        )
+        if token_doc is None:
+            return await self._rotation_failure(old_hash)
+
+        user_email = token_doc["user_email"]
+        await self.collection.insert_one({
+            "user_email": user_email,
+            "token_hash": token_hash,
+            "created_at": now,
+            "expires_at": get_refresh_token_expiry(),
+            "revoked": False,
+            "replaced_by_token": None
+        })
+        return RotationResult(OK, user_email, refresh_token)
+
+    async def _rotation_failure(self, token_hash: str) -> RotationResult:
+        token_doc = await self.collection.find_one(
+            {"token_hash": token_hash},
+            projection={"user_email": 1, "revoked": 1, "replaced_by_token": 1, "replaced_at": 1}
+        )
+        if not token_doc:
+            return RotationResult(NOT_FOUND)
+        user_email = token_doc["user_email"]
+
+        if token_doc["revoked"]:
+            if token_doc.get("replaced_by_token"):
+                replaced_at = token_doc.get("replaced_at")
+                grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+                if replaced_at is not None and datetime.utcnow() - replaced_at < grace:
+                    # lost a race against a concurrent refresh; keep the winner's token
+                    return RotationResult(SUPERSEDED, user_email)
+                # reuse detected
+                await self.revoke_all(user_email)
+                return RotationResult(REUSED, user_email)
+            return RotationResult(REVOKED, user_email)
+
+        return RotationResult(EXPIRED, user_email)
+
+    async def revoke(self, refresh_token: str) -> bool:
+        result = await self.collection.update_one(
+            {"token_hash": hash_token(refresh_token)},
+            {"$set": {"revoked": True}}
+        )
+        return result.matched_count > 0
+
+    async def revoke_all(self, user_email: str):
+        await self.collection.update_many(
+            {"user_email": user_email},
+            {"$set": {"revoked": True}}
+        )
+
+    async def list_sessions(self, user_email: str, limit: int = 100) -> list[dict]:
+        sessions = await self.collection.find(
+            {"user_email": user_email, "revoked": False}
+        ).to_list(length=limit)
+        for s in sessions:
+            s["_id"] = str(s["_id"])
+        return sessions
+
+    async def revoke_session(self, session_id: str, user_email: str) -> bool:
+        try:
+            oid = ObjectId(session_id)
+        except InvalidId:
+            return False
+        result = await self.collection.update_one(
+            {"_id": oid, "user_email": user_email},
+            {"$set": {"revoked": True}}
+        )
+        return result.matched_count > 0
+
+
+# KEYS[1] = refresh:{old_hash}
+# ARGV: new_hash, now_ms, ttl_ms, created_at, key prefix, user set prefix, grace_ms
+# Reuse of a rotated token revokes every session of the user inside the same
+# script, unless it was rotated less than grace_ms ago (a concurrent refresh). The user's token keys are derived in the script, so this assumes a
+# single Redis node (not cluster-safe).
+ROTATE_LUA = """
+local token = redis.call('HMGET', KEYS[1], 'user_email', 'revoked', 'replaced_by', 'expires_at_ms', 'replaced_at_ms')
+local email = token[1]
+if not email then
+    return {'not_found', ''}
+end
+local user_key = ARGV[6] .. email
+local now = tonumber(ARGV[2])
+if token[2] == '1' then
+    if token[3] and token[3] ~= '' then
+        if token[5] and now - tonumber(token[5]) < tonumber(ARGV[7]) then
+            return {'superseded', email}
+        end
+        for _, h in ipairs(redis.call('SMEMBERS', user_key)) do
+            if redis.call('EXISTS', ARGV[5] .. h) == 1 then
+                redis.call('HSET', ARGV[5] .. h, 'revoked', '1')
+            end
+        end
+        return {'reused', email}
+    end
+    return {'revoked', email}
+end
+if tonumber(token[4]) < now then
+    return {'expired', email}
+end
+redis.call('HSET', KEYS[1], 'revoked', '1', 'replaced_by', ARGV[1], 'replaced_at_ms', ARGV[2])
+local new_key = ARGV[5] .. ARGV[1]
+local ttl = tonumber(ARGV[3])
+redis.call('HSET', new_key,
+    'user_email', email,
+    'created_at', ARGV[4],
+    'expires_at_ms', tostring(now + ttl),
+    'revoked', '0',
+    'replaced_by', '')
+redis.call('PEXPIRE', new_key, ttl)
+redis.call('SADD', user_key, ARGV[1])
+if redis.call('PTTL', user_key) < ttl then
+    redis.call('PEXPIRE', user_key, ttl)
+end
+return {'ok', email}
+"""
+
+# KEYS[1] = refresh:{hash}; never recreates an expired key without a TTL
+REVOKE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'revoked', '1')
+return 1
+"""
+
+# KEYS[1] = refresh_user:{email}, ARGV[1] = token key prefix
+REVOKE_ALL_LUA = """
+local revoked = 0
+for _, h in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if redis.call('EXISTS', ARGV[1] .. h) == 1 then
+        redis.call('HSET', ARGV[1] .. h, 'revoked', '1')
+        revoked = revoked + 1
+    end
+end
+return revoked
+"""
+
+
+class RedisSessionStore:
+    """
+    Refresh-token sessions in Redis:
+    - refresh:{token_hash}     hash per token, native TTL = refresh token lifetime
+    - refresh_user:{email}     set of the user's token hashes (logout-all, listing)
+
+    Rotated and revoked tokens stay until their TTL runs out so reuse is still
+    detected. The session id exposed to clients is the token hash.
+    """
+    KEY_PREFIX = "refresh:"
+    USER_PREFIX = "refresh_user:"
+
+    def __init__(self, client=redis_client):
+        self.client = client
+        self._rotate = client.register_script(ROTATE_LUA)
+        self._revoke = client.register_script(REVOKE_LUA)
+        self._revoke_all = client.register_script(REVOKE_ALL_LUA)
+
+    def _ttl_ms(self, expires_at: datetime) -> int:
+        return max(1, int((expires_at - datetime.utcnow()).total_seconds() * 1000))
+
+    async def create(self, user_email: str, user_agent: str | None = None, ip_address: str | None = None) -> str:
+        refresh_token, token_hash = new_refresh_token()
+        now = datetime.utcnow()
+        ttl_ms = self._ttl_ms(get_refresh_token_expiry())
+        key = self.KEY_PREFIX + token_hash
+        user_key = self.USER_PREFIX + user_email
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "user_email": user_email,
+                "created_at": now.isoformat(),
+                "expires_at_ms": str(int(time.time() * 1000) + ttl_ms),
+                "revoked": "0",
+                "replaced_by": "",
+                "user_agent": user_agent or "",
+                "ip_address": ip_address or ""
+            })
+            pipe.pexpire(key, ttl_ms)
+            pipe.sadd(user_key, token_hash)
+            pipe.pexpire(user_key, ttl_ms)
+            await pipe.execute()
+        return refresh_token
+
+    async def rotate(self, refresh_token: str) -> RotationResult:
+        new_token, new_hash = new_refresh_token()
+        now = datetime.utcnow()
+        status, user_email = await self._rotate(
+            keys=[self.KEY_PREFIX + hash_token(refresh_token)],
+            args=[
+                new_hash,
+                int(time.time() * 1000),
+                self._ttl_ms(get_refresh_token_expiry()),
+                now.isoformat(),
+                self.KEY_PREFIX,
+                self.USER_PREFIX,
+                int(settings.REFRESH_REUSE_GRACE_SECONDS * 1000)
+            ]
+        )
+        if status != OK:
+            return RotationResult(status, user_email or None)
+        return RotationResult(OK, user_email, new_token)
+
+    async def revoke(self, refresh_token: str) -> bool:
+        return bool(await self._revoke(keys=[self.KEY_PREFIX + hash_token(refresh_token)]))
+
+    async def revoke_all(self, user_email: str):
+        await self._revoke_all(keys=[self.USER_PREFIX + user_email], args=[self.KEY_PREFIX])
+
+    async def list_sessions(self, user_email: str, limit: int = 100) -> list[dict]:
+        user_key = self.USER_PREFIX + user_email
+        hashes = list(await self.client.smembers(user_key))
+        async with self.client.pipeline(transaction=False) as pipe:
+            for token_hash in hashes:
+                pipe.hgetall(self.KEY_PREFIX + token_hash)
+            docs = await pipe.execute()
+
+        sessions, expired = [], []
+        for token_hash, doc in zip(hashes, docs):
+            if not doc:
+                expired.append(token_hash)
+                continue
+            if doc.get("revoked") == "1":
+                continue
+            sessions.append({
+                "_id": token_hash,
+                "user_email": doc["user_email"],
+                "created_at": doc.get("created_at"),
+                "expires_at": datetime.utcfromtimestamp(int(doc["expires_at_ms"]) / 1000).isoformat(),
+                "revoked": False,
+                "replaced_by_token": None,
+                "user_agent": doc.get("user_agent") or None,
+                "ip_address": doc.get("ip_address") or None
+            })
+        if expired:
+            # members whose token key already expired
+            await self.client.srem(user_key, *expired)
+        sessions.sort(key=lambda s: s["created_at"] or "")
+        return sessions[:limit]
+
+    async def revoke_session(self, session_id: str, user_email: str) -> bool:
+        if not await self.client.sismember(self.USER_PREFIX + user_email, session_id):
+            return False
+        return bool(await self._revoke(keys=[self.KEY_PREFIX + session_id]))
+
+
+def get_session_store():
+    if settings.SESSION_STORE == "redis":
+        return RedisSessionStore()
+    if settings.SESSION_STORE != "mongo":
+        raise ValueError(f"Unknown session store: {settings.SESSION_STORE}")
+    return MongoSessionStore()
+
+
+session_store = get_session_store()
@@ -1,4 +1,6 @@
 from db.db_operation import mongo_conn
+from services.audit_writer import audit_writer
+from services.menu_service import get_menu_snapshot
 from datetime import datetime
 from models.order import OrderCreate, OrderItem
 from bson.objectid import ObjectId
@@ -7,26 +9,25 @@ from utils.logger import get_logger
 from fastapi import HTTPException, status
 from typing import List
 from pymongo.errors import PyMongoError
+from utils.pagination import encode_cursor, keyset_filter
+from services.order_state_machine import apply_transition, TransitionError, RESTAURANT, CUSTOMER
+from services.order_notifications import publish_new_orders
+from services.order_counts import order_counts, invalidate_order_counts
 
 logger = get_logger("Order_Service")
-# allowed transitions
-ALLOWED_TRANSITIONS = {
-    "pending": ["accepted", "rejected", "cancelled"],
-    "accepted": ["preparing", "cancelled", "rejected"],
-    "preparing": ["ready", "cancelled"],
-    "ready": ["out_for_delivery"],
-    "out_for_delivery": ["delivered"],
-    "rejected": [],
-    "cancelled": [],
-    "delivered": []
+
+ORDER_LIST_PROJECTION = {
+    "user_email": 1,
+    "items": 1,
+    "total_amount": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1
 }
-USER_CANCELLABLE_STATUSES = [
-    "pending",
-    "accepted"
-]
 
-async def create_order(user_email: str, restaurant_id: str, items: List[OrderItem], status: str = "pending"):
+async def build_order(user_email: str, restaurant_id: str, items: List[OrderItem], status: str = "pending") -> dict:
     """
+    Validated order document, ready to insert (no _id yet).
     items: list of {"item_id": "<id>", "quantity": <int>}
     Validations:
       - each item exists and belongs to restaurant_id
@@ -40,28 +41,13 @@ async def create_order(user_email: str, restaurant_id: str, items: List[OrderIte
     except Exception:
         raise ValueError("Invalid restaurant id")
 
-    # Build list of item ObjectIds and map
-    item_ids = []
     for it in items:
         try:
-            item_ids.append(ObjectId(it.item_id))
+            ObjectId(it.item_id)
         except Exception:
             raise ValueError(f"Invalid item id in items: {it.item_id}")
-    # fetch all item docs
-    cursor = mongo_conn.menu_items.find({"_id": {"$in": item_ids}})
-    found_items = await cursor.to_list(length=None)
-    if len(found_items) != len(item_ids):
-        raise ValueError("One or more items not found")
-
-    # map by string id
-    found_map = {str(d["_id"]): d for d in found_items}
-
-    # ensure all items belong to same restaurant and match requested restaurant_id
-    for d in found_items:
-        if str(d["restaurant_id"]) != restaurant_id:
-            raise ValueError("Item does not belong to specified restaurant")
-        if not d.get("is_available", True):
-            raise ValueError(f"Item not available: {d['name']}")
+    # price/availability snapshot of the restaurant's menu; no database read on a cache hit
+    menu = (await get_menu_snapshot(restaurant_id)).items
 
     # build order items with snapshot
     order_items = []
@@ -69,15 +55,18 @@ async def create_order(user_email: str, restaurant_id: str, items: List[OrderIte
     for req in items:
         sid = req.item_id
         qty = int(req.quantity)
-        doc = found_map.get(sid)
-        if doc is None:
-            raise ValueError("Item not found in DB: " + sid)
+        item = menu.get(sid)
+        # items of other restaurants are not in this restaurant's snapshot
+        if item is None:
+            raise ValueError("One or more items not found for this restaurant")
+        if not item.is_available:
+            raise ValueError(f"Item not available: {item.name}")
         snapshot = {
             "item_id": sid,
-            "item_name": doc["name"],
-            "unit_price": float(doc["price"]),
+            "item_name": item.name,
+            "unit_price": item.price,
             "quantity": qty,
-            "line_total": round(float(doc["price"]) * qty, 2)
+            "line_total": round(item.price * qty, 2)
         }
         order_items.append(snapshot)
         total_amount += snapshot["line_total"]
@@ -92,13 +81,28 @@ async def create_order(user_email: str, restaurant_id: str, items: List[OrderIte
         "created_at": datetime.utcnow(),
         "updated_at": None
     }
+    return order_doc
+
+async def order_stored(order_doc: dict):
+    """Side effects of a newly stored order."""
+    await orders_stored([order_doc])
+
+async def orders_stored(order_docs: list[dict]):
+    """order_stored for a batch (the ingest worker): one Redis round trip for all events."""
+    for email in {doc["user_email"] for doc in order_docs}:
+        invalidate_order_counts(email)
+    await publish_new_orders(order_docs, actor=CUSTOMER)
 
+async def create_order(user_email: str, restaurant_id: str, items: List[OrderItem], status: str = "pending"):
+    """Validates and inserts an order inline; see build_order."""
+    order_doc = await build_order(user_email, restaurant_id, items, status)
     try:
         result = await mongo_conn.orders_collection.insert_one(order_doc)
     except PyMongoError as e:
         logger.error(f"Error inserting order: {e}", exc_info=True)
         raise e
 
+    await order_stored(order_doc)
     logger.info("Order created", extra={"order_id": str(result.inserted_id), "user": user_email, "restaurant_id": restaurant_id})
     return {
         "id": str(result.inserted_id),
@@ -177,6 +181,8 @@ async def update_user_order(user_email: str, order_id: str, order_data):
     if result.modified_count == 0:
         logger.warning(f"No changes made for order {order_id}")
     else:
+        # the update may change the status
+        invalidate_order_counts(user_email)
         logger.info(f"Order {order_id} updated successfully for user {user_email}")
 
     # Return the updated order
@@ -219,38 +225,37 @@ async def delete_user_order(user_email: str, order_id: str):
         logger.warning(f"Order {order_id} could not be deleted")
         raise ValueError("Order could not be deleted")
 
+    invalidate_order_counts(user_email)
     logger.info(f"Order {order_id} deleted successfully")
     return {"message": "Order deleted successfully"}
 
 async def update_order_status_by_restaurant(restaurant_id: str, order_id: str, new_status: str, actor_email: str = None, reason: str | None = None):
     # validate ids
     try:
-        oid = ObjectId(order_id)
+        ObjectId(order_id)
         ObjectId(restaurant_id)
     except Exception:
         raise ValueError("Invalid id")
 
-    order = await mongo_conn.orders.find_one({"_id": oid})
-    if not order:
-        raise ValueError("Order not found")
-
-    if order.get("restaurant_id") != restaurant_id:
-        raise ValueError("Order does not belong to this restaurant")
-
-    current_status = order.get("status")
-    if new_status not in ALLOWED_TRANSITIONS.get(current_status, []):
-        raise ValueError(f"Invalid status transition from {current_status} -> {new_status}")
-
-    update_doc = {"status": new_status, "updated_at": datetime.utcnow()}
+    update_doc = {}
     if new_status == "rejected" and reason:
         update_doc["rejection_reason"] = reason
 
-    result = await mongo_conn.orders.update_one({"_id": oid}, {"$set": update_doc})
-    if result.matched_count == 0:
-        raise ValueError("Failed to update order status")
+    try:
+        current_status = await apply_transition(
+            order_id,
+            new_status,
+            RESTAURANT,
+            scope={"restaurant_id": restaurant_id},
+            updates=update_doc
+        )
+    except TransitionError as e:
+        if e.current_status is None:
+            raise ValueError("Order not found for this restaurant")
+        raise
 
     # audit
-    await mongo_conn.audit_logs.insert_one({
+    await audit_writer.write({
         "actor_email": actor_email,
         "action": "update_order_status",
         "resource_type": "order",
@@ -264,6 +269,33 @@ async def update_order_status_by_restaurant(restaurant_id: str, order_id: str, n
     logger.info("Order status updated", extra={"order_id": order_id, "from": current_status, "to": new_status, "actor": actor_email})
     return {"order_id": order_id, "from": current_status, "to": new_status}
 
+def _order_out(order: dict) -> dict:
+    return {
+        "id": str(order["_id"]),
+        "user_email": order["user_email"],
+        "items": order["items"],
+        "total_amount": order["total_amount"],
+        "status": order["status"],
+        "created_at": order["created_at"],
+        "updated_at": order.get("updated_at")
+    }
+
+async def count_user_orders(user_email: str, status: str | None = None) -> int:
+    """
+    Order count for a user, cached briefly per worker; answered from the
+    (user_email, status, created_at) index on a miss.
+    """
+    counts = order_counts.get(user_email)
+    if counts is None:
+        counts = {}
+        order_counts.set(user_email, counts)
+    if status not in counts:
+        query = {"user_email": user_email}
+        if status:
+            query["status"] = status
+        counts[status] = await mongo_conn.orders_collection.count_documents(query)
+    return counts[status]
+
 async def list_user_orders(user_email: str, status: str | None = None, page: int = 1, limit: int = 10):
     """Fetch paginated user orders with optional status filter"""
     orders_collection = mongo_conn.orders_collection
@@ -274,71 +306,77 @@ async def list_user_orders(user_email: str, status: str | None = None, page: int
 
     skip = (page - 1) * limit
 
-    cursor = orders_collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+    cursor = orders_collection.find(query, ORDER_LIST_PROJECTION).sort([("created_at", -1), ("_id", -1)]).skip(skip).limit(limit)
     orders = await cursor.to_list(length=limit)
 
-    total_count = await orders_collection.count_documents(query)
+    total_count = await count_user_orders(user_email, status)
 
     return {
         "total_orders": total_count,
         "page": page,
         "page_size": limit,
-        "orders": [
-            {
-                "id": str(order["_id"]),
-                "user_email": order["user_email"],
-                "items": order["items"],
-                "total_amount": order["total_amount"],
-                "status": order["status"],
-                "created_at": order["created_at"],
-                "updated_at": order.get("updated_at")
-            } for order in orders
-        ]
+        "orders": [_order_out(order) for order in orders],
+        "has_next": skip + len(orders) < total_count,
+        "has_prev": page > 1
     }
 
-async def cancel_user_order(
+async def list_user_order_history(
     user_email: str,
-    order_id: str,
-    reason: str | None = None
+    status: str | None = None,
+    cursor: str | None = None,
+    limit: int = 10,
+    include_total: bool = False
 ):
-    orders = mongo_conn.orders_collection
-
-    try:
-        oid = ObjectId(order_id)
-    except Exception:
-        raise ValueError("Invalid order id")
-
-    order = await orders.find_one({
-        "_id": oid,
-        "user_email": user_email
-    })
-
-    if not order:
-        raise ValueError("Order not found or access denied")
-
-    current_status = order["status"]
+    """
+    Keyset-paginated order history, newest first. Each page is a range scan on
+    (user_email[, status], created_at, _id) regardless of how far back it is.
+    Raises ValueError for a malformed cursor.
+    """
+    query = {"user_email": user_email}
+    if status:
+        query["status"] = status
+    query.update(keyset_filter("created_at", cursor))
 
-    if current_status not in USER_CANCELLABLE_STATUSES:
-        raise ValueError(
-            f"Order cannot be cancelled in '{current_status}' state"
-        )
+    # one extra document tells whether there is a next page
+    orders = await mongo_conn.orders_collection.find(query, ORDER_LIST_PROJECTION) \
+        .sort([("created_at", -1), ("_id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+    has_next = len(orders) > limit
+    orders = orders[:limit]
 
-    update_doc = {
-        "status": "cancelled",
-        "updated_at": datetime.utcnow(),
-        "cancelled_by": "user"
+    return {
+        "orders": [_order_out(order) for order in orders],
+        "next_cursor": encode_cursor(orders[-1]["created_at"], orders[-1]["_id"]) if has_next else None,
+        "total_orders": await count_user_orders(user_email, status) if include_total else None
     }
 
+async def cancel_user_order(
+    user_email: str,
+    order_id: str,
+    reason: str | None = None
+):
+    update_doc = {"cancelled_by": "user"}
     if reason:
         update_doc["cancellation_reason"] = reason
 
-    await orders.update_one(
-        {"_id": oid},
-        {"$set": update_doc}
-    )
+    try:
+        current_status = await apply_transition(
+            order_id,
+            "cancelled",
+            CUSTOMER,
+            scope={"user_email": user_email},
+            updates=update_doc
+        )
+    except TransitionError as e:
+        if e.current_status is None:
+            raise
+        raise ValueError(
+            f"Order cannot be cancelled in '{e.current_status}' state"
+        )
 
     # AUDIT LOG
-    await mongo_conn.audit_logs.insert_one({
+    await audit_writer.write({
         "actor_email": user_email,
         "action": "cancel_order",
         "resource_type": "order",
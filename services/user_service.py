@@ -1,7 +1,7 @@
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 from db.db_operation import mongo_conn
-from utils.hash import hash_password, hash_token
+from utils.hash import hash_password_async, hash_token
 from models.user import UserCreate, UserOut
 from bson.objectid import ObjectId
 from utils.logger import get_logger
@@ -27,11 +27,12 @@ async def create_user(user: UserCreate):
         extra={"email": user.email}
     )
     token_hash = hash_token(verify_token)
+    hashed_password = await hash_password_async(user.password)
 
     user_dict = {
         "email": user.email,
         "full_name": user.full_name,
-        "password": hash_password(user.password),  # hashed password
+        "password": hashed_password,                 # hashed password
         "role": "user",                              # default role
         "restaurant_ids": [],                        # default empty
         "token_version": 0,                          # default token version
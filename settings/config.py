@@ -19,6 +19,68 @@ class Settings(BaseSettings):
     FROM_EMAIL: str = os.getenv("FROM_EMAIL")
     FRONTEND_VERIFY_URL: str = os.getenv("FRONTEND_VERIFY_URL")
     REDIS_URL: str = os.getenv("REDIS_URL")
+    # principal cache used by get_current_user (local tier is per worker, redis tier is shared)
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_LOCAL_TTL_SECONDS", 5))
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_REDIS_TTL_SECONDS", 60))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+    # bcrypt process pool (per gunicorn worker)
+    HASH_POOL_WORKERS: int = int(os.getenv("HASH_POOL_WORKERS", 2))
+    HASH_POOL_MAX_PENDING: int = int(os.getenv("HASH_POOL_MAX_PENDING", 32))
+    # memo of recently verified access tokens (keyed by sha256 of the token)
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 4096))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+    # fixed_window | sliding_window | token_bucket
+    RATE_LIMIT_ALGORITHM: str = os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window")
+    # strict: every request checked in Redis | hybrid: local admission, batched sync to Redis
+    RATE_LIMIT_MODE: str = os.getenv("RATE_LIMIT_MODE", "strict")
+    RATE_LIMIT_HYBRID_ERROR_BOUND: float = float(os.getenv("RATE_LIMIT_HYBRID_ERROR_BOUND", 0.1))
+    RATE_LIMIT_HYBRID_SYNC_EVERY: int = int(os.getenv("RATE_LIMIT_HYBRID_SYNC_EVERY", 10))
+    RATE_LIMIT_HYBRID_SYNC_INTERVAL_MS: int = int(os.getenv("RATE_LIMIT_HYBRID_SYNC_INTERVAL_MS", 100))
+    # refresh-token sessions: mongo | redis
+    SESSION_STORE: str = os.getenv("SESSION_STORE", "mongo")
+    # a rotated refresh token presented again within this window lost a race against a concurrent refresh, not reuse
+    REFRESH_REUSE_GRACE_SECONDS: float = float(os.getenv("REFRESH_REUSE_GRACE_SECONDS", 5))
+    # email outbox worker (scripts/email_worker.py)
+    EMAIL_WORKER_BATCH_SIZE: int = int(os.getenv("EMAIL_WORKER_BATCH_SIZE", 50))
+    EMAIL_WORKER_POLL_SECONDS: float = float(os.getenv("EMAIL_WORKER_POLL_SECONDS", 2))
+    EMAIL_SMTP_POOL_SIZE: int = int(os.getenv("EMAIL_SMTP_POOL_SIZE", 4))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", 6))
+    EMAIL_RETRY_BASE_SECONDS: int = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+    EMAIL_RETRY_MAX_SECONDS: int = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+    EMAIL_SENDING_TIMEOUT_SECONDS: int = int(os.getenv("EMAIL_SENDING_TIMEOUT_SECONDS", 300))
+    # per-worker cache of order counts used by paginated order listings
+    ORDER_COUNT_CACHE_TTL_SECONDS: int = int(os.getenv("ORDER_COUNT_CACHE_TTL_SECONDS", 30))
+    ORDER_COUNT_CACHE_MAX_ENTRIES: int = int(os.getenv("ORDER_COUNT_CACHE_MAX_ENTRIES", 10000))
+    # buffered audit log writer (per worker)
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", 100))
+    AUDIT_FLUSH_INTERVAL_MS: int = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", 500))
+    AUDIT_BUFFER_MAX: int = int(os.getenv("AUDIT_BUFFER_MAX", 10000))
+    # serialized menus per worker, invalidated through the redis menu_version counter
+    MENU_CACHE_TTL_SECONDS: int = int(os.getenv("MENU_CACHE_TTL_SECONDS", 300))
+    MENU_CACHE_MAX_ENTRIES: int = int(os.getenv("MENU_CACHE_MAX_ENTRIES", 2000))
+    # in-memory restaurant autocomplete index, re-synced from restaurants.updated_at
+    AUTOCOMPLETE_REFRESH_SECONDS: int = int(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", 30))
+    # documents per Motor batch when streaming the restaurant order dashboard as NDJSON
+    RESTAURANT_ORDER_STREAM_BATCH_SIZE: int = int(os.getenv("RESTAURANT_ORDER_STREAM_BATCH_SIZE", 500))
+    # live order events (SSE) from the orders change stream; needs a replica set
+    ORDER_STREAM_QUEUE_SIZE: int = int(os.getenv("ORDER_STREAM_QUEUE_SIZE", 100))
+    ORDER_STREAM_HEARTBEAT_SECONDS: int = int(os.getenv("ORDER_STREAM_HEARTBEAT_SECONDS", 15))
+    # per-subscriber queue of the redis pub/sub event bus; slower subscribers are dropped
+    EVENT_BUS_QUEUE_SIZE: int = int(os.getenv("EVENT_BUS_QUEUE_SIZE", 100))
+    # durable order event log (redis stream) read by downstream consumer groups
+    ORDER_EVENTS_STREAM: str = str(os.getenv("ORDER_EVENTS_STREAM", "order_events"))
+    ORDER_EVENTS_STREAM_MAXLEN: int = int(os.getenv("ORDER_EVENTS_STREAM_MAXLEN", 1000000))
+    # sync: POST /orders inserts inline | queue: validate, enqueue in redis, 202 (scripts/order_ingest_worker.py stores)
+    ORDER_INGEST_MODE: str = os.getenv("ORDER_INGEST_MODE", "sync")
+    ORDER_INGEST_QUEUE: str = os.getenv("ORDER_INGEST_QUEUE", "order_ingest_queue")
+    ORDER_INGEST_BATCH_SIZE: int = int(os.getenv("ORDER_INGEST_BATCH_SIZE", 200))
+    ORDER_INGEST_POLL_SECONDS: float = float(os.getenv("ORDER_INGEST_POLL_SECONDS", 1))
+    ORDER_INGEST_STATUS_TTL_SECONDS: int = int(os.getenv("ORDER_INGEST_STATUS_TTL_SECONDS", 3600))
+    # Idempotency-Key: how long responses are replayed, how long the first request holds
+    # the key (should exceed the slowest request), how long duplicates wait for it
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 30))
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10))
 
 
     class Config:
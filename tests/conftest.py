@@ -0,0 +1,54 @@
+# tests/conftest.py
+import os
+
+# settings are read at import time; these must be set before any app module is imported
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test-secret",
+    "REDIS_URL": "redis://localhost:6379",
+    "SMTP_HOST": "localhost",
+    "SMTP_USER": "",
+    "SMTP_PASSWORD": "",
+    "FROM_EMAIL": "noreply@example.com",
+    "FRONTEND_VERIFY_URL": "http://localhost/verify"
+}.items():
+    os.environ.setdefault(name, value)
+
+import fakeredis
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from db.db_operation import mongo_conn
+from db.redis_client import event_bus
+
+COLLECTIONS = {
+    "users_collection": "users",
+    "restaurants_collection": "restaurants",
+    "menu_items": "menu_items",
+    "audit_logs": "audit_logs",
+    "orders_collection": "orders",
+    "refresh_tokens_collection": "refresh_tokens",
+    "email_outbox": "email_outbox"
+}
+
+
+@pytest.fixture
+def fake_redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """mongo_conn with every collection swapped for an in-memory one."""
+    db = AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(mongo_conn, "db", db)
+    for attr, name in COLLECTIONS.items():
+        monkeypatch.setattr(mongo_conn, attr, db[name])
+    return mongo_conn
+
+
+@pytest.fixture
+def events(monkeypatch, fake_redis):
+    """event_bus publishing to fake_redis; returns the client."""
+    monkeypatch.setattr(event_bus, "client", fake_redis)
+    return fake_redis
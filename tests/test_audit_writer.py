@@ -0,0 +1,77 @@
+# tests/test_audit_writer.py
+from bson import ObjectId
+import pytest
+from pymongo.errors import BulkWriteError
+from services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+async def writer(mongo):
+    writer = AuditWriter(batch_size=10, flush_interval_ms=60000, max_buffer=20)
+    yield writer
+    # still inside the test's patches; mongo is restored only after this
+    await writer.close()
+
+
+def entry(i: int) -> dict:
+    return {"action": "test", "resource_id": str(i)}
+
+
+async def test_partial_failure_does_not_retry_written_entries(writer, mongo):
+    docs = [entry(i) for i in range(5)]
+    docs[2]["_id"] = ObjectId()
+    # an earlier attempt already inserted this one
+    await mongo.audit_logs.insert_one(dict(docs[2]))
+    for doc in docs:
+        await writer.write(doc)
+
+    await writer.flush()
+
+    assert writer.get_stats()["buffer_depth"] == 0
+    assert writer.stats["written"] == 5
+    assert await mongo.audit_logs.count_documents({}) == 5
+
+
+async def test_rejected_entry_is_dropped_after_max_attempts(writer, mongo, monkeypatch):
+    rejected = entry(0)
+    insert_many = mongo.audit_logs.insert_many
+
+    async def reject_first(docs, ordered=True):
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        good = [doc for doc in docs if doc is not rejected]
+        if good:
+            await insert_many(good, ordered=ordered)
+        if any(doc is rejected for doc in docs):
+            index = next(i for i, doc in enumerate(docs) if doc is rejected)
+            raise BulkWriteError({"writeErrors": [{"index": index, "code": 121, "errmsg": "Document failed validation"}]})
+
+    monkeypatch.setattr(mongo.audit_logs, "insert_many", reject_first)
+    await writer.write(rejected)
+    await writer.write(entry(1))
+
+    for _ in range(writer.MAX_WRITE_ATTEMPTS):
+        await writer.flush()
+
+    assert writer.get_stats()["buffer_depth"] == 0
+    assert writer.stats["dropped"] == 1
+    assert await mongo.audit_logs.count_documents({}) == 1
+    assert writer._attempts == {}
+
+
+async def test_buffer_stays_bounded_while_database_is_down(writer, mongo, monkeypatch):
+    insert_many = mongo.audit_logs.insert_many
+
+    async def down(docs, ordered=True):
+        raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(mongo.audit_logs, "insert_many", down)
+    for i in range(50):
+        await writer.write(entry(i))
+
+    assert writer.get_stats()["buffer_depth"] == writer.max_buffer
+    assert writer.stats["dropped"] == 30
+
+    monkeypatch.setattr(mongo.audit_logs, "insert_many", insert_many)
+    await writer.flush()
+    assert await mongo.audit_logs.count_documents({}) == writer.max_buffer
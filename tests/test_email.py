@@ -0,0 +1,138 @@
+# tests/test_email.py
+import asyncio
+import smtplib
+import socket
+import time
+from datetime import datetime, timedelta
+import pytest
+from aiosmtpd.controller import Controller
+from scripts.email_worker import send_batch
+from services.email_outbox import FAILED, PENDING, SENDING, SENT, claim_batch, enqueue_email
+from settings.config import settings
+from utils.email import SMTPPool, render_email
+
+REJECTED = "rejected@example.com"
+
+
+class RecordingHandler:
+    """Accepts everything except REJECTED; counts sessions to check connection reuse."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture
+def pool(smtp_server):
+    pool = SMTPPool(2, host=smtp_server.hostname, port=smtp_server.port, timeout=5)
+    yield pool
+    pool.close()
+
+
+def message(to_email: str) -> str:
+    return render_email("verify_email", to_email, verify_link="http://localhost/verify?token=t")
+
+
+def test_pool_reuses_connections(smtp_server, pool):
+    for i in range(5):
+        pool.send(f"user{i}@example.com", message(f"user{i}@example.com"))
+
+    assert len(smtp_server.handler.messages) == 5
+    assert smtp_server.handler.sessions == 1
+
+
+def test_pool_keeps_session_after_rejected_recipient(smtp_server, pool):
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send(REJECTED, message(REJECTED))
+    pool.send("user@example.com", message("user@example.com"))
+
+    assert [rcpt for rcpt, _ in smtp_server.handler.messages] == [["user@example.com"]]
+    assert smtp_server.handler.sessions == 1
+
+
+def test_pool_replaces_connection_closed_by_server():
+    handler = RecordingHandler()
+    # the server drops connections idle for more than a second
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port(), timeout=1)
+    controller.start()
+    pool = SMTPPool(1, host=controller.hostname, port=controller.port, timeout=5)
+    try:
+        pool.send("user@example.com", message("user@example.com"))
+        time.sleep(1.5)
+        pool.send("user@example.com", message("user@example.com"))
+    finally:
+        pool.close()
+        controller.stop()
+
+    assert len(handler.messages) == 2
+    assert handler.sessions == 2
+
+
+async def test_concurrent_claims_do_not_overlap(mongo):
+    for i in range(30):
+        await enqueue_email(f"user{i}@example.com", "verify_email", verify_link="http://localhost/verify")
+
+    batches = await asyncio.gather(*(claim_batch(10) for _ in range(5)))
+
+    claimed = [doc["_id"] for batch in batches for doc in batch]
+    assert len(claimed) == len(set(claimed)) == 30
+    assert await mongo.email_outbox.count_documents({"status": SENDING}) == 30
+
+
+async def test_worker_sends_and_backs_off_failures(mongo, pool, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+    await enqueue_email("user@example.com", "verify_email", verify_link="http://localhost/verify")
+    await enqueue_email(REJECTED, "verify_email", verify_link="http://localhost/verify")
+
+    await send_batch(pool, await claim_batch(10))
+
+    sent = await mongo.email_outbox.find_one({"to": "user@example.com"})
+    assert (sent["status"], sent["attempts"]) == (SENT, 1)
+    assert len(smtp_server.handler.messages) == 1
+
+    delays = []
+    for attempt in range(1, settings.EMAIL_MAX_ATTEMPTS):
+        failed = await mongo.email_outbox.find_one({"to": REJECTED})
+        assert (failed["status"], failed["attempts"]) == (PENDING, attempt)
+        assert "550" in failed["last_error"]
+        delays.append(failed["next_attempt_at"] - datetime.utcnow())
+        # not due yet: nothing to claim until the backoff has passed
+        assert await claim_batch(10) == []
+        await mongo.email_outbox.update_one({"_id": failed["_id"]}, {"$set": {"next_attempt_at": datetime.utcnow()}})
+        await send_batch(pool, await claim_batch(10))
+
+    base = timedelta(seconds=settings.EMAIL_RETRY_BASE_SECONDS)
+    assert base - timedelta(seconds=5) < delays[0] <= base
+    assert 2 * base - timedelta(seconds=5) < delays[1] <= 2 * base
+    gave_up = await mongo.email_outbox.find_one({"to": REJECTED})
+    assert (gave_up["status"], gave_up["attempts"]) == (FAILED, settings.EMAIL_MAX_ATTEMPTS)
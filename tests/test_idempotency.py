@@ -0,0 +1,119 @@
+# tests/test_idempotency.py
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from core.idempotency import IdempotencyMiddleware
+from core.rate_limit_policy import API_V1
+from utils.jwt_handler import create_access_token
+
+TOKEN = create_access_token({"sub": "customer@example.com", "role": "user", "token_version": 0})
+
+
+def make_app(fake_redis, gate: asyncio.Event | None = None):
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post(f"{API_V1}/orders/")
+    async def place_order(body: dict):
+        app.state.calls += 1
+        if gate is not None:
+            await gate.wait()
+        if body.get("deny"):
+            raise HTTPException(status_code=403, detail="Not allowed")
+        return {"call": app.state.calls, "items": body.get("items")}
+
+    app.add_middleware(IdempotencyMiddleware, client=fake_redis)
+    return app
+
+
+def client_for(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def headers(key: str = "key-1", token: str = TOKEN) -> dict:
+    return {"Authorization": f"Bearer {token}", "Idempotency-Key": key}
+
+
+async def test_retry_replays_stored_response(fake_redis):
+    app = make_app(fake_redis)
+    async with client_for(app) as client:
+        first = await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers())
+        retry = await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers())
+
+    assert app.state.calls == 1
+    assert retry.status_code == first.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+
+async def test_key_reused_with_different_body_is_rejected(fake_redis):
+    app = make_app(fake_redis)
+    async with client_for(app) as client:
+        await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers())
+        response = await client.post(f"{API_V1}/orders/", json={"items": [2]}, headers=headers())
+
+    assert response.status_code == 422
+    assert app.state.calls == 1
+
+
+async def test_concurrent_duplicate_waits_for_first_result(fake_redis):
+    gate = asyncio.Event()
+    app = make_app(fake_redis, gate)
+    async with client_for(app) as client:
+        first = asyncio.create_task(client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers()))
+        while app.state.calls == 0:
+            await asyncio.sleep(0.01)
+        duplicate = asyncio.create_task(client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers()))
+        # the duplicate is polling for the result while the first request holds the lock
+        await asyncio.sleep(0.2)
+        assert not duplicate.done()
+        gate.set()
+        first, duplicate = await first, await duplicate
+
+    assert app.state.calls == 1
+    assert duplicate.status_code == first.status_code == 200
+    assert duplicate.content == first.content
+    assert duplicate.headers["idempotent-replayed"] == "true"
+
+
+async def test_auth_failures_are_not_stored(fake_redis):
+    app = make_app(fake_redis)
+    async with client_for(app) as client:
+        denied = await client.post(f"{API_V1}/orders/", json={"deny": True}, headers=headers())
+        retry = await client.post(f"{API_V1}/orders/", json={"deny": True}, headers=headers())
+
+    assert denied.status_code == retry.status_code == 403
+    assert "idempotent-replayed" not in retry.headers
+    assert app.state.calls == 2
+
+
+async def test_new_token_version_does_not_replay(fake_redis):
+    app = make_app(fake_redis)
+    reissued = create_access_token({"sub": "customer@example.com", "role": "user", "token_version": 1})
+    async with client_for(app) as client:
+        await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers())
+        response = await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers(token=reissued))
+
+    assert "idempotent-replayed" not in response.headers
+    assert app.state.calls == 2
+
+
+async def test_store_failure_fails_open(fake_redis, monkeypatch):
+    app = make_app(fake_redis)
+    real_set = fake_redis.set
+
+    async def failing_set(name, *args, **kwargs):
+        if name.startswith("idem:"):
+            raise ConnectionError("redis down")
+        return await real_set(name, *args, **kwargs)
+
+    monkeypatch.setattr(fake_redis, "set", failing_set)
+    async with client_for(app) as client:
+        response = await client.post(f"{API_V1}/orders/", json={"items": [1]}, headers=headers())
+
+    assert response.status_code == 200
+    assert response.json() == {"call": 1, "items": [1]}
+    # the lock was still released, so a retry runs again instead of getting 409
+    assert await fake_redis.keys("idem_lock:*") == []
@@ -0,0 +1,65 @@
+# tests/test_menu_routes.py
+from typing import List
+from bson import ObjectId
+import httpx
+import pytest
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+from core.rate_limit_policy import API_V1
+from models.menu import MenuItemCreate, MenuItemOut, MenuItemUpdate
+from routes import menu_routes
+from services import menu_service
+from services.menu_cache import MenuCache
+from services.menu_service import create_menu_item, list_menu_items, update_menu_item
+
+RESTAURANT_ID = str(ObjectId())
+MENU_URL = f"{API_V1}/menu/{RESTAURANT_ID}"
+
+
+@pytest.fixture
+async def client(monkeypatch, mongo, fake_redis):
+    monkeypatch.setattr(menu_service, "menu_cache", MenuCache(client=fake_redis))
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr(menu_service.audit_writer, "write", no_audit)
+    app = FastAPI()
+    app.include_router(menu_routes.router, prefix=API_V1)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_cached_body_matches_response_model(client):
+    await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Margherita", description="Tomato", price=10))
+    await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Funghi", price=11.5, is_available=False))
+
+    for available in ("true", "false"):
+        response = await client.get(MENU_URL, params={"available": available})
+        assert response.status_code == 200
+        # the pre-serialized body bypasses response_model validation
+        items = TypeAdapter(List[MenuItemOut]).validate_json(response.content)
+        expected = await list_menu_items(RESTAURANT_ID, only_available=available == "true")
+        assert [item.model_dump(mode="json") for item in items] == \
+            [MenuItemOut(**item).model_dump(mode="json") for item in expected]
+
+
+async def test_revalidation_until_menu_version_bump(client):
+    item = await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Margherita", price=10))
+    first = await client.get(MENU_URL)
+    etag = first.headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", W/{etag}', "*"):
+        response = await client.get(MENU_URL, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+    assert (await client.get(MENU_URL, headers={"If-None-Match": '"other"'})).status_code == 200
+
+    # bumps menu_version:{rid}; the old tag no longer matches
+    await update_menu_item(RESTAURANT_ID, item["id"], MenuItemUpdate(price=12))
+    changed = await client.get(MENU_URL, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["price"] == 12
+    assert (await client.get(MENU_URL, headers={"If-None-Match": changed.headers["etag"]})).status_code == 304
@@ -0,0 +1,77 @@
+# tests/test_menu_search.py
+from bson import ObjectId
+import pytest
+from pymongo.errors import OperationFailure
+from models.menu import MenuItemCreate, MenuItemUpdate
+from services import menu_service
+from services.menu_cache import MenuCache
+from services.menu_service import create_menu_item, normalize_name, search_menu_items, update_menu_item
+
+RESTAURANT_ID = str(ObjectId())
+OTHER_RESTAURANT_ID = str(ObjectId())
+
+
+class NoTextIndex:
+    """menu_items as it behaves before the text index is built."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, query, *args, **kwargs):
+        if "$text" in query:
+            raise OperationFailure("text index required for $text query", code=27)
+        return self.collection.find(query, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+async def menu(monkeypatch, mongo, fake_redis):
+    monkeypatch.setattr(menu_service, "menu_cache", MenuCache(client=fake_redis))
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr(menu_service.audit_writer, "write", no_audit)
+    for restaurant_id, name in [
+        (RESTAURANT_ID, "Pizza Margherita"),
+        (RESTAURANT_ID, "Pizza  Funghi"),
+        (RESTAURANT_ID, "Pasta Carbonara"),
+        (OTHER_RESTAURANT_ID, "Pizza Diavola"),
+        (OTHER_RESTAURANT_ID, "C++ Cake")
+    ]:
+        await create_menu_item(restaurant_id, MenuItemCreate(name=name, price=10))
+    monkeypatch.setattr(mongo, "menu_items", NoTextIndex(mongo.menu_items))
+    return mongo
+
+
+def names(items: list[dict]) -> list[str]:
+    return [item["name"] for item in items]
+
+
+def test_normalize_name():
+    assert normalize_name("  Pizza   MARGHERITA ") == "pizza margherita"
+
+
+async def test_prefix_matches_without_text_index(menu):
+    assert names(await search_menu_items("piz")) == ["Pizza Diavola", "Pizza  Funghi", "Pizza Margherita"]
+    assert names(await search_menu_items("PIZZA f")) == ["Pizza  Funghi"]
+
+
+async def test_prefix_search_respects_filters_and_limit(menu):
+    assert names(await search_menu_items("piz", restaurant_id=OTHER_RESTAURANT_ID)) == ["Pizza Diavola"]
+    assert len(await search_menu_items("piz", limit=2)) == 2
+
+
+async def test_prefix_is_not_a_regex(menu):
+    assert names(await search_menu_items("c++")) == ["C++ Cake"]
+    assert await search_menu_items(".*") == []
+
+
+async def test_renamed_item_is_found_by_new_name(menu):
+    item = (await search_menu_items("pasta"))[0]
+    await update_menu_item(RESTAURANT_ID, item["id"], MenuItemUpdate(name="Lasagne"))
+
+    assert names(await search_menu_items("las")) == ["Lasagne"]
+    assert await search_menu_items("pasta") == []
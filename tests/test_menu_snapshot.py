@@ -0,0 +1,62 @@
+# tests/test_menu_snapshot.py
+from bson import ObjectId
+import pytest
+from models.menu import MenuItemCreate, MenuItemUpdate
+from models.order import OrderItem
+from services import menu_service
+from services.menu_cache import MenuCache
+from services.menu_service import create_menu_item, update_menu_item
+from services.user_order_service import build_order
+
+RESTAURANT_ID = str(ObjectId())
+
+
+@pytest.fixture
+def cache(monkeypatch, mongo, fake_redis):
+    cache = MenuCache(client=fake_redis)
+    monkeypatch.setattr(menu_service, "menu_cache", cache)
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr(menu_service.audit_writer, "write", no_audit)
+    return cache
+
+
+async def order_total(item_id: str, quantity: int = 2) -> float:
+    order = await build_order("customer@example.com", RESTAURANT_ID, [OrderItem(item_id=item_id, quantity=quantity)])
+    return order["total_amount"]
+
+
+async def test_price_change_shows_up_in_next_order(cache):
+    item = await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Margherita", price=10.0))
+    assert await order_total(item["id"]) == 20.0
+    # served from the cached snapshot now
+    assert await order_total(item["id"]) == 20.0
+    assert cache.stats["snapshot_hits"] == 1
+
+    await update_menu_item(RESTAURANT_ID, item["id"], MenuItemUpdate(price=12.5))
+
+    assert await order_total(item["id"]) == 25.0
+
+
+async def test_price_change_on_another_worker_invalidates_snapshot(cache, fake_redis):
+    item = await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Margherita", price=10.0))
+    other_worker = MenuCache(client=fake_redis)
+    loader = lambda: menu_service.load_menu_snapshot(RESTAURANT_ID)
+    assert (await other_worker.get_snapshot(RESTAURANT_ID, loader)).items[item["id"]].price == 10.0
+
+    # bumps menu_version:{rid}, which the other worker checks on every read
+    await update_menu_item(RESTAURANT_ID, item["id"], MenuItemUpdate(price=12.5))
+
+    assert (await other_worker.get_snapshot(RESTAURANT_ID, loader)).items[item["id"]].price == 12.5
+
+
+async def test_unavailable_item_is_rejected_after_update(cache):
+    item = await create_menu_item(RESTAURANT_ID, MenuItemCreate(name="Margherita", price=10.0))
+    await order_total(item["id"])
+
+    await update_menu_item(RESTAURANT_ID, item["id"], MenuItemUpdate(is_available=False))
+
+    with pytest.raises(ValueError, match="not available"):
+        await order_total(item["id"])
@@ -0,0 +1,46 @@
+# tests/test_order_counts.py
+from datetime import datetime
+from bson import ObjectId
+import pytest
+from services.order_counts import order_counts
+from services.restaurant_order_service import update_order_status
+from services.user_order_service import cancel_user_order, count_user_orders
+
+USER = "customer@example.com"
+
+
+@pytest.fixture
+async def order_id(mongo, events, monkeypatch):
+    order_counts.clear()
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr("services.audit_writer.audit_writer.write", no_audit)
+    result = await mongo.orders_collection.insert_one({
+        "_id": ObjectId(),
+        "user_email": USER,
+        "restaurant_id": "r1",
+        "status": "pending",
+        "created_at": datetime.utcnow()
+    })
+    return str(result.inserted_id)
+
+
+async def test_cancel_refreshes_status_counts(order_id):
+    assert await count_user_orders(USER, "pending") == 1
+    assert await count_user_orders(USER, "cancelled") == 0
+
+    await cancel_user_order(USER, order_id)
+
+    assert await count_user_orders(USER, "pending") == 0
+    assert await count_user_orders(USER, "cancelled") == 1
+
+
+async def test_restaurant_transition_refreshes_status_counts(order_id):
+    assert await count_user_orders(USER, "pending") == 1
+
+    await update_order_status(order_id, "accepted", ["r1"], "owner@example.com")
+
+    assert await count_user_orders(USER, "pending") == 0
+    assert await count_user_orders(USER, "accepted") == 1
@@ -0,0 +1,89 @@
+# tests/test_order_ingest.py
+import json
+from datetime import datetime
+from bson import ObjectId
+import pytest
+from services import order_ingest
+from services.order_ingest import CLAIM_LUA, REQUEUE_LUA, STORED, IngestConsumer
+from settings.config import settings
+
+RESTAURANT_ID = str(ObjectId())
+
+
+@pytest.fixture
+def ingest(monkeypatch, mongo, events):
+    monkeypatch.setattr(order_ingest, "redis_client", events)
+    monkeypatch.setattr(order_ingest, "_claim", events.register_script(CLAIM_LUA))
+    monkeypatch.setattr(order_ingest, "_requeue", events.register_script(REQUEUE_LUA))
+    return events
+
+
+async def queue_orders(client, count: int) -> list[str]:
+    order_ids = []
+    for i in range(count):
+        order_id = str(ObjectId())
+        await client.lpush(settings.ORDER_INGEST_QUEUE, json.dumps({
+            "_id": order_id,
+            "user_email": f"user{i % 2}@example.com",
+            "restaurant_id": RESTAURANT_ID,
+            "items": [],
+            "total_amount": 10,
+            "status": "pending",
+            "created_at": datetime.utcnow().isoformat()
+        }))
+        order_ids.append(order_id)
+    return order_ids
+
+
+def count_pipelines(monkeypatch, client) -> list:
+    calls = []
+    pipeline = client.pipeline
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(client, "pipeline", counting)
+    return calls
+
+
+async def test_batch_is_stored_and_published_in_one_round_trip(ingest, mongo, monkeypatch):
+    order_ids = await queue_orders(ingest, 20)
+    consumer = IngestConsumer("test", batch_size=50)
+    batch = await consumer.claim()
+    pipelines = count_pipelines(monkeypatch, ingest)
+
+    assert await consumer.write(batch) == (20, 0)
+
+    # statuses + all 20 events: two pipelines, not one round trip per order
+    assert len(pipelines) == 2
+    assert await mongo.orders_collection.count_documents({}) == 20
+    assert await ingest.xlen(settings.ORDER_EVENTS_STREAM) == 20
+    assert await ingest.hget(order_ingest._status_key(order_ids[0]), "status") == STORED
+    assert await ingest.llen(consumer.processing) == 0
+
+
+async def test_failed_side_effects_keep_the_batch_for_recovery(ingest, mongo, monkeypatch):
+    await queue_orders(ingest, 3)
+    consumer = IngestConsumer("test", batch_size=50)
+    batch = await consumer.claim()
+
+    orders_stored = order_ingest.orders_stored
+
+    async def crash(order_docs):
+        raise ConnectionError("worker died")
+
+    monkeypatch.setattr(order_ingest, "orders_stored", crash)
+    with pytest.raises(ConnectionError):
+        await consumer.write(batch)
+    monkeypatch.setattr(order_ingest, "orders_stored", orders_stored)
+
+    # stored in Mongo, but the events were never sent: the batch must not be dropped
+    assert await ingest.llen(consumer.processing) == 3
+    assert await ingest.xlen(settings.ORDER_EVENTS_STREAM) == 0
+
+    assert await consumer.recover() == 3
+    assert await consumer.write(await consumer.claim()) == (3, 0)
+    assert await mongo.orders_collection.count_documents({}) == 3
+    assert await ingest.xlen(settings.ORDER_EVENTS_STREAM) == 3
+    assert await ingest.llen(consumer.processing) == 0
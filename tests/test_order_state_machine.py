@@ -0,0 +1,55 @@
+# tests/test_order_state_machine.py
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+import pytest
+from services.order_state_machine import CUSTOMER, RESTAURANT, TransitionError, apply_transition
+from settings.config import settings
+
+PARALLEL = 20
+
+
+async def insert_order(mongo, status: str = "pending") -> str:
+    result = await mongo.orders_collection.insert_one({
+        "_id": ObjectId(),
+        "user_email": "customer@example.com",
+        "restaurant_id": "r1",
+        "status": status,
+        "created_at": datetime.utcnow()
+    })
+    return str(result.inserted_id)
+
+
+@pytest.mark.parametrize("transitions", [
+    [("accepted", RESTAURANT)] * PARALLEL,
+    # terminal targets: whichever lands first rules out all the others
+    [("rejected", RESTAURANT), ("cancelled", RESTAURANT), ("cancelled", CUSTOMER)] * (PARALLEL // 2)
+])
+async def test_exactly_one_concurrent_transition_wins(mongo, events, transitions):
+    order_id = await insert_order(mongo)
+
+    results = await asyncio.gather(
+        *(apply_transition(order_id, new_status, actor) for new_status, actor in transitions),
+        return_exceptions=True
+    )
+
+    won = [(t, r) for t, r in zip(transitions, results) if not isinstance(r, BaseException)]
+    lost = [r for r in results if isinstance(r, BaseException)]
+    assert len(won) == 1
+    (new_status, _), previous = won[0]
+    assert previous == "pending"
+    assert len(lost) == len(transitions) - 1
+    assert all(isinstance(e, TransitionError) and e.current_status == new_status for e in lost)
+
+    order = await mongo.orders_collection.find_one({"_id": ObjectId(order_id)})
+    assert order["status"] == new_status
+    # only the winner published a status change
+    assert await events.xlen(settings.ORDER_EVENTS_STREAM) == 1
+
+
+async def test_transition_outside_scope_is_not_found(mongo, events):
+    order_id = await insert_order(mongo)
+
+    with pytest.raises(TransitionError) as exc:
+        await apply_transition(order_id, "accepted", RESTAURANT, scope={"restaurant_id": {"$in": ["other"]}})
+    assert exc.value.current_status is None
@@ -0,0 +1,101 @@
+# tests/test_order_stream.py
+import asyncio
+from bson import ObjectId
+import pytest
+from pymongo.errors import OperationFailure
+from services.order_stream import OrderStreamHub, OrderStreamUnavailable, restaurant_key
+
+RESTAURANT_ID = str(ObjectId())
+
+
+def change(token: str) -> dict:
+    return {
+        "_id": {"_data": token},
+        "operationType": "insert",
+        "documentKey": {"_id": ObjectId()},
+        "fullDocument": {"restaurant_id": RESTAURANT_ID, "user_email": "user@example.com", "status": "pending"}
+    }
+
+
+class ScriptedStream:
+    def __init__(self, step):
+        self.step = step
+
+    async def __aenter__(self):
+        if isinstance(self.step, Exception):
+            raise self.step
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for item in self.step:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await asyncio.Event().wait()
+
+
+class ScriptedOrders:
+    """orders collection whose watch() calls play the given steps in turn."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.resumed_after = []
+
+    def watch(self, pipeline, full_document=None, resume_after=None, **kwargs):
+        self.resumed_after.append(resume_after)
+        return ScriptedStream(self.steps.pop(0) if self.steps else [])
+
+
+async def wait_for_watches(orders: ScriptedOrders, count: int):
+    async with asyncio.timeout(5):
+        while len(orders.resumed_after) < count:
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def hubs():
+    created = []
+    yield created
+    for hub in created:
+        await hub.close()
+
+
+async def test_standalone_server_is_refused(hubs):
+    orders = ScriptedOrders(OperationFailure("The $changeStream stage is only supported on replica sets", code=40573))
+    hub = OrderStreamHub(collection=orders)
+    hubs.append(hub)
+
+    with pytest.raises(OrderStreamUnavailable):
+        await hub.ensure_available()
+    assert hub.get_stats()["unavailable"]
+
+
+async def test_other_failures_resume_without_reset(hubs):
+    orders = ScriptedOrders([change("a"), OperationFailure("interrupted", code=11601)], [change("b")])
+    hub = OrderStreamHub(collection=orders)
+    hubs.append(hub)
+    sub = hub.fanout.subscribe([restaurant_key(RESTAURANT_ID)])
+    await hub.ensure_available()
+
+    assert (await sub.get(timeout=1))["id"] == "a"
+    # the stream is reopened after the failed change, not restarted from now
+    assert (await sub.get(timeout=5))["id"] == "b"
+    assert orders.resumed_after == [None, {"_data": "a"}]
+    assert not sub.closed
+
+
+async def test_lost_history_restarts_and_resets_subscribers(hubs):
+    orders = ScriptedOrders([change("a"), OperationFailure("resume point no longer in the oplog", code=286)])
+    hub = OrderStreamHub(collection=orders)
+    hubs.append(hub)
+    sub = hub.fanout.subscribe([restaurant_key(RESTAURANT_ID)])
+    await hub.ensure_available()
+
+    # subscribers are closed (queued events dropped) so they reconnect and get a reset
+    with pytest.raises(EOFError):
+        await sub.get(timeout=1)
+    await wait_for_watches(orders, 2)
+    assert orders.resumed_after == [None, None]
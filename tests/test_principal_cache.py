@@ -0,0 +1,98 @@
+# tests/test_principal_cache.py
+from bson import ObjectId
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from core import dependencies
+from core.dependencies import get_current_user
+from core.principal_cache import PrincipalCache, principal_from_user
+from services import admin_service
+from utils.jwt_handler import create_access_token
+
+EMAIL = "owner@example.com"
+
+
+@pytest.fixture
+async def cache(monkeypatch, mongo, fake_redis):
+    cache = PrincipalCache(local_ttl=5, redis_ttl=60, maxsize=100, client=fake_redis)
+    monkeypatch.setattr(dependencies, "principal_cache", cache)
+    monkeypatch.setattr(admin_service, "principal_cache", cache)
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr(admin_service.audit_writer, "write", no_audit)
+    await mongo.users_collection.insert_one({
+        "_id": ObjectId(),
+        "email": EMAIL,
+        "full_name": "Owner",
+        "role": "restaurant_admin",
+        "restaurant_ids": ["r1"],
+        "token_version": 0
+    })
+    return cache
+
+
+def request_for(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+async def current_user(token_version: int = 0):
+    token = create_access_token({"sub": EMAIL, "role": "restaurant_admin", "token_version": token_version})
+    return await get_current_user(request_for(token), token)
+
+
+async def test_miss_then_hits_on_both_tiers(cache, mongo, fake_redis):
+    assert (await current_user()).restaurant_ids == ["r1"]
+    assert cache.stats["misses"] == 1
+
+    await current_user()
+    assert cache.stats["local_hits"] == 1
+
+    # another worker: empty local tier, shared Redis tier
+    other_worker = PrincipalCache(local_ttl=5, redis_ttl=60, maxsize=100, client=fake_redis)
+    assert (await other_worker.get(EMAIL, 0))["role"] == "restaurant_admin"
+    assert other_worker.stats["redis_hits"] == 1
+
+
+async def test_disable_invalidates_cached_principal(cache, mongo):
+    user = await mongo.users_collection.find_one({"email": EMAIL})
+    await current_user()
+
+    await admin_service.disable_user(str(user["_id"]), "admin@example.com")
+
+    # reloaded from Mongo, not served from the cached (enabled) principal
+    for token_version in (0, 1):
+        with pytest.raises(HTTPException) as exc:
+            await current_user(token_version)
+        assert exc.value.status_code == 403
+
+
+async def test_load_racing_invalidate_is_not_cached(cache, mongo, fake_redis):
+    generation = await cache.generation(EMAIL)
+    stale = principal_from_user(await mongo.users_collection.find_one({"email": EMAIL}))
+
+    # an admin mutation lands between the Mongo read and set()
+    await cache.invalidate(EMAIL)
+    await cache.set(EMAIL, stale, generation)
+
+    assert await cache.get(EMAIL, 0) is None
+    assert await fake_redis.get(f"principal:{EMAIL}") is None
+    assert cache.stats["stale_sets"] == 1
+
+    # the next load sees the new generation and is cached again
+    await cache.set(EMAIL, stale, await cache.generation(EMAIL))
+    assert await cache.get(EMAIL, 0) is not None
+
+
+async def test_revoked_token_is_rejected_from_cache(cache, mongo):
+    user = await mongo.users_collection.find_one({"email": EMAIL})
+    await admin_service.revoke_user_tokens(str(user["_id"]), "admin@example.com")
+    await current_user(1)
+
+    await mongo.users_collection.delete_one({"email": EMAIL})
+    # answered from the cached principal (token_version 1), without Mongo
+    with pytest.raises(HTTPException) as exc:
+        await current_user(0)
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Token has been revoked"
@@ -0,0 +1,80 @@
+# tests/test_rate_limiter.py
+import pytest
+from core.rate_limit_engine import RateLimitResult
+from core.rate_limit_policy import API_V1
+from core.rate_limiter import RedisRateLimitMiddleware
+
+
+class StubLimiter:
+    algorithm = "stub"
+
+    def __init__(self, result: RateLimitResult | None = None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+
+    async def hit(self, key, limit, window, cost=1):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def make_middleware(limiter: StubLimiter):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = RedisRateLimitMiddleware(app)
+    middleware.limiter = limiter
+    return middleware, calls
+
+
+def http_scope() -> dict:
+    return {
+        "type": "http", "method": "GET", "path": f"{API_V1}/orders/", "raw_path": f"{API_V1}/orders/".encode(),
+        "query_string": b"", "headers": [], "client": ("10.0.0.1", 1234), "server": ("test", 80), "scheme": "http"
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def test_limited_request_gets_429():
+    middleware, calls = make_middleware(StubLimiter(RateLimitResult(False, 10, 0, 30000)))
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(http_scope(), receive, send)
+
+    assert sent[0]["status"] == 429
+    assert (b"retry-after", b"30") in sent[0]["headers"]
+    assert calls == []
+
+
+async def test_failed_429_send_does_not_run_the_endpoint():
+    middleware, calls = make_middleware(StubLimiter(RateLimitResult(False, 10, 0, 30000)))
+
+    async def send(message):
+        raise OSError("client went away")
+
+    with pytest.raises(OSError):
+        await middleware(http_scope(), receive, send)
+    assert calls == []
+
+
+async def test_redis_error_fails_open():
+    middleware, calls = make_middleware(StubLimiter(error=ConnectionError("redis down")))
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(http_scope(), receive, send)
+
+    assert sent[0]["status"] == 200
+    assert calls == [f"{API_V1}/orders/"]
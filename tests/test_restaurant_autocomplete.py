@@ -0,0 +1,88 @@
+# tests/test_restaurant_autocomplete.py
+import pytest
+from models.restaurant import RestaurantCreate, RestaurantUpdate
+from services import restaurant_service
+from services.restaurant_autocomplete import RestaurantAutocomplete
+from services.restaurant_service import create_restaurant, soft_delete_restaurant, update_restaurant
+
+
+@pytest.fixture
+async def index(monkeypatch, mongo):
+    # the index of "this" worker; restaurant_service keeps it up to date on writes
+    index = RestaurantAutocomplete()
+    monkeypatch.setattr(restaurant_service, "restaurant_autocomplete", index)
+
+    async def no_audit(doc):
+        pass
+
+    monkeypatch.setattr(restaurant_service.audit_writer, "write", no_audit)
+    return index
+
+
+async def add(name: str, approve: bool = True) -> str:
+    owner = name.lower().replace(" ", ".") + "@example.com"
+    restaurant = await create_restaurant(RestaurantCreate(name=name, owner_email=owner), approve=approve)
+    return restaurant["id"]
+
+
+def names(results: list[dict]) -> list[str]:
+    return [r["name"] for r in results]
+
+
+async def test_unapproved_restaurant_is_not_found(index):
+    await add("Pizza Palace")
+    await add("Pizza Pending", approve=False)
+
+    assert names(index.search("pizza")) == ["Pizza Palace"]
+
+    loaded = RestaurantAutocomplete()
+    await loaded.load()
+    assert names(loaded.search("pizza")) == ["Pizza Palace"]
+
+
+async def test_disabled_restaurant_drops_out(index):
+    restaurant_id = await add("Sushi Bar")
+    assert names(index.search("sus")) == ["Sushi Bar"]
+
+    await soft_delete_restaurant(restaurant_id)
+
+    assert index.search("sus") == []
+    # a later edit to the disabled restaurant must not bring it back
+    await update_restaurant(restaurant_id, RestaurantUpdate(name="Sushi Bar Two"))
+    assert index.search("sus") == []
+
+
+async def test_whole_name_matches_rank_before_word_matches(index):
+    await add("Joe's Pizza House")
+    await add("Pizza Express")
+    await add("Big Pizza")
+    await add("Pizzeria Roma")
+
+    # names starting with the prefix first (by slug), then names containing a word that does
+    assert names(index.search("pizz")) == ["Pizza Express", "Pizzeria Roma", "Big Pizza", "Joe's Pizza House"]
+    assert names(index.search("pizz", limit=2)) == ["Pizza Express", "Pizzeria Roma"]
+    assert names(index.search("house")) == ["Joe's Pizza House"]
+    assert names(index.search("Joe's")) == ["Joe's Pizza House"]
+    assert index.search("") == []
+
+
+async def test_change_on_another_worker_appears_after_refresh(index):
+    renamed_id = await add("Taco Town")
+    deleted_id = await add("Curry Corner")
+    other = RestaurantAutocomplete()
+    await other.load()
+    assert names(other.search("taco")) == ["Taco Town"]
+
+    # writes made through this worker's index only
+    await update_restaurant(renamed_id, RestaurantUpdate(name="Burrito Town"))
+    await soft_delete_restaurant(deleted_id)
+    await add("Noodle Nook")
+    assert names(other.search("taco")) == ["Taco Town"]
+    assert other.search("noodle") == []
+
+    await other.refresh()
+
+    assert other.search("taco") == []
+    assert names(other.search("burr")) == ["Burrito Town"]
+    assert other.search("curry") == []
+    assert names(other.search("noodle")) == ["Noodle Nook"]
@@ -0,0 +1,37 @@
+# tests/test_session_store.py
+import asyncio
+import pytest
+from services.session_store import OK, REUSED, SUPERSEDED, MongoSessionStore, RedisSessionStore
+
+PARALLEL = 10
+
+
+@pytest.fixture(params=["mongo", "redis"])
+def store(request, mongo, fake_redis):
+    if request.param == "mongo":
+        return MongoSessionStore()
+    return RedisSessionStore(client=fake_redis)
+
+
+async def test_parallel_rotation_leaves_one_usable_token(store):
+    token = await store.create("customer@example.com")
+
+    results = await asyncio.gather(*(store.rotate(token) for _ in range(PARALLEL)))
+
+    winners = [r for r in results if r.status == OK]
+    assert len(winners) == 1
+    assert all(r.status == SUPERSEDED for r in results if r.status != OK)
+    sessions = await store.list_sessions("customer@example.com")
+    assert len(sessions) == 1
+    # the winner's token is still usable
+    assert (await store.rotate(winners[0].refresh_token)).status == OK
+
+
+async def test_reuse_after_grace_window_revokes_all_sessions(store, monkeypatch):
+    token = await store.create("customer@example.com")
+    rotated = await store.rotate(token)
+    assert rotated.status == OK
+
+    monkeypatch.setattr("settings.config.settings.REFRESH_REUSE_GRACE_SECONDS", 0)
+    assert (await store.rotate(token)).status == REUSED
+    assert await store.list_sessions("customer@example.com") == []
@@ -1,8 +1,9 @@
-import email
+import queue
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import os
+from string import Template
 from utils.logger import get_logger
 from settings.config import settings
 
@@ -14,71 +15,112 @@ SMTP_USER = settings.SMTP_USER
 SMTP_PASSWORD = settings.SMTP_PASSWORD
 FROM_EMAIL = settings.FROM_EMAIL
 
-async def send_verification_email(to_email: str, verify_link: str):
-    """
-    Sends verification email
-    """
-    try:
-        msg = MIMEMultipart()
-        msg["From"] = FROM_EMAIL
-        msg["To"] = to_email
-        msg["Subject"] = "Verify your email"
-
-        body = f"""
+# template name -> (subject, body); bodies are compiled once at import
+TEMPLATES = {
+    "verify_email": ("Verify your email", Template("""
         Hi,
 
         Please verify your email by clicking the link below:
 
-        {verify_link}
+        $verify_link
 
         This link will expire in 15 minutes.
 
         If you did not sign up, ignore this email.
-        """
-
-        msg.attach(MIMEText(body, "plain"))
-
-        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.sendmail(FROM_EMAIL, to_email, msg.as_string())
-        server.quit()
-
-        logger.info("Verification email sent", extra={"email": to_email})
-
-    except Exception as e:
-        logger.error("Failed to send verification email", exc_info=e)
-
-
-async def send_reset_password_email(to_email: str, reset_link: str):
-    try:
-        msg = MIMEMultipart()
-        msg["From"] = FROM_EMAIL
-        msg["To"] = to_email
-        msg["Subject"] = "Reset Your Password"
-
-        body = f"""
+        """)),
+    "reset_password": ("Reset Your Password", Template("""
         Hello,
 
         You requested to reset your password.
 
         Click the link below to reset your password:
 
-        {reset_link}
+        $reset_link
 
         This link expires in 30 minutes.
 
         If you did not request this, ignore this email.
-        """
+        """))
+}
+
+
+def render_email(template: str, to_email: str, **params) -> str:
+    """
+    Renders a template into the final RFC 822 message, so the outbox
+    worker only has to hand ready-made bytes to the SMTP server.
+    """
+    subject, body = TEMPLATES[template]
+    msg = MIMEMultipart()
+    msg["From"] = FROM_EMAIL
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body.substitute(**params), "plain"))
+    return msg.as_string()
 
-        msg.attach(MIMEText(body, "plain"))
-        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.sendmail(FROM_EMAIL, to_email, msg.as_string())
-        server.quit()
-        logger.info(f"Password reset email sent to {to_email}")
 
-    except Exception as e:
-        logger.error("Failed to send verification email", exc_info=e)
+class SMTPPool:
+    """
+    Blocking pool of logged-in smtplib connections.
+    Meant to be driven from worker threads (asyncio.to_thread), never from the event loop.
+    Connections are reused across messages; a dropped connection is replaced once.
+    """
 
+    def __init__(self, size: int, host: str = SMTP_HOST, port: int = SMTP_PORT, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if server.has_extn("starttls"):
+            server.starttls()
+            server.ehlo()
+        if SMTP_USER:
+            server.login(SMTP_USER, SMTP_PASSWORD)
+        return server
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _discard(self, server: smtplib.SMTP):
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    def send(self, to_email: str, message: str):
+        with self._slots:
+            server = self._acquire()
+            try:
+                try:
+                    server.sendmail(FROM_EMAIL, to_email, message)
+                except smtplib.SMTPServerDisconnected:
+                    # idle connection was closed by the server
+                    self._discard(server)
+                    server = self._connect()
+                    server.sendmail(FROM_EMAIL, to_email, message)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # the server rejected this message but the session is still usable
+                self._idle.put(server)
+                raise
+            except Exception:
+                self._discard(server)
+                raise
+            self._idle.put(server)
+
+    def close(self):
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                self._discard(server)
@@ -0,0 +1,95 @@
+# utils/fanout.py
+import asyncio
+from collections import defaultdict
+from typing import Hashable
+
+
+class Subscription:
+    """
+    Bounded per-subscriber queue. A subscriber that falls `maxsize` events behind
+    is closed instead of growing the queue; it is expected to reconnect and resume.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, keys: tuple, maxsize: int = 100):
+        self.keys = keys
+        self.overflowed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._closed = False
+
+    def put(self, event):
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # drop everything still queued (a resuming subscriber gets it again, in
+        # order, from its last delivered event) and wake up a waiting get()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(self._CLOSED)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def get(self, timeout: float | None = None):
+        """
+        Next event, or None on timeout. Raises EOFError once the subscription is closed.
+        """
+        try:
+            event = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is self._CLOSED:
+            raise EOFError("subscription closed")
+        return event
+
+
+class Fanout:
+    """In-process publish/subscribe keyed by arbitrary hashable keys."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[Hashable, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, keys: list) -> Subscription:
+        sub = Subscription(tuple(keys), maxsize=self.queue_size)
+        for key in sub.keys:
+            self._subscribers[key].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        sub.close()
+        for key in sub.keys:
+            subs = self._subscribers.get(key)
+            if subs is None:
+                continue
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[key]
+
+    def publish(self, keys: list, event) -> int:
+        """Delivers `event` once to every subscriber of any of `keys`; returns the count."""
+        targets = set()
+        for key in keys:
+            targets.update(self._subscribers.get(key, ()))
+        for sub in targets:
+            sub.put(event)
+        return len(targets)
+
+    def close_all(self):
+        for subs in list(self._subscribers.values()):
+            for sub in list(subs):
+                self.unsubscribe(sub)
+
+    def __len__(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
@@ -1,16 +1,21 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+import asyncio
 import hashlib
+import multiprocessing
 from utils.logger import get_logger
+from settings.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 logger = get_logger("HASH_UTILS")
 
 def hash_password(password: str) -> str:
     logger.info(f"Password received for hashing")
-    password_str = str(password)  
+    password_str = str(password)
     if len(password_str.encode('utf-8')) > 72:
         password_str = password_str[:72]
-    logger.info(f"Password length after encoding and truncation (if needed): {len(password_str.encode('utf-8'))}")  
+    logger.info(f"Password length after encoding and truncation (if needed): {len(password_str.encode('utf-8'))}")
     return pwd_context.hash(password_str)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,8 +23,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def hash_token(token: str) -> str:
     logger.info(f"Token received for hashing")
-    token_str = str(token)  
+    token_str = str(token)
     if len(token_str.encode('utf-8')) > 72:
         token_str = token_str[:72]
-    logger.info(f"Token length after encoding and truncation (if needed): {len(token_str.encode('utf-8'))}")  
-    return hashlib.sha256(token.encode("utf-8")).hexdigest()
\ No newline at end of file
+    logger.info(f"Token length after encoding and truncation (if needed): {len(token_str.encode('utf-8'))}")
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+# ---------------- BCRYPT PROCESS POOL ---------------- #
+# bcrypt takes tens of ms of pure CPU; running it on the event loop stalls every
+# other request on the worker. The async variants below run it in a small process
+# pool and shed load with a fast 503 once too many calls are queued.
+
+_pool: ProcessPoolExecutor | None = None
+_in_flight = 0
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # forkserver avoids forking a worker that already runs Motor/Redis threads
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.HASH_POOL_WORKERS,
+            mp_context=multiprocessing.get_context(method)
+        )
+        logger.info(f"bcrypt process pool started with {settings.HASH_POOL_WORKERS} workers ({method})")
+    return _pool
+
+async def _run_in_pool(fn, *args):
+    global _in_flight
+    if _in_flight >= settings.HASH_POOL_WORKERS + settings.HASH_POOL_MAX_PENDING:
+        logger.warning(f"bcrypt pool saturated ({_in_flight} in flight), rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), fn, *args)
+    finally:
+        _in_flight -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+def hash_pool_stats() -> dict:
+    return {
+        "workers": settings.HASH_POOL_WORKERS,
+        "max_pending": settings.HASH_POOL_MAX_PENDING,
+        "in_flight": _in_flight
+    }
+
+def shutdown_hash_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
-from jose import jwt
+from jose import jwt, JWTError, ExpiredSignatureError
+from utils.cache import TTLCache
 from utils.logger import get_logger
 from settings.config import settings
+import hashlib
+import time
 
 logger = get_logger("JWT_HANDLER")
 
@@ -23,6 +26,61 @@ def create_access_token(data: dict):
     logger.info(f"Access token created successfully with expiry {expire}")
     return encoded_jwt
 
+# verified claims of recently seen access tokens, keyed by sha256(token)
+_verified_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_ENTRIES, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+def verify_access_token(token: str) -> dict:
+    """
+    Verify signature and expiry of an access token and return its claims.
+    Successful verifications are memoized, so a token is HMAC-checked and
+    JSON-decoded once instead of on every request.
+    Raises JWTError (ExpiredSignatureError once a memoized token expires).
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _verified_tokens.get(key)
+    now = time.time()
+    if claims is not None:
+        exp = claims.get("exp")
+        if exp is not None and exp <= now:
+            _verified_tokens.pop(key)
+            raise ExpiredSignatureError("Signature has expired.")
+        return claims
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = claims.get("exp")
+    ttl = min(settings.TOKEN_CACHE_TTL_SECONDS, exp - now) if exp is not None else None
+    _verified_tokens.set(key, claims, ttl=ttl)
+    return claims
+
+def _bearer_token(authorization: str | None) -> str | None:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+def get_request_claims(request, token: str | None = None) -> dict | None:
+    """
+    Verified claims for the bearer token of this request, or None when the
+    request has no valid access token. The result is stored on request.state,
+    so middleware and dependencies share a single verification per request.
+    """
+    state = request.state
+    if getattr(state, "token_checked", False) and (token is None or token == state.access_token):
+        return state.token_claims
+    if token is None:
+        token = _bearer_token(request.headers.get("Authorization"))
+    claims = None
+    if token:
+        try:
+            claims = verify_access_token(token)
+        except JWTError:
+            logger.debug("Access token failed verification")
+    state.access_token = token
+    state.token_claims = claims
+    state.token_checked = True
+    return claims
+
 def decode_access_token(token: str):
     """
     Decode JWT token and return payload.
@@ -30,7 +88,7 @@ def decode_access_token(token: str):
     """
     logger.info("Decoding access token")
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = verify_access_token(token)
         logger.info("Token decoded successfully")
         return payload
     except Exception as e:
@@ -0,0 +1,42 @@
+# utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(sort_value: datetime | None, _id: ObjectId) -> str:
+    """
+    Opaque cursor for keyset pagination: the sort key and _id of the last
+    document of a page. Clients must treat it as an opaque string.
+    """
+    payload = [sort_value.isoformat() if sort_value else None, str(_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, ObjectId]:
+    """Raises ValueError for anything that is not a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, _id = json.loads(raw)
+        return (datetime.fromisoformat(sort_value) if sort_value else None), ObjectId(_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(field: str, cursor: str | None, descending: bool = True) -> dict:
+    """
+    Range filter for the page after `cursor` when sorting by (field, _id).
+    Pair it with .sort([(field, d), ("_id", d)]) and an index ending in (field, _id),
+    so every page is an index range scan no matter how deep it is.
+    """
+    if not cursor:
+        return {}
+    sort_value, _id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: sort_value}},
+        {field: sort_value, "_id": {op: _id}}
+    ]}